@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import Query
 from app.core.config import pagination_settings
 
@@ -12,3 +13,17 @@ def PaginationParams(
     )
 ):
     return {"page": page, "size": size}
+
+
+def CursorParams(
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page"
+    ),
+    size: int = Query(
+        pagination_settings.DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=pagination_settings.MAX_PAGE_SIZE,
+        description=f"Items per page (max {pagination_settings.MAX_PAGE_SIZE})"
+    )
+):
+    return {"cursor": cursor, "size": size}
@@ -0,0 +1,107 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.analytics import get_utilisation, rebuild_rollups
+from app.database import get_db
+from app.schemas.analytics import (
+    RollupRebuildResponse,
+    UtilisationGroup,
+    UtilisationResponse,
+)
+from app.tasks.export import export_bookings
+from app.utils.role import is_admin
+
+router = APIRouter(tags=["analytics"], dependencies=[Depends(is_admin)])
+
+MAX_RANGE_DAYS = 366
+
+
+def _check_range(start_date: date, end_date: date) -> None:
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {MAX_RANGE_DAYS} days"
+        )
+
+
+@router.get("/utilisation", response_model=UtilisationResponse)
+async def read_utilisation(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    group_by: UtilisationGroup = Query(UtilisationGroup.TABLE),
+    location: Optional[str] = Query(None),
+    table_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Occupancy rate, covers and cancellations, read from the hourly rollups.
+    Days and hours are local to the analytics timezone.
+    """
+    _check_range(start_date, end_date)
+    rows = await get_utilisation(
+        db, start_date, end_date, group_by.value, location, table_id
+    )
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "group_by": group_by,
+        "rows": rows
+    }
+
+
+@router.post("/rollups/rebuild", response_model=RollupRebuildResponse)
+async def rebuild_rollups_endpoint(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Recompute the rollups of a date range from the raw bookings"""
+    _check_range(start_date, end_date)
+    days = await rebuild_rollups(db, start_date, end_date)
+    return {
+        "message": f"Rollups rebuilt from {start_date} to {end_date}.",
+        "days": days
+    }
+
+
+@router.post("/exports", status_code=status.HTTP_202_ACCEPTED)
+async def start_booking_export(
+    background_tasks: BackgroundTasks,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    incremental: bool = Query(
+        False,
+        description="Only rows updated since the previous incremental export"
+    )
+):
+    """
+    Export booking history to month-partitioned Parquet files in the
+    configured export directory, after the response is sent.
+    """
+    if start_date and end_date and end_date <= start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must be after start_date"
+        )
+    background_tasks.add_task(
+        export_bookings,
+        start_date=start_date,
+        end_date=end_date,
+        incremental=incremental
+    )
+    return {"message": "Booking export started."}
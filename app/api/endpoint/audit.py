@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.audit import get_audit_events
+from app.database import get_db
+from app.schemas.audit import AuditEventResponse
+from app.utils.role import is_admin
+
+router = APIRouter(tags=["audit"], dependencies=[Depends(is_admin)])
+
+
+@router.get("/", response_model=List[AuditEventResponse])
+async def read_audit_events(
+    entity_type: Optional[str] = Query(
+        None,
+        description="booking, table or user"
+    ),
+    entity_id: Optional[int] = Query(None),
+    actor_id: Optional[int] = Query(None),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Audit trail, newest first. Events reach the log in batches, so the
+    last few seconds may not be visible yet.
+    """
+    return await get_audit_events(
+        db, entity_type, entity_id, actor_id, since, until, skip, limit
+    )
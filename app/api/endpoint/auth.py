@@ -1,22 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from typing import Optional
+from fastapi import (APIRouter, Depends, File, HTTPException, Query,
+                     UploadFile, status)
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.user import (
     delete_user,
     get_user,
     get_user_by_email,
+    get_user_directory,
     create_user,
     update_user
     )
+from app.api.deps.pagination import CursorParams
+from app.core.config import user_import_settings
+from app.crud.user_import import detect_format, import_users, parse_rows
 from app.database import get_db
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.schemas.user import (
     TokenResponse,
     UserCreate,
+    UserDirectoryFilter,
+    UserDirectoryResponse,
     UserResponse,
     RefreshTokenRequest,
     UserUpdate
 )
+from app.tasks.audit import audit_log
 from app.utils.role import is_admin
 from app.utils.security import (
     validate_email_format,
@@ -206,17 +217,100 @@ async def read_user_me(
     return refreshed_user
 
 
+# user directory (admin only)
+@router.get(
+    "/users",
+    response_model=UserDirectoryResponse,
+    summary="Search users (Admin only)",
+    responses={
+        400: {"description": "Invalid cursor or search term"}
+    }
+)
+async def read_user_directory(
+    email: Optional[str] = Query(None, min_length=1, max_length=255),
+    match: str = Query("prefix", pattern="^(prefix|contains)$"),
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    page: dict = Depends(CursorParams),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(is_admin)
+):
+    """
+    Page through users, optionally by case-insensitive email prefix or
+    substring, role and active flag. Pass ``next_cursor`` back as
+    ``cursor`` for the next page. The total is the planner's estimate.
+    """
+    filters = UserDirectoryFilter(
+        email=email, match=match, role=role, is_active=is_active
+    )
+    try:
+        users, next_cursor, estimated_total = await get_user_directory(
+            db, filters, page["size"], page["cursor"]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "data": users,
+        "next_cursor": next_cursor,
+        "estimated_total": estimated_total
+    }
+
+
+# bulk user import (admin only)
+@router.post(
+    "/users/import",
+    summary="Import users from CSV or NDJSON (Admin only)",
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "Progress, rejected rows and the final counts"
+        },
+        400: {"description": "Unreadable file"},
+        413: {"description": "Too many rows"}
+    }
+)
+async def import_users_admin(
+    file: UploadFile = File(...),
+    current_user: User = Depends(is_admin)
+):
+    """
+    Create guest accounts from a file with ``email`` and ``password``
+    columns (CSV) or fields (one JSON object per line). Rows are checked
+    like a registration, and existing emails are skipped. The response
+    streams one JSON event per line: ``progress``, ``error`` for each
+    row not imported, and ``done`` with the counts.
+    """
+    try:
+        fmt = detect_format(file.filename, file.content_type)
+        rows = parse_rows(await file.read(), fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(rows) > user_import_settings.MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {user_import_settings.MAX_ROWS} rows per import"
+        )
+
+    actor_id = current_user.id
+
+    async def stream():
+        async for event in import_users(rows, fmt, actor_id):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 # get user by id (admin only)
 @router.put(
     "/{user_id}",
     response_model=UserResponse,
-    dependencies=[Depends(is_admin)],
     summary="Update a user (Admin only)"
 )
 async def update_user_admin(
     user_id: int,
     user_update: UserUpdate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(is_admin)
 ):
     """Update a user's information (Admin only)."""
     db_user = await get_user(db, user_id=user_id)
@@ -226,19 +320,26 @@ async def update_user_admin(
             detail="User not found"
         )
 
-    return await update_user(db, db_user=db_user, user_update=user_update)
+    updated = await update_user(db, db_user=db_user, user_update=user_update)
+    changes = user_update.dict(exclude_unset=True)
+    if "password" in changes:
+        changes["password"] = "<changed>"
+    await audit_log.record(
+        "user.update", "user", user_id, current_user.id, changes
+    )
+    return updated
 
 
 # delete user (admin only)
 @router.delete(
     "/{user_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(is_admin)],
     summary="Delete a user (Admin only)"
 )
 async def delete_user_admin(
     user_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(is_admin)
 ):
     """Delete a user (Admin only)."""
     success = await delete_user(db, user_id=user_id)
@@ -247,4 +348,5 @@ async def delete_user_admin(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    await audit_log.record("user.delete", "user", user_id, current_user.id)
     return None
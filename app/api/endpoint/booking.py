@@ -1,27 +1,85 @@
 # api/endpoints/booking.py
-from datetime import date, timedelta
+import base64
+from datetime import date, datetime, timedelta
 import os
-from sqlalchemy import select, and_
+import numpy as np
 from app.crud.booking import (
+    BookingConflictError,
+    assign_and_create_booking,
+    check_extension,
     create_booking,
+    create_bookings_bulk,
+    create_combination_booking,
+    find_table_combinations,
     get_available_tables,
+    get_available_tables_batch,
     get_booking_count,
     get_bookings,
+    modify_booking,
+    suggest_alternative_slots,
 )
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.crud.booking_series import (
+    add_series_exception,
+    cancel_series,
+    create_series,
+    get_series,
+    get_user_series,
+)
+from app.crud.occupancy import (
+    get_free_tables,
+    get_stale_free_tables,
+    occupancy_cache,
+)
+from app.crud.outbox import (
+    BOOKING_CANCELLED,
+    BOOKING_EXTENDED,
+    add_booking_events,
+)
+from app.crud.user_bookings import (
+    PAST,
+    UPCOMING,
+    get_booking_summary,
+    get_user_bookings,
+)
+from app.crud.waitlist import promote_waitlist
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
 from typing import List, Optional
 from app.models.booking import Booking
 from app.models.user import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.booking import (
+    AlternativeSlotsResponse,
     AvailabilityQuery,
+    BatchAvailabilityRequest,
+    BatchAvailabilityResult,
+    BookingAssign,
+    BookingCombinationCreate,
     BookingCreate,
     BookingFilter,
     BookingListResponse,
+    BookingPageResponse,
     BookingResponse,
+    BookingSeriesCreate,
+    BookingSeriesException,
+    BookingSeriesResponse,
+    BookingSummaryResponse,
+    BookingUpdate,
+    BulkBookingCreate,
+    BulkBookingResponse,
+    FreeTablesResponse,
+    OccupancyDayResponse,
 )
+from app.api.deps.pagination import CursorParams
 from app.database import get_db
-from app.schemas.table import TableResponse
+from app.schemas.table import TableCombinationResponse, TableResponse
+from app.tasks.audit import audit_log
+from app.utils.circuit_breaker import (
+    database_available,
+    db_breaker,
+    serves_stale,
+)
+from app.utils.recurrence import ensure_aware
 from app.utils.role import is_admin
 from app.utils.token import get_current_user
 
@@ -54,14 +112,81 @@ async def read_bookings(
     }
 
 
+@router.get("/me", response_model=BookingPageResponse)
+async def read_my_bookings(
+    scope: str = Query(UPCOMING, pattern=f"^({UPCOMING}|{PAST})$"),
+    page: dict = Depends(CursorParams),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The current user's bookings, upcoming soonest first or past latest
+    first. Pass ``next_cursor`` back as ``cursor`` for the next page.
+    """
+    try:
+        bookings, next_cursor = await get_user_bookings(
+            db, current_user.id, scope, page["size"], page["cursor"]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "data": [BookingResponse.from_orm(booking) for booking in bookings],
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/me/summary", response_model=BookingSummaryResponse)
+async def read_my_booking_summary(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Counts of the current user's upcoming, completed and cancelled
+    bookings. Bookings move from upcoming to completed within
+    ``BOOKING_STATS_ROLLOVER_SECONDS`` of their start.
+    """
+    stats = await get_booking_summary(db, current_user.id)
+    if stats is None:
+        return BookingSummaryResponse()
+    return BookingSummaryResponse.from_orm(stats)
+
+
+def _stale_availability(query: AvailabilityQuery, response: Response):
+    stale = get_stale_free_tables(
+        ensure_aware(query.start_time),
+        ensure_aware(query.end_time),
+        query.guest_count
+    )
+    if stale is None:
+        return None
+    tables, age = stale
+    response.headers["X-Data-Staleness"] = str(int(age))
+    return tables
+
+
 @router.get("/availability", response_model=List[TableResponse])
+@serves_stale
 async def check_availability(
+    response: Response,
     query: AvailabilityQuery = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    database_up: bool = Depends(database_available)
 ):
     """
     Check table availability for a given time and guest count.
+
+    While the database is unavailable the answer comes from the last
+    occupancy snapshot, with its age in seconds in ``X-Data-Staleness``.
     """
+    if not database_up:
+        tables = _stale_availability(query, response)
+        if tables is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Availability is temporarily unavailable",
+                headers={"Retry-After": str(db_breaker.retry_after())}
+            )
+        return tables
     try:
         available_tables = await get_available_tables(
             db,
@@ -75,6 +200,201 @@ async def check_availability(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid availability request: {str(e)}"
         )
+    except Exception:
+        tables = _stale_availability(query, response)
+        if tables is not None:
+            return tables
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=(
+                "An unexpected error occurred while checking availability. "
+                "Please try again later."
+            )
+        )
+
+
+@router.post(
+    "/availability/batch",
+    response_model=List[BatchAvailabilityResult]
+)
+async def check_availability_batch(
+    batch: BatchAvailabilityRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Check table availability for many (start time, guest count)
+    combinations at once. Results are returned in request order.
+    """
+    available = await get_available_tables_batch(
+        db,
+        [
+            (query.start_time, query.end_time, query.guest_count)
+            for query in batch.queries
+        ]
+    )
+    return [
+        {
+            "start_time": query.start_time,
+            "guest_count": query.guest_count,
+            "tables": tables
+        }
+        for query, tables in zip(batch.queries, available)
+    ]
+
+
+@router.get("/availability/occupancy", response_model=OccupancyDayResponse)
+async def read_day_occupancy(
+    day: date = Query(..., description="Day within the occupancy horizon"),
+    guest_count: Optional[int] = Query(None, gt=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Free tables in every slot of one day, for the floor view.
+    """
+    grid = await occupancy_cache.get_grid(db)
+    day_index = (day - grid.origin.date()).days
+    if not 0 <= day_index < grid.days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Day must be within the next {grid.days} days"
+        )
+    free = grid.free_bitmap(day_index, guest_count)
+    return {
+        "day": day,
+        "slot_minutes": grid.slot_minutes,
+        "table_ids": grid.table_ids.tolist(),
+        "free_counts": free.sum(axis=0).tolist(),
+        "bitmap": base64.b64encode(
+            np.packbits(free, axis=1).tobytes()
+        ).decode()
+    }
+
+
+@router.get("/availability/free", response_model=FreeTablesResponse)
+async def read_free_tables(
+    start_time: datetime = Query(...),
+    end_time: datetime = Query(...),
+    guest_count: Optional[int] = Query(None, gt=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Tables free for the whole of an arbitrary time range, answered from
+    the occupancy grid.
+    """
+    start_time, end_time = ensure_aware(start_time), ensure_aware(end_time)
+    if end_time <= start_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End time must be after start time"
+        )
+    table_ids = await get_free_tables(db, start_time, end_time, guest_count)
+    if table_ids is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Time range is outside the occupancy horizon"
+        )
+    return {
+        "start_time": start_time,
+        "end_time": end_time,
+        "table_ids": table_ids
+    }
+
+
+@router.get("/availability/occupancy/snapshot")
+async def read_occupancy_snapshot(db: AsyncSession = Depends(get_db)):
+    """
+    The whole occupancy grid in its compact serialised form, for caches.
+    """
+    grid = await occupancy_cache.get_grid(db)
+    return Response(
+        content=grid.to_bytes(),
+        media_type="application/octet-stream"
+    )
+
+
+async def _alternative_slots(
+    db: AsyncSession,
+    start_time,
+    guest_count: Optional[int] = None,
+    table_id: Optional[int] = None
+) -> dict:
+    def as_suggestions(slots):
+        return [
+            {
+                "table_id": table.id,
+                "capacity": table.capacity,
+                "start_time": start,
+                "end_time": end
+            }
+            for table, start, end in slots
+        ]
+
+    alternatives = {"same_table": [], "any_table": []}
+    if table_id is not None:
+        alternatives["same_table"] = as_suggestions(
+            await suggest_alternative_slots(db, start_time, table_id=table_id)
+        )
+    alternatives["any_table"] = as_suggestions(
+        await suggest_alternative_slots(db, start_time, guest_count)
+    )
+    return alternatives
+
+
+@router.get("/availability/alternatives",
+            response_model=AlternativeSlotsResponse)
+async def check_alternative_slots(
+    query: AvailabilityQuery = Depends(),
+    table_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Suggest the nearest free start times around the requested time,
+    on the given table and on any table that fits the party.
+    """
+    try:
+        return await _alternative_slots(
+            db, query.start_time, query.guest_count, table_id
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=(
+                "An unexpected error occurred while checking availability. "
+                "Please try again later."
+            )
+        )
+
+
+@router.get(
+    "/availability/combinations",
+    response_model=List[TableCombinationResponse]
+)
+async def check_combination_availability(
+    query: AvailabilityQuery = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Find combinations of tables that can seat a large party together.
+
+    The cheapest free combination of each table group is returned, best
+    (fewest spare seats) first.
+    """
+    if not query.guest_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="guest_count is required to search for combinations"
+        )
+    try:
+        options = await find_table_combinations(
+            db,
+            start_time=query.start_time,
+            end_time=query.end_time,
+            guest_count=query.guest_count
+        )
+        return [
+            {"tables": tables, "total_capacity": total}
+            for tables, total in options
+        ]
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -86,7 +406,13 @@ async def check_availability(
 
 
 # for a given time range and guest count
-@router.post("/book", response_model=BookingResponse)
+@router.post(
+    "/book",
+    response_model=BookingResponse,
+    responses={
+        409: {"description": "Table taken; nearby free slots are suggested"}
+    }
+)
 async def book_table(
     booking_data: BookingCreate,
     current_user: User = Depends(get_current_user),
@@ -103,6 +429,21 @@ async def book_table(
             booking_data.special_requests
         )
         return booking
+    except BookingConflictError as e:
+        await db.rollback()
+        alternatives = await _alternative_slots(
+            db,
+            booking_data.start_time,
+            booking_data.guest_count,
+            booking_data.table_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": f"Booking failed: {str(e)}",
+                "alternatives": jsonable_encoder(alternatives)
+            }
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -115,6 +456,195 @@ async def book_table(
         )
 
 
+@router.post("/book/auto", response_model=BookingResponse)
+async def book_best_table(
+    booking_data: BookingAssign,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a booking on a table chosen by the server.
+
+    The smallest free table that fits the party is picked; among equal
+    capacities the one that leaves the least fragmented day wins.
+    """
+    try:
+        booking = await assign_and_create_booking(
+            db,
+            current_user.id,
+            booking_data.start_time,
+            booking_data.guest_count,
+            booking_data.special_requests
+        )
+        return booking
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Booking failed: {str(e)}"
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while creating the booking."
+        )
+
+
+@router.post("/book/combination", response_model=List[BookingResponse])
+async def book_table_combination(
+    booking_data: BookingCombinationCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Book several combinable tables for one party at once"""
+    try:
+        return await create_combination_booking(
+            db,
+            current_user.id,
+            booking_data.table_ids,
+            booking_data.start_time,
+            booking_data.guest_count,
+            booking_data.special_requests
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Booking failed: {str(e)}"
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while creating the booking."
+        )
+
+
+@router.post("/book/bulk", response_model=BulkBookingResponse)
+async def book_tables_bulk(
+    bulk_data: BulkBookingCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many bookings in one transaction.
+
+    Every item is reported individually: items that conflict with an
+    existing booking, or with an earlier item of the same request, are
+    skipped while the rest are booked.
+    """
+    try:
+        outcome = await create_bookings_bulk(
+            db,
+            current_user.id,
+            bulk_data.bookings
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bulk booking failed: {str(e)}"
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while creating the bookings."
+        )
+
+    results = [
+        {
+            "index": index,
+            "success": booking is not None,
+            "booking": BookingResponse.from_orm(booking) if booking else None,
+            "detail": detail
+        }
+        for index, (booking, detail) in enumerate(outcome)
+    ]
+    booked = sum(1 for result in results if result["success"])
+    return {
+        "results": results,
+        "booked": booked,
+        "conflicts": len(results) - booked
+    }
+
+
+@router.post("/series", response_model=BookingSeriesResponse)
+async def book_series(
+    series_data: BookingSeriesCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a recurring booking (weekly or monthly, with exceptions).
+
+    Occurrences inside the booking horizon are created as regular
+    bookings right away; later ones are added by a background job.
+    """
+    try:
+        return await create_series(db, current_user.id, series_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Booking failed: {str(e)}"
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while creating the series."
+        )
+
+
+@router.get("/series", response_model=List[BookingSeriesResponse])
+async def read_my_series(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the recurring bookings of the current user"""
+    return await get_user_series(db, current_user.id)
+
+
+async def _get_owned_series(db, series_id, current_user):
+    series = await get_series(db, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Series not found")
+
+    if series.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403,
+            detail="You do not have permission to change this series."
+        )
+
+    if not series.is_active:
+        raise HTTPException(
+            status_code=400,
+            detail="This series is already cancelled."
+        )
+    return series
+
+
+@router.post(
+    "/series/{series_id}/exceptions",
+    response_model=BookingSeriesResponse
+)
+async def skip_series_date(
+    series_id: int,
+    exception: BookingSeriesException,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Skip a single date of a recurring booking"""
+    series = await _get_owned_series(db, series_id, current_user)
+    return await add_series_exception(db, series, exception.exception_date)
+
+
+@router.post("/series/{series_id}/cancel", response_model=dict)
+async def cancel_series_endpoint(
+    series_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel a recurring booking and its upcoming occurrences"""
+    series = await _get_owned_series(db, series_id, current_user)
+    await cancel_series(db, series)
+    return {"message": f"Series {series_id} has been cancelled."}
+
+
 @router.post("/bookings/{booking_id}/cancel", response_model=dict)
 async def cancel_and_free_booking_endpoint(
     booking_id: int,
@@ -139,8 +669,14 @@ async def cancel_and_free_booking_endpoint(
         )
 
     booking.status = "cancelled"
+    await add_booking_events(db, BOOKING_CANCELLED, [booking])
     await db.commit()
     await db.refresh(booking)
+    occupancy_cache.booking_cancelled(booking)
+    await audit_log.record(
+        "booking.cancel", "booking", booking_id, current_user.id
+    )
+    await promote_waitlist(db, booking.table_id, booking.start_time)
     return {
         "message": (
             f"Booking {booking_id} has been cancelled and the table is now "
@@ -149,6 +685,67 @@ async def cancel_and_free_booking_endpoint(
     }
 
 
+@router.put(
+    "/bookings/{booking_id}",
+    response_model=BookingResponse,
+    responses={
+        409: {"description": "Target slot taken; alternatives are suggested"}
+    }
+)
+async def modify_booking_endpoint(
+    booking_id: int,
+    booking_update: BookingUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Move a booking to another table, time or party size in one step"""
+    booking = await db.get(Booking, booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    if booking.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403,
+            detail="You are not authorized to modify this booking."
+        )
+
+    old_table_id, old_start_time = booking.table_id, booking.start_time
+    old_guest_count = booking.guest_count
+    try:
+        booking = await modify_booking(db, booking, booking_update)
+    except BookingConflictError as e:
+        await db.rollback()
+        alternatives = await _alternative_slots(
+            db,
+            booking_update.start_time or old_start_time,
+            booking_update.guest_count or old_guest_count,
+            booking_update.table_id or old_table_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": f"Modification failed: {str(e)}",
+                "alternatives": jsonable_encoder(alternatives)
+            }
+        )
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Modification failed: {str(e)}"
+        )
+
+    await audit_log.record(
+        "booking.modify", "booking", booking_id, current_user.id,
+        booking_update.dict(exclude_unset=True)
+    )
+    if (booking.table_id, booking.start_time) != (
+        old_table_id, old_start_time
+    ):
+        await promote_waitlist(db, old_table_id, old_start_time)
+    return booking
+
+
 @router.post("/bookings/{booking_id}/extend", response_model=dict)
 async def extend_booking(
     booking_id: int,
@@ -173,21 +770,12 @@ async def extend_booking(
             detail="Only confirmed bookings can be extended."
         )
 
-    new_end_time = booking.end_time + timedelta(minutes=extension_minutes)
-
-    conflicting_booking = await db.execute(
-        select(Booking).where(
-            and_(
-                Booking.table_id == booking.table_id,
-                Booking.status == "confirmed",
-                Booking.start_time < new_end_time,
-                Booking.end_time > booking.end_time,
-                Booking.id != booking.id
-            )
-        )
+    # Other bookings and series occurrences not materialised yet, checked
+    # under the table's lock
+    new_end_time, _, busy = await check_extension(
+        db, booking, timedelta(minutes=int(extension_minutes))
     )
-    conflicting_booking_result = conflicting_booking.scalars().first()
-    if conflicting_booking_result:
+    if busy:
         raise HTTPException(
             status_code=400,
             detail=(
@@ -196,9 +784,16 @@ async def extend_booking(
             )
         )
 
+    old_end_time = booking.end_time
     booking.end_time = new_end_time
+    await add_booking_events(db, BOOKING_EXTENDED, [booking])
     await db.commit()
     await db.refresh(booking)
+    occupancy_cache.booking_extended(booking, old_end_time)
+    await audit_log.record(
+        "booking.extend", "booking", booking_id, current_user.id,
+        {"end_time": {"from": old_end_time, "to": new_end_time}}
+    )
 
     return {
         "message": f"Booking {booking_id} has been extended to {new_end_time}."
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+
+from app.core.config import deadline_settings
+from app.schemas.deadline import DeadlineMetricsResponse
+from app.utils.deadline import deadline_metrics
+from app.utils.role import is_admin
+
+router = APIRouter(tags=["deadlines"], dependencies=[Depends(is_admin)])
+
+
+@router.get("/metrics", response_model=DeadlineMetricsResponse)
+async def read_deadline_metrics():
+    """Deadline counters of the process answering the request"""
+    return {
+        "requests_total": deadline_metrics.requests_total,
+        "deadline_exceeded_total": deadline_metrics.deadline_exceeded_total,
+        "statement_timeouts_total": deadline_metrics.statement_timeouts_total,
+        "lock_timeouts_total": deadline_metrics.lock_timeouts_total,
+        "disconnects_total": deadline_metrics.disconnects_total,
+        "unavailable_by_route": dict(deadline_metrics.unavailable_by_route),
+        "deadlines_ms": {
+            "*": deadline_settings.DEFAULT_MS,
+            **deadline_settings.ROUTES,
+        },
+    }
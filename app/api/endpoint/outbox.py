@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import outbox_settings
+from app.crud.outbox import get_outbox_metrics
+from app.database import get_db
+from app.schemas.outbox import OutboxMetricsResponse
+from app.tasks.outbox import outbox_dispatcher
+from app.utils.role import is_admin
+
+router = APIRouter(tags=["outbox"], dependencies=[Depends(is_admin)])
+
+
+@router.get("/metrics", response_model=OutboxMetricsResponse)
+async def read_outbox_metrics(db: AsyncSession = Depends(get_db)):
+    """
+    Delivery lag of the booking event outbox. Dispatcher counters are
+    those of the process answering the request.
+    """
+    metrics = await get_outbox_metrics(db)
+    return {
+        **metrics,
+        "webhooks": len(outbox_settings.WEBHOOK_URLS),
+        "delivered_total": outbox_dispatcher.delivered_total,
+        "failed_attempts_total": outbox_dispatcher.failed_attempts_total,
+        "last_delivery_at": outbox_dispatcher.last_delivery_at,
+        "last_error": outbox_dispatcher.last_error,
+    }
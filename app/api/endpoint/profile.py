@@ -0,0 +1,42 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.schemas.profile import ProfileSummary
+from app.utils.profiling import collapse, profile_store
+from app.utils.role import is_admin
+
+router = APIRouter(tags=["profiles"], dependencies=[Depends(is_admin)])
+
+
+@router.get("/", response_model=List[ProfileSummary])
+async def read_profiles():
+    """
+    Request profiles kept by this process, newest first. Send the
+    profiling header with a request to add one.
+    """
+    return profile_store.list()
+
+
+@router.get("/collapsed", response_class=PlainTextResponse)
+async def read_merged_profile(
+    path: Optional[str] = Query(None, description="Only this request path")
+):
+    """Kept profiles merged into collapsed-stack (flamegraph) text"""
+    return collapse(
+        profile for profile in profile_store.list()
+        if path is None or profile["path"] == path
+    )
+
+
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+async def read_profile(profile_id: int):
+    """One profile as collapsed-stack (flamegraph) text"""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return collapse([profile])
@@ -0,0 +1,26 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, status
+
+from app.schemas.slow_query import SlowQueryResponse
+from app.tasks.slow_queries import slow_query_log
+from app.utils.role import is_admin
+
+router = APIRouter(tags=["slow-queries"], dependencies=[Depends(is_admin)])
+
+
+@router.get("/", response_model=List[SlowQueryResponse])
+async def read_slow_queries(
+    limit: Optional[int] = Query(None, ge=1, le=500)
+):
+    """
+    Statements slower than the threshold in this process, by total time.
+    Plans are captured in the background and may lag a few seconds.
+    """
+    return slow_query_log.top(limit)
+
+
+@router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries():
+    """Forget the recorded statements, e.g. after a deploy"""
+    slow_query_log.reset()
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
+from app.crud.reassignment import reassign_table_bookings
 from app.crud.table import (
     create_table,
     get_table,
@@ -13,10 +14,13 @@ from app.crud.table import (
 from app.database import get_db
 from app.schemas.table import (
     TableCreate,
+    TableReassignmentResponse,
     TableResponse,
     TableUpdate,
     TableStatus
 )
+from app.models.user import User
+from app.tasks.audit import audit_log
 from app.utils.role import is_admin
 
 router = APIRouter(tags=["tables"])
@@ -83,6 +87,7 @@ async def update_existing_table(
     table_id: int,
     table: TableUpdate,
     db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(is_admin)
 ):
     db_table = await update_table(db, table_id, table)
     if not db_table:
@@ -90,22 +95,80 @@ async def update_existing_table(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Table not found"
         )
+    await audit_log.record(
+        "table.update", "table", table_id, current_user.id,
+        table.dict(exclude_unset=True)
+    )
     return db_table
 
 
-@router.patch("/{table_id}/status/{status}")
+def _reassignment_report(message, moves, unplaced):
+    return {
+        "message": message,
+        "moved": [
+            {
+                "booking_id": booking_id,
+                "from_table_id": from_table_id,
+                "to_table_id": to_table_id
+            }
+            for booking_id, from_table_id, to_table_id in moves
+        ],
+        "unplaced": unplaced
+    }
+
+
+@router.patch(
+    "/{table_id}/status/{status}",
+    response_model=TableReassignmentResponse
+)
 async def change_table_status(
     table_id: int,
     status: TableStatus,
     db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(is_admin)
 ):
+    """
+    Change a table's status. Putting a table into maintenance moves its
+    upcoming bookings to other free tables.
+    """
     db_table = await set_table_status(db, table_id, status)
     if not db_table:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Table not found"
         )
-    return {"message": f"Table status updated to {status}"}
+    moves, unplaced = [], []
+    if status == TableStatus.MAINTENANCE:
+        moves, unplaced = await reassign_table_bookings(db, [table_id])
+    await audit_log.record(
+        "table.status", "table", table_id, current_user.id,
+        {"status": status, "moved": len(moves), "unplaced": len(unplaced)}
+    )
+    return _reassignment_report(
+        f"Table status updated to {status}", moves, unplaced
+    )
+
+
+@router.post(
+    "/{table_id}/reassign",
+    response_model=TableReassignmentResponse,
+    dependencies=[Depends(is_admin)]
+)
+async def reassign_bookings(
+    table_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    """Move the upcoming bookings of a table to other free tables"""
+    db_table = await get_table(db, table_id)
+    if not db_table:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Table not found"
+        )
+    moves, unplaced = await reassign_table_bookings(db, [table_id])
+    return _reassignment_report(
+        f"{len(moves)} bookings moved from table {table_id}", moves, unplaced
+    )
 
 
 @router.delete(
@@ -115,6 +178,7 @@ async def change_table_status(
 async def delete_existing_table(
     table_id: int,
     db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(is_admin)
 ):
     db_table = await delete_table(db, table_id)
     if not db_table:
@@ -122,3 +186,4 @@ async def delete_existing_table(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Table not found"
         )
+    await audit_log.record("table.delete", "table", table_id, current_user.id)
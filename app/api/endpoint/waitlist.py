@@ -0,0 +1,121 @@
+import asyncio
+import json
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.waitlist import (
+    cancel_waitlist_entry,
+    confirm_waitlist_hold,
+    create_waitlist_entry,
+    get_user_waitlist,
+    get_waitlist_entry,
+)
+from app.database import get_db
+from app.models.user import User
+from app.schemas.waitlist import WaitlistCreate, WaitlistResponse
+from app.tasks.waitlist import waitlist_notifier
+from app.utils.token import get_current_user
+
+router = APIRouter(tags=["waitlist"])
+
+
+@router.post(
+    "/",
+    response_model=WaitlistResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def join_waitlist(
+    entry_data: WaitlistCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Wait for a table to free up.
+
+    When a matching booking is cancelled the guest is booked (or the slot
+    is held for confirmation) and notified on `/waitlist/events`.
+    """
+    return await create_waitlist_entry(db, current_user.id, entry_data)
+
+
+@router.get("/", response_model=List[WaitlistResponse])
+async def read_my_waitlist(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await get_user_waitlist(db, current_user.id)
+
+
+@router.get("/events")
+async def waitlist_events(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """Server-sent events for the current user's waitlist entries"""
+    user_id = current_user.id
+    queue = waitlist_notifier.subscribe(user_id)
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                    yield f"data: {json.dumps(event)}\n\n"
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            waitlist_notifier.unsubscribe(user_id, queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+async def _get_owned_entry(db, entry_id, current_user):
+    entry = await get_waitlist_entry(db, entry_id)
+    if not entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Waitlist entry not found"
+        )
+    if entry.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to change this entry."
+        )
+    return entry
+
+
+@router.post("/{entry_id}/confirm", response_model=WaitlistResponse)
+async def confirm_waitlist_entry(
+    entry_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Keep a booking that was held for you"""
+    entry = await _get_owned_entry(db, entry_id, current_user)
+    try:
+        return await confirm_waitlist_hold(db, entry)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/{entry_id}/cancel", response_model=WaitlistResponse)
+async def leave_waitlist(
+    entry_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Leave the waitlist, releasing a held booking"""
+    entry = await _get_owned_entry(db, entry_id, current_user)
+    try:
+        return await cancel_waitlist_entry(db, entry)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -0,0 +1,140 @@
+"""
+Compare the slot inventory with the advisory lock path under contention.
+
+Creates a throwaway user and table, fires concurrent booking attempts at
+overlapping and disjoint times through ``create_booking`` in both modes and
+prints throughput and latency. Everything it creates is removed afterwards.
+
+    python -m app.benchmarks.inventory --requests 200 --concurrency 10
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete
+
+from app.crud.booking import BookingConflictError, create_booking
+from app.crud.inventory import materialize_slots
+from app.database import async_session, engine
+from app.models.booking import Booking
+from app.models.table import Table
+from app.models.table_slot import TableSlot
+from app.models.user import User
+
+
+async def _attempt(user_id, table_id, start_time, latencies):
+    async with async_session() as db:
+        began = time.perf_counter()
+        try:
+            await create_booking(db, user_id, table_id, start_time, 2)
+            booked = True
+        except BookingConflictError:
+            booked = False
+        latencies.append(time.perf_counter() - began)
+        return booked
+
+
+async def _run(mode, user_id, table_id, starts, concurrency):
+    async with async_session() as db:
+        table = await db.get(Table, table_id)
+        table.inventory_mode = mode == "inventory"
+        await db.commit()
+        await db.execute(delete(Booking).where(Booking.table_id == table_id))
+        await db.commit()
+        if mode == "inventory":
+            await materialize_slots(db, [table_id])
+
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def bounded(start_time):
+        async with gate:
+            return await _attempt(user_id, table_id, start_time, latencies)
+
+    began = time.perf_counter()
+    results = await asyncio.gather(*(bounded(start) for start in starts))
+    elapsed = time.perf_counter() - began
+
+    latencies.sort()
+    print(
+        f"{mode:>9}: {len(starts) / elapsed:8.1f} req/s  "
+        f"booked={sum(results):4d}  conflicts={len(results) - sum(results):4d}"
+        f"  p50={statistics.median(latencies) * 1000:7.1f}ms"
+        f"  p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f}ms"
+    )
+
+
+async def main(args):
+    random.seed(args.seed)
+    day = (
+        datetime.now(ZoneInfo("UTC")) + timedelta(days=2)
+    ).replace(hour=8, minute=0, second=0, microsecond=0)
+    # Quarter-hour starts: with few days most requests collide on purpose
+    starts = [
+        day + timedelta(minutes=15 * random.randrange(48 * args.days))
+        for _ in range(args.requests)
+    ]
+
+    async with async_session() as db:
+        user = User(
+            email=f"bench-{time.time_ns()}@example.com",
+            hashed_password="-",
+            is_active=True
+        )
+        table = Table(capacity=4, location="benchmark")
+        # Other tables and their bookings make availability checks realistic
+        others = [
+            Table(capacity=4, location="benchmark")
+            for _ in range(args.tables)
+        ]
+        db.add_all([user, table, *others])
+        await db.commit()
+        user_id, table_id = user.id, table.id
+        other_ids = [other.id for other in others]
+        db.add_all([
+            Booking(
+                user_id=user_id,
+                table_id=other_id,
+                start_time=day + timedelta(hours=hour),
+                end_time=day + timedelta(hours=hour + 2),
+                guest_count=2,
+                status="confirmed"
+            )
+            for other_id in other_ids
+            for hour in range(0, 24 * args.days, 3)
+        ])
+        await db.commit()
+
+    try:
+        for mode in ("lock", "inventory"):
+            await _run(mode, user_id, table_id, starts, args.concurrency)
+    finally:
+        async with async_session() as db:
+            table_ids = [table_id, *other_ids]
+            await db.execute(
+                delete(Booking).where(Booking.table_id.in_(table_ids))
+            )
+            await db.execute(
+                delete(TableSlot).where(TableSlot.table_id.in_(table_ids))
+            )
+            await db.execute(delete(Table).where(Table.id.in_(table_ids)))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    engine.echo = False
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,294 @@
+"""
+Check that the planner serves the hot queries from the intended indexes.
+
+Seeds a large dataset (the benchmark suite's), runs EXPLAIN on the
+availability query, the booking list and count for every combination of
+``BookingFilter`` fields, the user lookup and the rollup refresh, and
+checks the shape of each plan:
+
+* no sequential scan on ``bookings`` or ``users``, except where a check
+  allows it (a LIMIT that stops early, a COUNT that has to read the
+  whole table);
+* one of the expected indexes is used, where a check names them;
+* the estimated total cost stays under the check's bound. Checks that
+  read the whole table are bounded relative to one plain pass over
+  ``bookings``, which follows its size and bloat; the others absolutely.
+
+Failing checks print their plan and the command exits with status 1, so
+it can gate changes to the models' indexes or to ``app.crud.statements``.
+Run it against a local database only; what it seeds is removed. The
+test suite runs the same checks on a smaller dataset
+(``tests/test_query_plans.py``).
+
+    python -m app.benchmarks.query_plans --bookings 200000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, select
+
+from app.benchmarks.suite import remove_dataset, seed_dataset
+from app.crud import statements
+from app.crud.analytics import affected_days
+from app.database import async_session, engine
+from app.models.booking import Booking
+from app.schemas.booking import BookingFilter
+
+# Small enough that a sequential scan is the right plan
+SMALL_TABLES = ("tables", "rollup_dirty_days")
+INDEX_SCANS = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+USER_INDEXES = ("ix_bookings_user_id", "idx_booking_composite")
+DATE_INDEXES = ("idx_booking_date_range", "ix_bookings_start_time")
+STATUS_INDEXES = ("ix_bookings_status", "idx_booking_status_created")
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    build: Callable  # Seeded dataset -> statement
+    max_cost: float
+    indexes: Tuple[str, ...] = ()  # One of them must be used
+    allow_seq_scan: bool = False
+    full_scan: bool = False  # max_cost is a multiple of a full pass
+
+
+def _filter_checks():
+    """List and count checks for every combination of booking filters"""
+    checks = []
+    for user, status, day in itertools.product((False, True), repeat=3):
+        label = "+".join(
+            field for field, used in
+            (("user_id", user), ("status", status), ("booking_date", day))
+            if used
+        ) or "no filter"
+
+        # Cancelled bookings, one in ten, as an admin would filter them;
+        # a status most bookings have is rightly read in a full pass
+        def filters(data, user=user, status=status, day=day):
+            return BookingFilter(
+                user_id=data["users"][1] if user else None,
+                status="cancelled" if status else None,
+                booking_date=data["day"].date() if day else None,
+            )
+
+        if user:
+            indexes = USER_INDEXES
+        elif day:
+            indexes = DATE_INDEXES
+        elif status:
+            indexes = STATUS_INDEXES
+        else:
+            indexes = ()
+        # A user's or a day's bookings are few whatever the history (a
+        # day's grow with the number of tables). Without either, the page
+        # is the first matching rows read, which a sequential scan finds
+        # early; the count reads every row of the status from its index,
+        # or the whole table without a filter. A page of a day's bookings
+        # of one status may need the whole day read to fill.
+        selective = user or day
+        checks.append(PlanCheck(
+            f"bookings list ({label})",
+            lambda data, filters=filters: statements.bookings(
+                0, 100, filters(data)
+            ),
+            max_cost=2000 if day and not user else 200,
+            indexes=indexes if selective else (),
+            allow_seq_scan=not selective,
+        ))
+        checks.append(PlanCheck(
+            f"bookings count ({label})",
+            lambda data, filters=filters: statements.booking_count(
+                filters(data)
+            ),
+            max_cost=200 if user else 2000 if day else 0.5 if status else 1.5,
+            indexes=indexes,
+            allow_seq_scan=not (selective or status),
+            full_scan=not selective,
+        ))
+    return checks
+
+
+# Availability probes the bookings of each table, so its cost follows
+# the number of tables (one per 200 seeded bookings)
+CHECKS = [
+    PlanCheck(
+        "availability",
+        lambda data: statements.available_tables(
+            data["day"], data["day"] + timedelta(hours=2), 4
+        ),
+        max_cost=3000,
+    ),
+    PlanCheck(
+        "availability (any size)",
+        lambda data: statements.available_tables(
+            data["day"], data["day"] + timedelta(hours=2)
+        ),
+        max_cost=3000,
+    ),
+    PlanCheck(
+        "user by email",
+        lambda data: statements.user_by_email(data["email"]),
+        max_cost=20,
+        indexes=("idx_user_email", "ix_users_email"),
+    ),
+    # A refresh tick reads the minute of changes after the last one
+    PlanCheck(
+        "rollup refresh",
+        lambda data: affected_days(
+            data["refreshed_at"], data["refreshed_at"] + timedelta(minutes=1)
+        ),
+        max_cost=100,
+        indexes=("idx_booking_updated_at",),
+    ),
+    *_filter_checks(),
+]
+
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _nodes(child)
+
+
+def evaluate(check: PlanCheck, plan: dict, full_pass: float) -> list:
+    """Reasons the plan fails the check, empty when it passes"""
+    failures = []
+    nodes = list(_nodes(plan))
+    if not check.allow_seq_scan:
+        scanned = {
+            node["Relation Name"] for node in nodes
+            if node["Node Type"] == "Seq Scan"
+            and node["Relation Name"] not in SMALL_TABLES
+        }
+        if scanned:
+            failures.append(f"seq scan on {', '.join(sorted(scanned))}")
+    used = {
+        node["Index Name"] for node in nodes
+        if node["Node Type"] in INDEX_SCANS
+    }
+    if check.indexes and not used & set(check.indexes):
+        failures.append(
+            f"none of {', '.join(check.indexes)} used"
+            f" (used: {', '.join(sorted(used)) or 'no index'})"
+        )
+    bound = check.max_cost * (full_pass if check.full_scan else 1)
+    if plan["Total Cost"] > bound:
+        failures.append(f"cost {plan['Total Cost']:.0f} over {bound:.0f}")
+    return failures
+
+
+def _sql(conn, statement) -> str:
+    # Literal values give the plan of the first executions; prepared
+    # statements may switch to a generic plan later
+    return str(statement.compile(
+        dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+    ))
+
+
+async def _explain(conn, sql: str) -> dict:
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def seed_plan_dataset(bookings: int) -> dict:
+    """The benchmark suite's dataset and the values the checks query;
+    ``remove_dataset`` removes it"""
+    data = await seed_dataset(bookings)
+    # Tomorrow evening, inside the seeded upcoming bookings
+    data["day"] = datetime.now(ZoneInfo("UTC")).replace(
+        hour=19, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    data["email"] = f"bench-{data['tag']}-1@example.com"
+    # updated_at is the database's local time, like the watermarks
+    async with async_session() as db:
+        data["refreshed_at"] = await db.scalar(select(func.localtimestamp()))
+    return data
+
+
+async def full_pass_cost(conn) -> float:
+    """Estimated cost of one plain pass over ``bookings``"""
+    plan = await _explain(conn, _sql(
+        conn, select(func.count()).select_from(Booking)
+    ))
+    return plan["Total Cost"]
+
+
+async def explain_check(
+    conn,
+    check: PlanCheck,
+    data: dict,
+    full_pass: float
+) -> Tuple[dict, List[str], List[str]]:
+    """Plan of the check's statement, the reasons it fails the check and
+    the plan as text"""
+    sql = _sql(conn, check.build(data))
+    plan = await _explain(conn, sql)
+    text_plan = await conn.exec_driver_sql(f"EXPLAIN {sql}")
+    return (
+        plan,
+        evaluate(check, plan, full_pass),
+        [line for (line,) in text_plan]
+    )
+
+
+async def run(args) -> int:
+    data = await seed_plan_dataset(args.bookings)
+    checks = [
+        check for check in CHECKS
+        if not args.only or args.only.lower() in check.name.lower()
+    ]
+    failed = 0
+    try:
+        async with async_session() as db:
+            conn = await db.connection()
+            full_pass = await full_pass_cost(conn)
+            for check in checks:
+                plan, failures, text_plan = await explain_check(
+                    conn, check, data, full_pass
+                )
+                failed += bool(failures)
+                print(
+                    f"{'FAIL' if failures else 'ok':<5}{check.name:<48}"
+                    f"cost {plan['Total Cost']:>10.1f}"
+                    + (f"  {'; '.join(failures)}" if failures else "")
+                )
+                if failures or args.verbose:
+                    for line in text_plan:
+                        print(f"       {line}")
+    finally:
+        await remove_dataset(data)
+        await engine.dispose()
+    print(f"{failed} of {len(checks)} checks failed" if failed else
+          "All plans as expected")
+    return 1 if failed else 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bookings", type=int, default=200000)
+    parser.add_argument(
+        "--only", default=None, help="Run the checks whose name contains this"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Print every plan"
+    )
+    args = parser.parse_args(argv)
+    engine.echo = False
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
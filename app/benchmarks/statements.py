@@ -0,0 +1,147 @@
+"""
+Per-call CPU of the hot statements, ad hoc versus the lambda registry.
+
+For each statement it measures preparing it (building the statement and
+its cache key, which is what the compiled cache is looked up by) and the
+whole ``session.execute`` call against the database, in CPU time of this
+process. The ad hoc builders are the ones the crud modules used before
+``app.crud.statements``. Read-only.
+
+    python -m app.benchmarks.statements --calls 2000
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import between, exists, func, select
+
+from app.crud import statements
+from app.database import async_session, engine
+from app.models.booking import Booking
+from app.models.table import Table, TableStatus
+from app.models.user import User
+from app.schemas.booking import BookingFilter
+
+
+def _adhoc_user_by_email(email):
+    return select(User).where(User.email == email)
+
+
+def _adhoc_available_tables(start_time, end_time, guest_count):
+    query = select(Table).where(
+        Table.is_active,
+        Table.status == TableStatus.AVAILABLE,
+    ).where(
+        ~exists().where(
+            Booking.table_id == Table.id,
+            Booking.status == "confirmed",
+            Booking.start_time < end_time,
+            Booking.end_time > start_time
+        )
+    )
+    if guest_count:
+        query = query.where(Table.capacity >= guest_count)
+    return query
+
+
+def _adhoc_filters(query, filters):
+    if filters.user_id is not None:
+        query = query.where(Booking.user_id == filters.user_id)
+    if filters.status is not None:
+        query = query.where(Booking.status == filters.status)
+    if filters.booking_date is not None:
+        query = query.where(
+            between(
+                Booking.start_time,
+                datetime.combine(filters.booking_date, datetime.min.time()),
+                datetime.combine(filters.booking_date, datetime.max.time())
+            )
+        )
+    return query
+
+
+def _adhoc_bookings(skip, limit, filters):
+    return _adhoc_filters(select(Booking), filters).offset(skip).limit(limit)
+
+
+def _adhoc_booking_count(filters):
+    return _adhoc_filters(select(func.count(Booking.id)), filters)
+
+
+def _cases(email):
+    start = datetime.now(ZoneInfo("UTC")) + timedelta(days=1)
+    end = start + timedelta(hours=2)
+    filters = BookingFilter(
+        user_id=1, status="confirmed", booking_date=date.today()
+    )
+    return [
+        (
+            "user_by_email",
+            lambda: _adhoc_user_by_email(email),
+            lambda: statements.user_by_email(email),
+        ),
+        (
+            "available_tables",
+            lambda: _adhoc_available_tables(start, end, 4),
+            lambda: statements.available_tables(start, end, 4),
+        ),
+        (
+            "bookings",
+            lambda: _adhoc_bookings(0, 100, filters),
+            lambda: statements.bookings(0, 100, filters),
+        ),
+        (
+            "booking_count",
+            lambda: _adhoc_booking_count(filters),
+            lambda: statements.booking_count(filters),
+        ),
+    ]
+
+
+def _prepare_us(build, calls):
+    build()._generate_cache_key()
+    began = time.process_time()
+    for _ in range(calls):
+        build()._generate_cache_key()
+    return (time.process_time() - began) / calls * 1e6
+
+
+async def _execute_us(db, build, calls):
+    (await db.execute(build())).all()
+    began = time.process_time()
+    for _ in range(calls):
+        (await db.execute(build())).all()
+    return (time.process_time() - began) / calls * 1e6
+
+
+async def main(args):
+    engine.echo = False
+    async with async_session() as db:
+        email = await db.scalar(select(User.email).limit(1)) \
+            or "nobody@example.com"
+        print(f"{'statement':<18}{'':>10}{'ad hoc':>10}{'registry':>10}")
+        for name, adhoc, registry in _cases(email):
+            for label, measure in (
+                ("prepare", lambda b: _prepare_us(b, args.calls)),
+                ("execute", None),
+            ):
+                if measure is None:
+                    before = await _execute_us(db, adhoc, args.db_calls)
+                    after = await _execute_us(db, registry, args.db_calls)
+                else:
+                    before, after = measure(adhoc), measure(registry)
+                print(
+                    f"{name:<18}{label:>10}{before:>9.1f}u{after:>9.1f}u"
+                    f"  ({before / after:.1f}x)"
+                )
+            await db.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--db-calls", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
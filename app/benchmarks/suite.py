@@ -0,0 +1,314 @@
+"""
+Micro-benchmarks of the crud and auth hot paths, with a regression gate.
+
+For each dataset size it seeds throwaway users, tables and bookings,
+times every case below in rounds of calls on one connection, and removes
+what it created. The median time per call of each case and size is
+written to ``--output`` as JSON. With ``--baseline`` the results are
+compared against a stored run: a case is a regression when it is more
+than ``--threshold`` slower (and more than ``--min-delta-us`` in absolute
+terms, so that noise on microsecond cases does not fail the run), and the
+command then exits with status 1. ``--update-baseline`` stores the run as
+the new baseline instead. Run it against a local database only.
+
+    python -m app.benchmarks.suite --sizes 1000,100000 \\
+        --baseline bench-baseline.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import sqlalchemy
+from sqlalchemy import Integer, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.crud.booking import (
+    create_booking,
+    get_available_tables,
+    get_booking_count,
+    get_bookings,
+)
+from app.crud.user import get_user_by_email
+from app.database import async_session, engine
+from app.schemas.booking import BookingFilter, BookingResponse
+from app.utils.security import create_tokens
+from app.utils.token import decode_token
+
+LOCATION = "benchmark-suite"
+
+SEED_USERS = text(
+    "INSERT INTO users (email, hashed_password, is_active, role) "
+    "SELECT 'bench-' || :tag || '-' || i || '@example.com', '-', true, "
+    "'GUEST' FROM generate_series(1, :count) AS i RETURNING id"
+)
+SEED_TABLES = text(
+    "INSERT INTO tables (capacity, location, status, is_active, "
+    "inventory_mode) "
+    "SELECT 2 + 2 * (i % 4), :location, 'AVAILABLE', true, false "
+    "FROM generate_series(1, :count) AS i RETURNING id"
+)
+
+
+def _ids(name):
+    return bindparam(name, type_=ARRAY(Integer))
+
+
+# Back to back bookings on every table, half of them past and half
+# upcoming, with one in ten cancelled and one in ten completed
+SEED_BOOKINGS = text(
+    "INSERT INTO bookings (user_id, table_id, start_time, end_time, "
+    "guest_count, status) "
+    "SELECT users[1 + i % cardinality(users)], "
+    "tables[1 + i % cardinality(tables)], "
+    "slot, slot + interval '2 hours', 2, "
+    "(CASE i % 10 WHEN 0 THEN 'CANCELLED' WHEN 1 THEN 'COMPLETED' "
+    "ELSE 'CONFIRMED' END)::bookingstatus "
+    "FROM (SELECT :users AS users, :tables AS tables) AS ids, "
+    "generate_series(0, :count - 1) AS i, "
+    "LATERAL (SELECT date_trunc('hour', now()) + (i / cardinality(tables) "
+    "- :count / cardinality(tables) / 2) * interval '3 hours' AS slot) AS s"
+).bindparams(_ids("users"), _ids("tables"))
+CLEANUP = [
+    text(
+        "DELETE FROM outbox_events WHERE aggregate_id IN "
+        "(SELECT id FROM bookings WHERE table_id = ANY(:tables))"
+    ).bindparams(_ids("tables")),
+    text(
+        "DELETE FROM bookings WHERE table_id = ANY(:tables)"
+    ).bindparams(_ids("tables")),
+    text("DELETE FROM tables WHERE id = ANY(:tables)").bindparams(
+        _ids("tables")
+    ),
+    text("DELETE FROM users WHERE id = ANY(:users)").bindparams(
+        _ids("users")
+    ),
+]
+
+
+async def seed_dataset(size):
+    """Seed ``size`` bookings with users and tables to match; returns what
+    ``remove_dataset`` needs"""
+    tag = time.time_ns()
+    async with async_session() as db:
+        users = (await db.execute(
+            SEED_USERS, {"tag": str(tag), "count": max(size // 20, 10)}
+        )).scalars().all()
+        tables = (await db.execute(
+            SEED_TABLES,
+            {"location": LOCATION, "count": max(size // 200, 10)}
+        )).scalars().all()
+        await db.execute(
+            SEED_BOOKINGS,
+            {"users": users, "tables": tables, "count": size}
+        )
+        await db.commit()
+    # Reclaims the rows of earlier runs too, which would otherwise bloat
+    # the scans being measured. VACUUM cannot run inside a transaction.
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE users, tables, bookings"))
+    return {"tag": tag, "users": users, "tables": tables}
+
+
+async def remove_dataset(data):
+    params = {"users": data["users"], "tables": data["tables"]}
+    async with async_session() as db:
+        for statement in CLEANUP:
+            await db.execute(statement, params)
+        await db.commit()
+
+
+async def _cases(data):
+    """name -> async callable(db, call number) of each benchmarked path"""
+    now = datetime.now(ZoneInfo("UTC"))
+    tomorrow = now.replace(
+        hour=19, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    users = data["users"]
+    email = f"bench-{data['tag']}-1@example.com"
+    access_token, _ = create_tokens(email)
+    # Every call books the next slot on one table, a year ahead and clear
+    # of the seeded bookings
+    far = now.replace(minute=0, second=0, microsecond=0) + timedelta(days=365)
+    slots = itertools.count()
+    async with async_session() as db:
+        page = await get_bookings(db, 0, 100)
+
+    async def available_tables(db, n):
+        await get_available_tables(
+            db, tomorrow, tomorrow + timedelta(hours=2), 4
+        )
+
+    async def new_booking(db, n):
+        start_time = far + timedelta(hours=3 * next(slots))
+        await create_booking(db, users[0], data["tables"][-1], start_time, 2)
+
+    async def bookings_page(db, n):
+        filters = BookingFilter(user_id=users[n % len(users)])
+        await get_bookings(db, 0, 100, filters)
+
+    async def booking_count(db, n):
+        await get_booking_count(db, BookingFilter(status="confirmed"))
+
+    async def user_by_email(db, n):
+        await get_user_by_email(db, email)
+
+    async def tokens(db, n):
+        create_tokens(email)
+
+    async def token_decode(db, n):
+        decode_token(access_token)
+
+    async def serialize_page(db, n):
+        for booking in page:
+            BookingResponse.from_orm(booking).model_dump(mode="json")
+
+    return {
+        "get_available_tables": available_tables,
+        "create_booking": new_booking,
+        "get_bookings": bookings_page,
+        "get_booking_count": booking_count,
+        "get_user_by_email": user_by_email,
+        "create_tokens": tokens,
+        "decode_token": token_decode,
+        "serialize_booking_page": serialize_page,
+    }
+
+
+async def _time_case(case, args):
+    per_call = []
+    async with async_session() as db:
+        for n in range(args.warmup):
+            await case(db, n)
+        for _ in range(args.rounds):
+            began = time.perf_counter()
+            for n in range(args.calls):
+                await case(db, n)
+            per_call.append((time.perf_counter() - began) / args.calls * 1e6)
+            await db.rollback()
+    return {
+        "median_us": round(statistics.median(per_call), 2),
+        "min_us": round(min(per_call), 2),
+    }
+
+
+async def run(args):
+    results = {}
+    for size in args.sizes:
+        data = await seed_dataset(size)
+        try:
+            cases = await _cases(data)
+            results[str(size)] = {}
+            for name, case in cases.items():
+                if args.only and name not in args.only:
+                    continue
+                results[str(size)][name] = await _time_case(case, args)
+                print(
+                    f"{size:>9} {name:<24}"
+                    f"{results[str(size)][name]['median_us']:>12.1f}us"
+                )
+        finally:
+            await remove_dataset(data)
+    async with engine.connect() as conn:
+        server = await conn.scalar(text("SHOW server_version"))
+    return {
+        "meta": {
+            "created_at": datetime.now(ZoneInfo("UTC")).isoformat(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "postgres": server,
+            "calls": args.calls,
+            "rounds": args.rounds,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold, min_delta_us):
+    """Lines of the comparison and the number of regressions"""
+    lines, regressions = [], 0
+    for size, cases in current["results"].items():
+        for name, stats in cases.items():
+            before = baseline["results"].get(size, {}).get(name)
+            if before is None:
+                lines.append(f"{size:>9} {name:<24}{'new':>12}")
+                continue
+            after, was = stats["median_us"], before["median_us"]
+            ratio = after / was if was else float("inf")
+            slower = ratio > 1 + threshold and after - was > min_delta_us
+            regressions += slower
+            lines.append(
+                f"{size:>9} {name:<24}{was:>12.1f}us{after:>12.1f}us"
+                f"{(ratio - 1) * 100:>+9.1f}%{'  REGRESSION' * slower}"
+            )
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", default="1000,10000",
+        type=lambda s: [int(size) for size in s.split(",")],
+        help="Comma separated numbers of seeded bookings"
+    )
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument(
+        "--only", type=lambda s: s.split(","), default=None,
+        help="Comma separated case names"
+    )
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="Allowed slowdown over the baseline, 0.2 for 20%%"
+    )
+    parser.add_argument("--min-delta-us", type=float, default=5.0)
+    args = parser.parse_args()
+
+    engine.echo = False
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    async def measure():
+        try:
+            return await run(args)
+        finally:
+            await engine.dispose()
+
+    current = asyncio.run(measure())
+    Path(args.output).write_text(json.dumps(current, indent=2))
+    if not args.baseline:
+        return 0
+    baseline_path = Path(args.baseline)
+    if args.update_baseline or not baseline_path.exists():
+        baseline_path.write_text(json.dumps(current, indent=2))
+        print(f"Baseline written to {baseline_path}")
+        return 0
+
+    lines, regressions = compare(
+        current,
+        json.loads(baseline_path.read_text()),
+        args.threshold,
+        args.min_delta_us
+    )
+    print(f"\n{'size':>9} {'case':<24}{'baseline':>14}{'current':>14}")
+    print("\n".join(lines))
+    if regressions:
+        print(f"{regressions} regression(s) over {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings  # type: ignore
 from pydantic import Field
+from typing import Dict, List
 
 
 class PaginationSettings(BaseSettings):
@@ -13,6 +14,67 @@ class PaginationSettings(BaseSettings):
 pagination_settings = PaginationSettings()
 
 
+class SeriesSettings(BaseSettings):
+    HORIZON_DAYS: int = 28  # Occurrences materialised as bookings ahead
+    MATERIALIZE_INTERVAL_SECONDS: int = 3600
+    MAX_OCCURRENCES: int = 104
+
+    class Config:
+        env_prefix = "SERIES_"  # Reads SERIES_* from .env
+
+
+series_settings = SeriesSettings()
+
+
+class CombinationSettings(BaseSettings):
+    MAX_TABLES: int = 4  # Largest number of tables pushed together
+
+    class Config:
+        env_prefix = "COMBINATION_"  # Reads COMBINATION_* from .env
+
+
+combination_settings = CombinationSettings()
+
+
+class SuggestionSettings(BaseSettings):
+    WINDOW_HOURS: int = 4  # Search this far before and after the request
+    SLOT_MINUTES: int = 15  # Suggested start times step
+    LIMIT: int = 5
+
+    class Config:
+        env_prefix = "SUGGESTION_"  # Reads SUGGESTION_* from .env
+
+
+suggestion_settings = SuggestionSettings()
+
+
+class WaitlistSettings(BaseSettings):
+    HOLD_MINUTES: int = 15  # Time to confirm a held slot
+    SWEEP_INTERVAL_SECONDS: int = 60
+    # LISTEN connection: retried with backoff, checked when idle
+    RECONNECT_MIN_SECONDS: float = 1.0
+    RECONNECT_MAX_SECONDS: float = 60.0
+    PING_INTERVAL_SECONDS: float = 30.0
+
+    class Config:
+        env_prefix = "WAITLIST_"  # Reads WAITLIST_* from .env
+
+
+waitlist_settings = WaitlistSettings()
+
+
+class InventorySettings(BaseSettings):
+    SLOT_MINUTES: int = 15
+    HORIZON_DAYS: int = 14  # Bookings further ahead use the lock path
+    MATERIALIZE_INTERVAL_SECONDS: int = 900
+
+    class Config:
+        env_prefix = "INVENTORY_"  # Reads INVENTORY_* from .env
+
+
+inventory_settings = InventorySettings()
+
+
 class Settings(BaseSettings):
     # Database Configuration
     DATABASE_URL: str = Field(
@@ -53,3 +115,159 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
+
+
+class OccupancySettings(BaseSettings):
+    SLOT_MINUTES: int = 15
+    HORIZON_DAYS: int = 14
+    REBUILD_SECONDS: int = 300  # Picks up bookings made by other workers
+
+    class Config:
+        env_prefix = "OCCUPANCY_"  # Reads OCCUPANCY_* from .env
+
+
+occupancy_settings = OccupancySettings()
+
+
+class AnalyticsSettings(BaseSettings):
+    TIMEZONE: str = "UTC"  # Rollup days and hours are local to this zone
+    REFRESH_INTERVAL_SECONDS: int = 300
+    # Rows updated more recently wait for the next run, so that slow
+    # transactions committing behind the watermark are not skipped
+    WATERMARK_LAG_SECONDS: int = 60
+    OPEN_HOUR: int = 0
+    CLOSE_HOUR: int = 24
+
+    class Config:
+        env_prefix = "ANALYTICS_"  # Reads ANALYTICS_* from .env
+
+
+analytics_settings = AnalyticsSettings()
+
+
+class ExportSettings(BaseSettings):
+    DIRECTORY: str = "exports"
+    BATCH_SIZE: int = 10000  # Rows per record batch
+    WATERMARK_LAG_SECONDS: int = 60
+
+    class Config:
+        env_prefix = "EXPORT_"  # Reads EXPORT_* from .env
+
+
+export_settings = ExportSettings()
+
+
+class OutboxSettings(BaseSettings):
+    # JSON list, e.g. OUTBOX_WEBHOOK_URLS='["http://pos.local/hooks"]'
+    WEBHOOK_URLS: List[str] = []
+    BATCH_SIZE: int = 100
+    POLL_INTERVAL_SECONDS: float = 1.0
+    TIMEOUT_SECONDS: float = 5.0
+    MAX_ATTEMPTS: int = 10  # Then the event is left for inspection
+    BACKOFF_BASE_SECONDS: float = 2.0
+    BACKOFF_MAX_SECONDS: float = 600.0
+    RETENTION_DAYS: int = 7  # Delivered events are purged afterwards
+
+    class Config:
+        env_prefix = "OUTBOX_"  # Reads OUTBOX_* from .env
+
+
+outbox_settings = OutboxSettings()
+
+
+class AuditSettings(BaseSettings):
+    BUFFER_SIZE: int = 10000  # Requests wait for a flush beyond this
+    FLUSH_SIZE: int = 500
+    FLUSH_INTERVAL_SECONDS: float = 2.0
+    FLUSH_ON_SHUTDOWN: bool = True
+
+    class Config:
+        env_prefix = "AUDIT_"  # Reads AUDIT_* from .env
+
+
+audit_settings = AuditSettings()
+
+
+class ProfilingSettings(BaseSettings):
+    HEADER: str = "X-Profile"  # Sent by an admin to profile one request
+    SAMPLE_RATE: float = 0.0  # Share of all requests profiled at random
+    INTERVAL_MS: float = 5.0
+    RING_SIZE: int = 50  # Profiles kept in memory, oldest dropped first
+    MAX_CONCURRENT: int = 4
+
+    class Config:
+        env_prefix = "PROFILE_"  # Reads PROFILE_* from .env
+
+
+profiling_settings = ProfilingSettings()
+
+
+class SlowQuerySettings(BaseSettings):
+    THRESHOLD_MS: float = 200.0
+    TOP_N: int = 50
+    MAX_STATEMENTS: int = 500  # Distinct statements tracked at once
+    EXPLAIN: bool = True
+    EXPLAIN_TTL_SECONDS: int = 600  # Plans older than this are recaptured
+    EXPLAIN_QUEUE_SIZE: int = 100
+
+    class Config:
+        env_prefix = "SLOW_QUERY_"  # Reads SLOW_QUERY_* from .env
+
+
+slow_query_settings = SlowQuerySettings()
+
+
+class DeadlineSettings(BaseSettings):
+    DEFAULT_MS: int = 10000  # 0 disables the deadline
+    # JSON object of path prefix to deadline; the longest prefix wins
+    ROUTES: Dict[str, int] = {
+        "/bookings/availability": 2000,
+        "/bookings/": 5000,
+        "/analytics/": 60000,
+        "/auth/users/import": 0,  # Streams its progress
+    }
+    LOCK_TIMEOUT_MS: int = 2000  # Also bounds the per-table advisory locks
+    RETRY_AFTER_SECONDS: int = 1
+
+    class Config:
+        env_prefix = "DEADLINE_"  # Reads DEADLINE_* from .env
+
+
+deadline_settings = DeadlineSettings()
+
+
+class BreakerSettings(BaseSettings):
+    FAILURE_THRESHOLD: int = 5  # Consecutive database failures to trip
+    OPEN_SECONDS: float = 10.0  # Before a half-open probe is let through
+    MAX_STALENESS_SECONDS: int = 900  # Older snapshots are not served
+    USER_CACHE_SIZE: int = 1000  # Users authenticated while open
+
+    class Config:
+        env_prefix = "BREAKER_"  # Reads BREAKER_* from .env
+
+
+breaker_settings = BreakerSettings()
+
+
+class BookingStatsSettings(BaseSettings):
+    # Bookings are counted as completed at most this long after they start
+    ROLLOVER_SECONDS: int = 60
+
+    class Config:
+        env_prefix = "BOOKING_STATS_"  # Reads BOOKING_STATS_* from .env
+
+
+booking_stats_settings = BookingStatsSettings()
+
+
+class UserImportSettings(BaseSettings):
+    MAX_ROWS: int = 100000
+    HASH_WORKERS: int = 0  # Password hashing processes, 0 for one per core
+    HASH_BATCH_SIZE: int = 50  # Passwords per task sent to a worker
+    VALIDATE_BATCH_SIZE: int = 1000  # Rows validated between yields
+
+    class Config:
+        env_prefix = "USER_IMPORT_"  # Reads USER_IMPORT_* from .env
+
+
+user_import_settings = UserImportSettings()
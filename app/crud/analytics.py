@@ -0,0 +1,304 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+from sqlalchemy import (
+    Date,
+    Integer,
+    case,
+    cast,
+    delete,
+    extract,
+    func,
+    literal,
+    select,
+    true,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import analytics_settings
+from app.models.booking import Booking, BookingStatus
+from app.models.rollup import BookingRollup, RollupDirtyDay, RollupWatermark
+from app.models.table import Table
+
+# This module maintains the booking rollups and answers analytics from them.
+
+WATERMARK_NAME = "bookings"
+OCCUPYING = (BookingStatus.CONFIRMED, BookingStatus.COMPLETED)
+REBUILD_CHUNK_DAYS = 31
+
+
+def _zone() -> ZoneInfo:
+    return ZoneInfo(analytics_settings.TIMEZONE)
+
+
+def _local(column):
+    return func.timezone(analytics_settings.TIMEZONE, column)
+
+
+def _rollup_rows(days: Sequence[date]):
+    """Rollup rows of the given local days, aggregated from bookings"""
+    window_start = datetime.combine(min(days), time(), _zone())
+    window_end = datetime.combine(max(days), time(), _zone()) + timedelta(
+        days=1
+    )
+    local_start = _local(Booking.start_time)
+    local_end = _local(Booking.end_time)
+
+    hours = func.generate_series(
+        func.date_trunc("hour", local_start),
+        local_end - timedelta(microseconds=1),
+        timedelta(hours=1)
+    ).table_valued("hour_start").render_derived().lateral()
+    hour_start = hours.c.hour_start
+    covered = func.least(local_end, hour_start + timedelta(hours=1)) \
+        - func.greatest(local_start, hour_start)
+    occupied = (
+        select(
+            Booking.table_id,
+            cast(hour_start, Date).label("day"),
+            cast(extract("hour", hour_start), Integer).label("hour"),
+            (extract("epoch", covered) / 60).label("booked_minutes"),
+            literal(0).label("bookings"),
+            literal(0).label("covers"),
+            literal(0).label("cancellations"),
+        )
+        .select_from(Booking)
+        .join(hours, true())
+        .where(
+            Booking.status.in_(OCCUPYING),
+            Booking.start_time < window_end,
+            Booking.end_time > window_start,
+            cast(hour_start, Date).in_(days)
+        )
+    )
+    started = (
+        select(
+            Booking.table_id,
+            cast(local_start, Date).label("day"),
+            cast(extract("hour", local_start), Integer).label("hour"),
+            literal(0).label("booked_minutes"),
+            literal(1).label("bookings"),
+            case(
+                (Booking.status.in_(OCCUPYING), Booking.guest_count),
+                else_=0
+            ).label("covers"),
+            case(
+                (Booking.status == BookingStatus.CANCELLED, 1),
+                else_=0
+            ).label("cancellations"),
+        )
+        .where(
+            Booking.start_time >= window_start,
+            Booking.start_time < window_end,
+            cast(local_start, Date).in_(days)
+        )
+    )
+    rows = union_all(occupied, started).subquery()
+    return (
+        select(
+            rows.c.table_id,
+            rows.c.day,
+            rows.c.hour,
+            cast(func.round(func.sum(rows.c.booked_minutes)), Integer),
+            cast(func.sum(rows.c.bookings), Integer),
+            cast(func.sum(rows.c.covers), Integer),
+            cast(func.sum(rows.c.cancellations), Integer),
+        )
+        .where(rows.c.table_id.isnot(None))
+        .group_by(rows.c.table_id, rows.c.day, rows.c.hour)
+    )
+
+
+async def _recompute_days(db: AsyncSession, days: Sequence[date]) -> None:
+    """Replace the rollups of the given days; the caller commits"""
+    await db.execute(
+        delete(BookingRollup).where(BookingRollup.day.in_(days))
+    )
+    await db.execute(
+        insert(BookingRollup).from_select(
+            [
+                "table_id", "day", "hour", "booked_minutes",
+                "bookings", "covers", "cancellations"
+            ],
+            _rollup_rows(days)
+        )
+    )
+
+
+# Rebuild the rollups of [start_date, end_date] from the raw bookings,
+# one month-sized transaction at a time
+async def rebuild_rollups(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date
+) -> int:
+    days = [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    ]
+    for offset in range(0, len(days), REBUILD_CHUNK_DAYS):
+        await _recompute_days(db, days[offset:offset + REBUILD_CHUNK_DAYS])
+        await db.commit()
+    return len(days)
+
+
+# Queue the local days touched by an interval for recomputation
+# Needed when a booking leaves a day, since the watermark only finds the
+# day a booking is on now. Runs in the caller's transaction.
+async def mark_rollup_days(
+    db: AsyncSession,
+    start_time: datetime,
+    end_time: datetime
+) -> None:
+    first = start_time.astimezone(_zone()).date()
+    last = (end_time - timedelta(microseconds=1)).astimezone(_zone()).date()
+    await db.execute(
+        insert(RollupDirtyDay)
+        .values([
+            {"day": first + timedelta(days=offset)}
+            for offset in range((last - first).days + 1)
+        ])
+        .on_conflict_do_nothing()
+    )
+
+
+def affected_days(watermark: datetime, upper: datetime):
+    """Local days touched by bookings updated in (watermark, upper], and
+    the days marked dirty, in order"""
+    changed = (
+        Booking.updated_at > watermark,
+        Booking.updated_at <= upper
+    )
+    days = union_all(
+        select(cast(_local(Booking.start_time), Date)).where(*changed),
+        select(
+            cast(_local(Booking.end_time - timedelta(microseconds=1)), Date)
+        ).where(*changed),
+        select(RollupDirtyDay.day),
+    ).subquery()
+    return select(days.c[0]).distinct().order_by(days.c[0])
+
+
+# Background job: recompute the days of bookings changed since the watermark
+# The watermark row is locked for the run so that workers take turns.
+async def refresh_rollups(db: AsyncSession) -> int:
+    await db.execute(
+        insert(RollupWatermark)
+        .values(name=WATERMARK_NAME, watermark=datetime(1970, 1, 1))
+        .on_conflict_do_nothing()
+    )
+    state = (await db.execute(
+        select(RollupWatermark)
+        .where(RollupWatermark.name == WATERMARK_NAME)
+        .with_for_update()
+    )).scalar_one()
+    upper = await db.scalar(
+        select(
+            func.localtimestamp()
+            - timedelta(seconds=analytics_settings.WATERMARK_LAG_SECONDS)
+        )
+    )
+    if upper <= state.watermark:
+        await db.rollback()
+        return 0
+
+    affected = (await db.execute(
+        affected_days(state.watermark, upper)
+    )).scalars().all()
+
+    for offset in range(0, len(affected), REBUILD_CHUNK_DAYS):
+        await _recompute_days(
+            db, affected[offset:offset + REBUILD_CHUNK_DAYS]
+        )
+    if affected:
+        await db.execute(
+            delete(RollupDirtyDay).where(RollupDirtyDay.day.in_(affected))
+        )
+    state.watermark = upper
+    await db.commit()
+    return len(affected)
+
+
+async def get_utilisation(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date,
+    group_by: str,
+    location: Optional[str] = None,
+    table_id: Optional[int] = None
+) -> List[Dict]:
+    """Utilisation figures per table, location, day or hour of day"""
+    keys = {
+        "table": BookingRollup.table_id,
+        "location": Table.location,
+        "day": BookingRollup.day,
+        "hour": BookingRollup.hour,
+    }
+    key = keys[group_by]
+    conditions = [Table.is_active]
+    if location:
+        conditions.append(Table.location == location)
+    if table_id:
+        conditions.append(Table.id == table_id)
+
+    rows = (await db.execute(
+        select(
+            key,
+            func.sum(BookingRollup.booked_minutes),
+            func.sum(BookingRollup.bookings),
+            func.sum(BookingRollup.covers),
+            func.sum(BookingRollup.cancellations),
+        )
+        .join(Table, Table.id == BookingRollup.table_id)
+        .where(
+            BookingRollup.day >= start_date,
+            BookingRollup.day <= end_date,
+            *conditions
+        )
+        .group_by(key)
+        .order_by(key)
+    )).all()
+
+    table_counts = dict((await db.execute(
+        select(Table.location, func.count())
+        .where(*conditions)
+        .group_by(Table.location)
+    )).all())
+    days = (end_date - start_date).days + 1
+    open_hours = analytics_settings.CLOSE_HOUR - analytics_settings.OPEN_HOUR
+
+    report = []
+    for value, booked, bookings, covers, cancellations in rows:
+        if group_by == "table":
+            tables, hours = 1, days * open_hours
+        elif group_by == "location":
+            tables, hours = table_counts.get(value, 0), days * open_hours
+        elif group_by == "day":
+            tables, hours = sum(table_counts.values()), open_hours
+        else:
+            tables = sum(table_counts.values())
+            is_open = (
+                analytics_settings.OPEN_HOUR
+                <= value
+                < analytics_settings.CLOSE_HOUR
+            )
+            hours = days if is_open else 0
+        capacity_minutes = tables * hours * 60
+        report.append({
+            "key": str(value),
+            "booked_minutes": booked,
+            "bookings": bookings,
+            "covers": covers,
+            "cancellations": cancellations,
+            "occupancy_rate": (
+                round(booked / capacity_minutes, 4)
+                if capacity_minutes else None
+            ),
+            "covers_per_hour": round(covers / hours, 2) if hours else None,
+            "cancellation_rate": (
+                round(cancellations / bookings, 4) if bookings else None
+            ),
+        })
+    return report
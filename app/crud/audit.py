@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit import AuditEvent
+
+# This module contains read access to the audit log.
+
+
+async def get_audit_events(
+    db: AsyncSession,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[AuditEvent]:
+    """Newest events first; entity and actor filters use their indexes"""
+    query = select(AuditEvent)
+    if entity_type:
+        query = query.where(AuditEvent.entity_type == entity_type)
+    if entity_id is not None:
+        query = query.where(AuditEvent.entity_id == entity_id)
+    if actor_id is not None:
+        query = query.where(AuditEvent.actor_id == actor_id)
+    if since:
+        query = query.where(AuditEvent.occurred_at >= since)
+    if until:
+        query = query.where(AuditEvent.occurred_at < until)
+    query = (
+        query.order_by(AuditEvent.occurred_at.desc(), AuditEvent.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return result.scalars().all()
@@ -1,36 +1,52 @@
 
+import math
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from zoneinfo import ZoneInfo
-from app.models.booking import Booking
+from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries
 from app.models.table import Table, TableStatus
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from sqlalchemy import between, func, select, and_, exists, text
+from sqlalchemy import (
+    TIMESTAMP,
+    Integer,
+    bindparam,
+    column,
+    func,
+    insert,
+    select,
+    and_,
+    exists,
+    or_,
+    text,
+    true,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased
 from fastapi import HTTPException
 
 
-from app.schemas.booking import BookingFilter
+from app.core.config import combination_settings, suggestion_settings
+from app.crud import statements
+from app.crud.analytics import mark_rollup_days
+from app.crud.inventory import create_inventory_booking, inventory_covers
+from app.crud.occupancy import occupancy_cache
+from app.crud.outbox import (
+    BOOKING_CANCELLED,
+    BOOKING_CREATED,
+    BOOKING_EXTENDED,
+    BOOKING_MODIFIED,
+    add_booking_events,
+)
+from app.schemas.booking import BookingCreate, BookingFilter, BookingUpdate
+from app.utils.combinations import best_combination, split_guests
+from app.utils.recurrence import ensure_aware, iter_occurrences
 
 
-async def _apply_booking_filters(
-    query,
-    filters: BookingFilter
-):
-    """Apply filters to booking query"""
-    if filters.user_id is not None:
-        query = query.where(Booking.user_id == filters.user_id)
-    if filters.status is not None:
-        query = query.where(Booking.status == filters.status)
-    if filters.booking_date is not None:
-        query = query.where(
-            between(
-                Booking.start_time,
-                datetime.combine(filters.booking_date, datetime.min.time()),
-                datetime.combine(filters.booking_date, datetime.max.time())
-            )
-        )
-    return query
+class BookingConflictError(ValueError):
+    """The requested table is already taken for the requested time"""
 
 
 # Retrieves a list of available tables for a specified time range and
@@ -42,24 +58,105 @@ async def get_available_tables(
     guest_count: Optional[int] = None,
 ) -> List[Table]:
     try:
-        query = select(Table).where(
+        result = await db.execute(
+            statements.available_tables(start_time, end_time, guest_count)
+        )
+        tables = result.scalars().all()
+        if tables:
+            # Recurring series beyond their materialised horizon
+            busy = await _series_busy_intervals(
+                db, start_time, end_time, [table.id for table in tables]
+            )
+            tables = [table for table in tables if table.id not in busy]
+        return tables if tables else []
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error checking availability: {str(e)}"
+        )
+
+
+# Answer many availability queries with one statement
+# The (start, end, guest_count) triples are passed as arrays, unnested with
+# their ordinality and LATERAL-joined against the same table/booking filter
+# as get_available_tables. Returns the available tables per query, in
+# request order.
+async def get_available_tables_batch(
+    db: AsyncSession,
+    queries: Sequence[Tuple[datetime, datetime, Optional[int]]]
+) -> List[List[Table]]:
+    try:
+        queries = [
+            (ensure_aware(start), ensure_aware(end), guest_count or None)
+            for start, end, guest_count in queries
+        ]
+        requested = func.unnest(
+            bindparam(
+                "starts",
+                [start for start, _, _ in queries],
+                type_=ARRAY(TIMESTAMP(timezone=True))
+            ),
+            bindparam(
+                "ends",
+                [end for _, end, _ in queries],
+                type_=ARRAY(TIMESTAMP(timezone=True))
+            ),
+            bindparam(
+                "guest_counts",
+                [guest_count for _, _, guest_count in queries],
+                type_=ARRAY(Integer)
+            )
+        ).table_valued(
+            column("start_time", TIMESTAMP(timezone=True)),
+            column("end_time", TIMESTAMP(timezone=True)),
+            column("guest_count", Integer),
+            with_ordinality="idx"
+        ).render_derived(name="requested")
+
+        available = select(Table).where(
             Table.is_active,
             Table.status == TableStatus.AVAILABLE,
-        ).where(
+            or_(
+                requested.c.guest_count.is_(None),
+                Table.capacity >= requested.c.guest_count
+            ),
             ~exists().where(
                 and_(
                     Booking.table_id == Table.id,
                     Booking.status == "confirmed",
-                    Booking.start_time < end_time,
-                    Booking.end_time > start_time
+                    Booking.start_time < requested.c.end_time,
+                    Booking.end_time > requested.c.start_time
                 )
-            )
+            ).correlate_except(Booking)
+        ).lateral("available")
+        table = aliased(Table, available)
+        result = await db.execute(
+            select(requested.c.idx, table)
+            .select_from(requested)
+            .join(available, true())
+            .order_by(requested.c.idx, table.id)
         )
-        if guest_count:
-            query = query.where(Table.capacity >= guest_count)
-        result = await db.execute(query)
-        tables = result.scalars().all()
-        return tables if tables else []
+
+        tables: List[List[Table]] = [[] for _ in queries]
+        for idx, available_table in result:
+            tables[idx - 1].append(available_table)
+
+        # Recurring series beyond their materialised horizon
+        busy = await _series_busy_intervals(
+            db,
+            min(start for start, _, _ in queries),
+            max(end for _, end, _ in queries),
+            list({table.id for found in tables for table in found})
+        ) if any(tables) else {}
+        return [
+            [
+                table for table in found
+                if not any(
+                    s < end and e > start for s, e in busy.get(table.id, [])
+                )
+            ]
+            for found, (start, end, _) in zip(tables, queries)
+        ]
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -67,6 +164,145 @@ async def get_available_tables(
         )
 
 
+def _booking_duration() -> timedelta:
+    return timedelta(hours=int(os.getenv("DEFAULT_DURATION")))
+
+
+def _booking_window(start_time: datetime) -> Tuple[datetime, datetime]:
+    """Return the timezone-aware (start, end) interval of a new booking"""
+    # Ensure timezone awareness
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=ZoneInfo("UTC"))
+
+    return start_time, start_time + _booking_duration()
+
+
+# Occurrences of recurring series that are not materialised as bookings yet
+# and overlap the given window, grouped by table_id. Occurrences before a
+# series' materialized_until already exist in bookings and are skipped.
+async def _series_busy_intervals(
+    db: AsyncSession,
+    start_time: datetime,
+    end_time: datetime,
+    table_ids: Optional[Sequence[int]] = None,
+    exclude_series_id: Optional[int] = None
+) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    start_time, end_time = ensure_aware(start_time), ensure_aware(end_time)
+    duration = _booking_duration()
+    query = select(BookingSeries).where(
+        BookingSeries.is_active,
+        BookingSeries.start_time < end_time,
+        BookingSeries.materialized_until < end_time,
+        or_(
+            BookingSeries.until.is_(None),
+            BookingSeries.until > start_time - duration
+        )
+    )
+    if table_ids is not None:
+        query = query.where(BookingSeries.table_id.in_(table_ids))
+    if exclude_series_id is not None:
+        query = query.where(BookingSeries.id != exclude_series_id)
+
+    busy: Dict[int, List[Tuple[datetime, datetime]]] = {}
+    for series in (await db.execute(query)).scalars():
+        for occurrence in iter_occurrences(
+            series.start_time,
+            series.frequency,
+            series.interval,
+            series.count,
+            series.until,
+            series.exceptions,
+            window_start=max(start_time - duration, series.materialized_until),
+            window_end=end_time
+        ):
+            if occurrence + duration > start_time:
+                busy.setdefault(series.table_id, []).append(
+                    (occurrence, occurrence + duration)
+                )
+    return busy
+
+
+# Check many (table_id, start, end) intervals in one query.
+# Returns (table_ok, booked) per interval: whether the table can be booked at
+# all and whether a confirmed booking (other than exclude_booking_id) already
+# overlaps the interval.
+async def _check_intervals(
+    db: AsyncSession,
+    intervals: Sequence[Tuple[int, datetime, datetime]],
+    exclude_booking_id: Optional[int] = None
+) -> List[Tuple[bool, bool]]:
+    requested = values(
+        column("idx", Integer),
+        column("table_id", Integer),
+        column("start_time", TIMESTAMP(timezone=True)),
+        column("end_time", TIMESTAMP(timezone=True)),
+        name="requested"
+    ).data([
+        (idx, table_id, start, end)
+        for idx, (table_id, start, end) in enumerate(intervals)
+    ])
+    table_ok = exists().where(
+        Table.id == requested.c.table_id,
+        Table.is_active,
+        Table.status == TableStatus.AVAILABLE,
+    )
+    booked = exists().where(
+        Booking.table_id == requested.c.table_id,
+        Booking.status == "confirmed",
+        Booking.start_time < requested.c.end_time,
+        Booking.end_time > requested.c.start_time
+    )
+    if exclude_booking_id is not None:
+        booked = booked.where(Booking.id != exclude_booking_id)
+    result = await db.execute(
+        select(
+            requested.c.idx,
+            table_ok.label("table_ok"),
+            booked.label("booked")
+        )
+    )
+    checks = {row.idx: (row.table_ok, row.booked) for row in result}
+    return [checks[idx] for idx in range(len(intervals))]
+
+
+async def _lock_tables(db: AsyncSession, table_ids: Sequence[int]):
+    """Take the per-table advisory locks in ascending id order"""
+    await db.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(lock_id) FROM "
+            "(SELECT DISTINCT unnest(CAST(:lock_ids AS integer[])) AS lock_id "
+            "ORDER BY lock_id) AS locks"
+        ),
+        {"lock_ids": list(table_ids)}
+    )
+
+
+async def check_extension(
+    db: AsyncSession,
+    booking: Booking,
+    extension: timedelta
+) -> Tuple[datetime, bool, bool]:
+    """
+    (new_end_time, table_ok, busy) of extending ``booking``: busy when
+    another confirmed booking or a series occurrence not yet materialised
+    overlaps the added time. Takes the table's lock, held until the
+    caller commits, and reloads the booking under it so the extension
+    starts from its current end.
+    """
+    await _lock_tables(db, [booking.table_id])
+    await db.refresh(booking)
+    new_end_time = booking.end_time + extension
+    [(table_ok, booked)] = await _check_intervals(
+        db,
+        [(booking.table_id, booking.end_time, new_end_time)],
+        exclude_booking_id=booking.id
+    )
+    occurrences = await _series_busy_intervals(
+        db, booking.end_time, new_end_time, [booking.table_id]
+    )
+    return new_end_time, table_ok, booked or bool(occurrences)
+
+
 # Create a booking
 # This function assumes that the table_id is valid and the user_id exists
 async def create_booking(
@@ -77,15 +313,33 @@ async def create_booking(
     guest_count: int,
     special_requests: str = None
 ):
-    # Ensure timezone awareness
-    if start_time.tzinfo is None:
-        start_time = start_time.replace(tzinfo=ZoneInfo("UTC"))
-
-    end_time = start_time + timedelta(hours=int(os.getenv("DEFAULT_DURATION")))
+    start_time, end_time = _booking_window(start_time)
+    table = await db.get(Table, table_id)
+    if (
+        table is not None
+        and table.inventory_mode
+        and inventory_covers(start_time, end_time)
+    ):
+        booking = None
+        if (
+            table.is_active
+            and table.status == TableStatus.AVAILABLE
+            and not await _series_busy_intervals(
+                db, start_time, end_time, [table_id]
+            )
+        ):
+            booking = await create_inventory_booking(
+                db, user_id, table_id, start_time, end_time,
+                guest_count, special_requests
+            )
+        if booking is None:
+            await db.rollback()
+            raise BookingConflictError(
+                "Table is no longer available for the selected time"
+            )
+        occupancy_cache.booking_created(booking)
+        return booking
 
-    # Ensure end_time is timezone-aware
-    if end_time.tzinfo is None:
-        end_time = end_time.replace(tzinfo=ZoneInfo("UTC"))
     await db.execute(
         text("SELECT pg_advisory_xact_lock(:lock_id)"),
         {"lock_id": table_id}
@@ -93,7 +347,9 @@ async def create_booking(
 
     available_tables = await get_available_tables(db, start_time, end_time)
     if not any(table.id == table_id for table in available_tables):
-        raise ValueError("Table is no longer available for the selected time")
+        raise BookingConflictError(
+            "Table is no longer available for the selected time"
+        )
 
     booking = Booking(
         user_id=user_id,
@@ -105,8 +361,501 @@ async def create_booking(
         status="confirmed"
     )
     db.add(booking)
+    await db.flush()
+    await add_booking_events(db, BOOKING_CREATED, [booking])
+    await db.commit()
+    await db.refresh(booking)
+    occupancy_cache.booking_created(booking)
+    return booking
+
+
+# Create many bookings at once
+# All requested intervals are checked against confirmed bookings (and table
+# availability) in a single query; overlaps inside the batch are resolved in
+# request order so the earlier item wins. Accepted items are written with one
+# multi-row INSERT and a single commit.
+async def create_bookings_bulk(
+    db: AsyncSession,
+    user_id: int,
+    items: Sequence[BookingCreate]
+) -> List[Tuple[Optional[Booking], Optional[str]]]:
+    windows = [_booking_window(item.start_time) for item in items]
+    table_ids = sorted({item.table_id for item in items})
+
+    await _lock_tables(db, table_ids)
+
+    checks = await _check_intervals(db, [
+        (item.table_id, start, end)
+        for item, (start, end) in zip(items, windows)
+    ])
+    # Unmaterialised series occurrences count as already taken
+    taken_by_table = await _series_busy_intervals(
+        db,
+        min(start for start, _ in windows),
+        max(end for _, end in windows),
+        table_ids
+    )
+
+    outcome: List[Tuple[Optional[Booking], Optional[str]]] = []
+    rows = []
+    for item, (start, end), (table_ok, booked) in zip(items, windows, checks):
+        taken = taken_by_table.setdefault(item.table_id, [])
+        if not table_ok:
+            outcome.append((None, "Table is not available for booking"))
+        elif booked or any(
+            s < end and e > start for s, e in taken
+        ):
+            outcome.append(
+                (None, "Table is no longer available for the selected time")
+            )
+        else:
+            taken.append((start, end))
+            outcome.append((None, None))
+            rows.append({
+                "user_id": user_id,
+                "table_id": item.table_id,
+                "start_time": start,
+                "end_time": end,
+                "guest_count": item.guest_count,
+                "special_requests": item.special_requests,
+                "status": BookingStatus.CONFIRMED,
+            })
+
+    if rows:
+        bookings = (await db.scalars(
+            insert(Booking).returning(Booking, sort_by_parameter_order=True),
+            rows
+        )).all()
+        await add_booking_events(db, BOOKING_CREATED, bookings)
+        created = iter(bookings)
+        outcome = [
+            (next(created), None) if detail is None else (None, detail)
+            for _, detail in outcome
+        ]
+    await db.commit()
+    for booking, _ in outcome:
+        if booking is not None:
+            occupancy_cache.booking_created(booking)
+    return outcome
+
+
+# Day intervals already taken per table, sorted by start time
+async def _day_intervals(
+    db: AsyncSession,
+    table_ids: Sequence[int],
+    day_start: datetime,
+    day_end: datetime
+) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    result = await db.execute(
+        select(Booking.table_id, Booking.start_time, Booking.end_time)
+        .where(
+            Booking.table_id.in_(table_ids),
+            Booking.status == "confirmed",
+            Booking.start_time < day_end,
+            Booking.end_time > day_start
+        )
+    )
+    intervals: Dict[int, List[Tuple[datetime, datetime]]] = {}
+    for table_id, start, end in result:
+        intervals.setdefault(table_id, []).append((start, end))
+    busy = await _series_busy_intervals(db, day_start, day_end, table_ids)
+    for table_id, occurrences in busy.items():
+        intervals.setdefault(table_id, []).extend(occurrences)
+    for taken in intervals.values():
+        taken.sort()
+    return intervals
+
+
+def _fragmentation(
+    taken: Sequence[Tuple[datetime, datetime]],
+    start_time: datetime,
+    end_time: datetime,
+    day_start: datetime,
+    day_end: datetime
+) -> timedelta:
+    """Free time left directly around the new booking on that table's day"""
+    gap_start = max(
+        [end for _, end in taken if end <= start_time] + [day_start]
+    )
+    gap_end = min(
+        [start for start, _ in taken if start >= end_time] + [day_end]
+    )
+    return (start_time - gap_start) + (gap_end - end_time)
+
+
+# Pick a table and book it
+# Candidates are the available tables that fit guest_count, ordered by best
+# fit: smallest adequate capacity first, then the table whose free gap around
+# the new booking is tightest, so long free stretches stay usable. Each
+# candidate is locked and re-checked before inserting; when another request
+# took it meanwhile, the next candidate is tried. Candidates are only
+# try-locked, so this never waits on a lock while holding another (writers
+# of several tables lock them in id order). Tables locked by a concurrent
+# writer are tried last, after releasing every lock, under locks taken in
+# id order.
+async def assign_and_create_booking(
+    db: AsyncSession,
+    user_id: int,
+    start_time: datetime,
+    guest_count: int,
+    special_requests: str = None
+):
+    start_time, end_time = _booking_window(start_time)
+    candidates = await get_available_tables(
+        db, start_time, end_time, guest_count
+    )
+    if not candidates:
+        raise ValueError("No table available for the selected time")
+
+    day_start = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = max(day_start + timedelta(days=1), end_time)
+    intervals = await _day_intervals(
+        db, [table.id for table in candidates], day_start, day_end
+    )
+    candidates = sorted(
+        candidates,
+        key=lambda table: (
+            table.capacity,
+            _fragmentation(
+                intervals.get(table.id, []),
+                start_time, end_time, day_start, day_end
+            ),
+            table.id
+        )
+    )
+
+    async def book(table_id: int) -> Optional[Booking]:
+        # Under the table's lock
+        [(table_ok, booked)] = await _check_intervals(
+            db, [(table_id, start_time, end_time)]
+        )
+        if not table_ok or booked or await _series_busy_intervals(
+            db, start_time, end_time, [table_id]
+        ):
+            return None
+
+        booking = Booking(
+            user_id=user_id,
+            table_id=table_id,
+            start_time=start_time,
+            end_time=end_time,
+            guest_count=guest_count,
+            special_requests=special_requests,
+            status="confirmed"
+        )
+        db.add(booking)
+        await db.flush()
+        await add_booking_events(db, BOOKING_CREATED, [booking])
+        await db.commit()
+        await db.refresh(booking)
+        occupancy_cache.booking_created(booking)
+        return booking
+
+    contended = []
+    for table_id in [table.id for table in candidates]:
+        acquired = await db.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:lock_id)"),
+            {"lock_id": table_id}
+        )
+        if not acquired:
+            contended.append(table_id)
+            continue
+        booking = await book(table_id)
+        if booking is not None:
+            return booking
+
+    if contended:
+        await db.rollback()
+        await _lock_tables(db, contended)
+        for table_id in contended:
+            booking = await book(table_id)
+            if booking is not None:
+                return booking
+
+    raise ValueError("Table is no longer available for the selected time")
+
+
+# Find combinations of tables for parties larger than a single table
+# Returns the cheapest free combination of each combination group (fewest
+# spare seats, then fewest tables), best first. Each group's free tables are
+# read in one query and searched by capacity (best_combination), so nothing
+# is enumerated or cached per group.
+async def find_table_combinations(
+    db: AsyncSession,
+    start_time: datetime,
+    end_time: datetime,
+    guest_count: int
+) -> List[Tuple[List[Table], int]]:
+    is_free = ~exists().where(
+        Booking.table_id == Table.id,
+        Booking.status == "confirmed",
+        Booking.start_time < end_time,
+        Booking.end_time > start_time
+    )
+    result = await db.execute(
+        select(Table, is_free.label("is_free"))
+        .where(
+            Table.is_active,
+            Table.status == TableStatus.AVAILABLE,
+            Table.combination_group.isnot(None)
+        )
+        .order_by(Table.id)
+    )
+    rows = result.all()
+    busy = await _series_busy_intervals(
+        db, start_time, end_time, [table.id for table, _ in rows]
+    )
+
+    tables_by_id = {}
+    free_members: Dict[str, List[Tuple[int, int]]] = {}
+    for table, free in rows:
+        tables_by_id[table.id] = table
+        if free and table.id not in busy:
+            free_members.setdefault(table.combination_group, []).append(
+                (table.id, table.capacity)
+            )
+
+    options = []
+    for members in free_members.values():
+        if sum(capacity for _, capacity in members) < guest_count:
+            continue
+        best = best_combination(
+            members, combination_settings.MAX_TABLES, guest_count
+        )
+        if best is not None:
+            total, table_ids = best
+            options.append(
+                ([tables_by_id[table_id] for table_id in table_ids], total)
+            )
+    options.sort(key=lambda option: (option[1], len(option[0])))
+    return options
+
+
+# Book several combinable tables for one party
+# All members are locked and checked together and inserted in one statement;
+# guests are spread over the tables in order of the given ids, at least one
+# at each (split_guests), so a table the party does not need is refused.
+async def create_combination_booking(
+    db: AsyncSession,
+    user_id: int,
+    table_ids: Sequence[int],
+    start_time: datetime,
+    guest_count: int,
+    special_requests: str = None
+) -> List[Booking]:
+    table_ids = list(dict.fromkeys(table_ids))
+    if not 2 <= len(table_ids) <= combination_settings.MAX_TABLES:
+        raise ValueError(
+            "A combination needs between 2 and "
+            f"{combination_settings.MAX_TABLES} tables"
+        )
+    start_time, end_time = _booking_window(start_time)
+
+    await _lock_tables(db, table_ids)
+    result = await db.execute(select(Table).where(Table.id.in_(table_ids)))
+    tables = {table.id: table for table in result.scalars()}
+    if len(tables) != len(table_ids):
+        raise ValueError("Table not found")
+    groups = {table.combination_group for table in tables.values()}
+    if len(groups) != 1 or None in groups:
+        raise ValueError("These tables cannot be combined")
+    seated = split_guests(
+        [tables[table_id].capacity for table_id in table_ids], guest_count
+    )
+
+    checks = await _check_intervals(
+        db, [(table_id, start_time, end_time) for table_id in table_ids]
+    )
+    busy = await _series_busy_intervals(db, start_time, end_time, table_ids)
+    if busy or not all(
+        table_ok and not booked for table_ok, booked in checks
+    ):
+        raise ValueError("Table is no longer available for the selected time")
+
+    rows = [
+        {
+            "user_id": user_id,
+            "table_id": table_id,
+            "start_time": start_time,
+            "end_time": end_time,
+            "guest_count": guests,
+            "special_requests": special_requests,
+            "status": BookingStatus.CONFIRMED,
+        }
+        for table_id, guests in zip(table_ids, seated)
+    ]
+    bookings = (await db.scalars(
+        insert(Booking).returning(Booking, sort_by_parameter_order=True),
+        rows
+    )).all()
+    await add_booking_events(db, BOOKING_CREATED, bookings)
+    await db.commit()
+    for booking in bookings:
+        occupancy_cache.booking_created(booking)
+    return bookings
+
+
+def _gap_starts(
+    gap_start: datetime,
+    gap_end: datetime,
+    requested: datetime,
+    step: timedelta,
+    limit: int
+) -> List[datetime]:
+    """Start times on the requested time's grid fitting the gap, nearest first"""
+    first = math.ceil((gap_start - requested) / step)
+    last = math.floor((gap_end - requested) / step)
+    if first > last:
+        return []
+    offsets = sorted(range(first, last + 1), key=abs)[:limit]
+    return [requested + offset * step for offset in offsets]
+
+
+# Suggest the nearest free start times around a requested time
+# Confirmed bookings of the candidate tables inside the search window are
+# read once, sorted by table and start time, and each table's free gaps are
+# walked in a single pass. Returns up to `limit` (table, start, end)
+# suggestions ordered by distance to the requested time.
+async def suggest_alternative_slots(
+    db: AsyncSession,
+    start_time: datetime,
+    guest_count: Optional[int] = None,
+    table_id: Optional[int] = None,
+    limit: int = suggestion_settings.LIMIT
+) -> List[Tuple[Table, datetime, datetime]]:
+    requested = ensure_aware(start_time)
+    duration = _booking_duration()
+    window = timedelta(hours=suggestion_settings.WINDOW_HOURS)
+    step = timedelta(minutes=suggestion_settings.SLOT_MINUTES)
+    earliest = max(
+        requested - window,
+        datetime.now(ZoneInfo("UTC"))
+    )
+    latest = requested + window
+
+    query = select(Table).where(
+        Table.is_active,
+        Table.status == TableStatus.AVAILABLE,
+    )
+    if table_id is not None:
+        query = query.where(Table.id == table_id)
+    elif guest_count:
+        query = query.where(Table.capacity >= guest_count)
+    tables = {table.id: table for table in (await db.execute(query)).scalars()}
+    if not tables or earliest > latest:
+        return []
+
+    result = await db.execute(
+        select(Booking.table_id, Booking.start_time, Booking.end_time)
+        .where(
+            Booking.table_id.in_(tables),
+            Booking.status == "confirmed",
+            Booking.start_time < latest + duration,
+            Booking.end_time > earliest
+        )
+        .order_by(Booking.table_id, Booking.start_time)
+    )
+    taken: Dict[int, List[Tuple[datetime, datetime]]] = {
+        candidate_id: [] for candidate_id in tables
+    }
+    for row_table_id, start, end in result:
+        taken[row_table_id].append((start, end))
+    busy = await _series_busy_intervals(
+        db, earliest, latest + duration, list(tables)
+    )
+    for busy_table_id, occurrences in busy.items():
+        taken[busy_table_id] = sorted(taken[busy_table_id] + occurrences)
+
+    suggestions = []
+    for candidate_id, intervals in taken.items():
+        free_from = earliest
+        for start, end in intervals + [(latest + duration, latest + duration)]:
+            # Feasible starts in this gap: [free_from, start - duration]
+            for slot in _gap_starts(
+                free_from, min(start, latest + duration) - duration,
+                requested, step, limit
+            ):
+                suggestions.append((
+                    abs(slot - requested),
+                    tables[candidate_id].capacity,
+                    slot,
+                    candidate_id
+                ))
+            free_from = max(free_from, end)
+
+    suggestions.sort()
+    return [
+        (tables[candidate_id], slot, slot + duration)
+        for _, _, slot, candidate_id in suggestions[:limit]
+    ]
+
+
+# Move a booking to another table and/or time and/or party size
+# The new interval is checked in one query that ignores the booking itself,
+# under the target table's advisory lock, and applied in the same
+# transaction, so the original slot is never released before the new one is
+# secured. The booking keeps its length unless end_time is given.
+async def modify_booking(
+    db: AsyncSession,
+    booking: Booking,
+    booking_update: BookingUpdate
+) -> Booking:
+    update_data = booking_update.dict(exclude_unset=True)
+    if "status" in update_data:
+        raise ValueError("Use the cancel endpoint to change the status")
+    if booking.status != BookingStatus.CONFIRMED:
+        raise ValueError("Only confirmed bookings can be modified")
+
+    table_id = update_data.get("table_id") or booking.table_id
+    start_time = ensure_aware(
+        update_data.get("start_time") or booking.start_time
+    )
+    if update_data.get("end_time"):
+        end_time = ensure_aware(update_data["end_time"])
+    else:
+        end_time = start_time + (booking.end_time - booking.start_time)
+    if end_time <= start_time:
+        raise ValueError("End time must be after start time")
+    guest_count = update_data.get("guest_count") or booking.guest_count
+
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(:lock_id)"),
+        {"lock_id": table_id}
+    )
+    table = await db.get(Table, table_id)
+    if not table:
+        raise ValueError("Table not found")
+    if guest_count and table.capacity < guest_count:
+        raise ValueError("The table is too small for the party")
+
+    [(table_ok, booked)] = await _check_intervals(
+        db, [(table_id, start_time, end_time)], exclude_booking_id=booking.id
+    )
+    if not table_ok:
+        raise ValueError("Table is not available for booking")
+    if booked or await _series_busy_intervals(
+        db, start_time, end_time, [table_id]
+    ):
+        raise BookingConflictError(
+            "Table is no longer available for the selected time"
+        )
+
+    if (start_time, end_time) != (booking.start_time, booking.end_time):
+        # The watermark only finds the day the booking moves to
+        await mark_rollup_days(db, booking.start_time, booking.end_time)
+    old = (booking.table_id, booking.start_time, booking.end_time)
+    booking.table_id = table_id
+    booking.start_time = start_time
+    booking.end_time = end_time
+    booking.guest_count = guest_count
+    if "special_requests" in update_data:
+        booking.special_requests = update_data["special_requests"]
+    await add_booking_events(db, BOOKING_MODIFIED, [booking])
     await db.commit()
     await db.refresh(booking)
+    occupancy_cache.booking_moved(
+        booking.id, old, (table_id, start_time, end_time)
+    )
     return booking
 
 
@@ -120,18 +869,20 @@ async def extend_booking(
         raise HTTPException(status_code=404, detail="Booking not found")
 
     # Check for conflicts with the new extended time
-    new_end_time = booking.end_time + timedelta(hours=additional_hours)
-    conflicting_tables = await get_available_tables(
-        db, booking.end_time, new_end_time
+    new_end_time, table_ok, busy = await check_extension(
+        db, booking, timedelta(hours=additional_hours)
     )
-    if not any(t.id == booking.table_id for t in conflicting_tables):
+    if not table_ok or busy:
         raise HTTPException(
             status_code=400,
             detail="Cannot extend, time conflict"
         )
+    old_end_time = booking.end_time
     booking.end_time = new_end_time
+    await add_booking_events(db, BOOKING_EXTENDED, [booking])
     await db.commit()
     await db.refresh(booking)
+    occupancy_cache.booking_extended(booking, old_end_time)
     return booking
 
 
@@ -150,8 +901,14 @@ async def cancel_and_free_booking(
         )
     # Mark booking as cancelled
     booking.status = "cancelled"
+    await add_booking_events(db, BOOKING_CANCELLED, [booking])
     await db.commit()
     await db.refresh(booking)
+    occupancy_cache.booking_cancelled(booking)
+
+    # Imported here: the waitlist module builds on this one
+    from app.crud.waitlist import promote_waitlist
+    await promote_waitlist(db, booking.table_id, booking.start_time)
 
     return {
         "message": (
@@ -167,11 +924,7 @@ async def get_bookings(
     filters: Optional[BookingFilter] = None
 ) -> List[Booking]:
     try:
-        query = select(Booking)
-        if filters:
-            query = await _apply_booking_filters(query, filters)
-        query = query.offset(skip).limit(limit)
-        result = await db.execute(query)
+        result = await db.execute(statements.bookings(skip, limit, filters))
         return result.scalars().all()
     except Exception as e:
         raise HTTPException(
@@ -185,10 +938,7 @@ async def get_booking_count(
     filters: Optional[BookingFilter] = None
 ) -> int:
     try:
-        query = select(func.count(Booking.id))
-        if filters:
-            query = await _apply_booking_filters(query, filters)
-        result = await db.execute(query)
+        result = await db.execute(statements.booking_count(filters))
         return result.scalar()
     except Exception as e:
         raise HTTPException(
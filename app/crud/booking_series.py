@@ -0,0 +1,297 @@
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import series_settings
+from app.crud.booking import (
+    _booking_duration,
+    _check_intervals,
+    _lock_tables,
+    _series_busy_intervals,
+)
+from app.crud.outbox import (
+    BOOKING_CANCELLED,
+    BOOKING_CREATED,
+    add_booking_events,
+    add_outbox_events,
+    booking_payload,
+)
+from app.crud.occupancy import occupancy_cache
+from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries
+from app.schemas.booking import BookingSeriesCreate
+from app.utils.recurrence import iter_occurrences
+
+# This module contains CRUD operations for recurring booking series.
+
+# Reasons given when the materialiser cannot book an occurrence
+SKIPPED_CONFLICT = "conflict"
+SKIPPED_TABLE_UNAVAILABLE = "table_unavailable"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(ZoneInfo("UTC"))
+
+
+def _series_occurrences(series: BookingSeries, window_start, window_end):
+    return iter_occurrences(
+        series.start_time,
+        series.frequency,
+        series.interval,
+        series.count,
+        series.until,
+        series.exceptions,
+        window_start=window_start,
+        window_end=window_end
+    )
+
+
+async def _materialize_series(
+    db: AsyncSession,
+    series: BookingSeries,
+    horizon_end: datetime,
+    checked: bool = False
+) -> List[Booking]:
+    """
+    Insert the occurrences between materialized_until and horizon_end as
+    bookings and advance materialized_until; returns the confirmed ones.
+
+    Unless ``checked`` is set, an occurrence whose table is out of service
+    or that overlaps a confirmed booking is not booked: it is stored as a
+    cancelled booking with a ``booking.cancelled`` event giving the reason,
+    and its date becomes an exception of the series.
+    """
+    if horizon_end <= series.materialized_until:
+        return []
+
+    duration = _booking_duration()
+    occurrences = list(
+        _series_occurrences(series, series.materialized_until, horizon_end)
+    )
+    reasons = [None] * len(occurrences)
+    if occurrences and not checked:
+        checks = await _check_intervals(db, [
+            (series.table_id, start, start + duration)
+            for start in occurrences
+        ])
+        reasons = [
+            SKIPPED_TABLE_UNAVAILABLE if not table_ok
+            else SKIPPED_CONFLICT if booked else None
+            for table_ok, booked in checks
+        ]
+
+    bookings = []
+    if occurrences:
+        rows = (await db.scalars(
+            insert(Booking).returning(Booking, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": series.user_id,
+                    "table_id": series.table_id,
+                    "series_id": series.id,
+                    "start_time": start,
+                    "end_time": start + duration,
+                    "guest_count": series.guest_count,
+                    "special_requests": series.special_requests,
+                    "status": BookingStatus.CANCELLED if reason
+                    else BookingStatus.CONFIRMED,
+                }
+                for start, reason in zip(occurrences, reasons)
+            ]
+        )).all()
+        bookings = [
+            booking for booking, reason in zip(rows, reasons) if not reason
+        ]
+        skipped = [
+            (booking, reason) for booking, reason in zip(rows, reasons)
+            if reason
+        ]
+        await add_booking_events(db, BOOKING_CREATED, bookings)
+        await add_outbox_events(db, BOOKING_CANCELLED, [
+            booking_payload(booking, reason=reason)
+            for booking, reason in skipped
+        ])
+        if skipped:
+            # Occurrences are in UTC, like the exception dates
+            series.exceptions = sorted(set(series.exceptions) | {
+                booking.start_time.date() for booking, _ in skipped
+            })
+    series.materialized_until = horizon_end
+    return bookings
+
+
+# Create a recurring series
+# All occurrences are conflict-checked in one query against bookings plus one
+# lookup of other series on the table; the series is stored as a single row
+# and only the occurrences inside the rolling horizon become bookings.
+async def create_series(
+    db: AsyncSession,
+    user_id: int,
+    series_data: BookingSeriesCreate
+) -> BookingSeries:
+    if series_data.count is None and series_data.until is None:
+        raise ValueError("Either count or until must be provided")
+
+    series = BookingSeries(
+        user_id=user_id,
+        table_id=series_data.table_id,
+        start_time=series_data.start_time,
+        guest_count=series_data.guest_count,
+        special_requests=series_data.special_requests,
+        frequency=series_data.frequency,
+        interval=series_data.interval,
+        count=series_data.count,
+        until=series_data.until,
+        exceptions=sorted(set(series_data.exceptions)),
+        is_active=True,
+        materialized_until=series_data.start_time
+    )
+    occurrences = list(islice(
+        _series_occurrences(series, None, None),
+        series_settings.MAX_OCCURRENCES + 1
+    ))
+    if not occurrences:
+        raise ValueError("The series has no occurrences")
+    if len(occurrences) > series_settings.MAX_OCCURRENCES:
+        raise ValueError(
+            "A series can have at most "
+            f"{series_settings.MAX_OCCURRENCES} occurrences"
+        )
+
+    duration = _booking_duration()
+    await _lock_tables(db, [series.table_id])
+    checks = await _check_intervals(db, [
+        (series.table_id, start, start + duration) for start in occurrences
+    ])
+    if not checks[0][0]:
+        raise ValueError("Table is not available for booking")
+
+    taken = (await _series_busy_intervals(
+        db, occurrences[0], occurrences[-1] + duration, [series.table_id]
+    )).get(series.table_id, [])
+    conflicts = [
+        start for start, (_, booked) in zip(occurrences, checks)
+        if booked or any(
+            s < start + duration and e > start for s, e in taken
+        )
+    ]
+    if conflicts:
+        raise ValueError(
+            "Table is already booked on "
+            + ", ".join(start.date().isoformat() for start in conflicts)
+        )
+
+    db.add(series)
+    await db.flush()
+    horizon_end = _utcnow() + timedelta(days=series_settings.HORIZON_DAYS)
+    bookings = await _materialize_series(
+        db, series, horizon_end, checked=True
+    )
+    await db.commit()
+    await db.refresh(series)
+    for booking in bookings:
+        occupancy_cache.booking_created(booking)
+    return series
+
+
+async def get_series(
+    db: AsyncSession,
+    series_id: int
+) -> Optional[BookingSeries]:
+    return await db.get(BookingSeries, series_id)
+
+
+async def get_user_series(
+    db: AsyncSession,
+    user_id: int
+) -> List[BookingSeries]:
+    result = await db.execute(
+        select(BookingSeries)
+        .where(BookingSeries.user_id == user_id)
+        .order_by(BookingSeries.start_time)
+    )
+    return result.scalars().all()
+
+
+async def add_series_exception(
+    db: AsyncSession,
+    series: BookingSeries,
+    exception_date: date
+) -> BookingSeries:
+    """Skip one date of the series, cancelling it if already materialised"""
+    series.exceptions = sorted(set(series.exceptions) | {exception_date})
+    cancelled = (await db.scalars(
+        update(Booking)
+        .where(
+            Booking.series_id == series.id,
+            Booking.status == BookingStatus.CONFIRMED,
+            func.date(func.timezone("UTC", Booking.start_time))
+            == exception_date
+        )
+        .values(status=BookingStatus.CANCELLED)
+        .returning(Booking)
+    )).all()
+    await add_booking_events(db, BOOKING_CANCELLED, cancelled)
+    await db.commit()
+    await db.refresh(series)
+    for booking in cancelled:
+        occupancy_cache.booking_cancelled(booking)
+    return series
+
+
+async def cancel_series(
+    db: AsyncSession,
+    series: BookingSeries
+) -> BookingSeries:
+    """Stop the series and cancel its future materialised bookings"""
+    series.is_active = False
+    cancelled = (await db.scalars(
+        update(Booking)
+        .where(
+            Booking.series_id == series.id,
+            Booking.status == BookingStatus.CONFIRMED,
+            Booking.start_time >= _utcnow()
+        )
+        .values(status=BookingStatus.CANCELLED)
+        .returning(Booking)
+    )).all()
+    await add_booking_events(db, BOOKING_CANCELLED, cancelled)
+    await db.commit()
+    await db.refresh(series)
+    for booking in cancelled:
+        occupancy_cache.booking_cancelled(booking)
+    return series
+
+
+# Background job: extend every active series up to the rolling horizon.
+# Rows locked by a concurrent run are skipped. The tables of all due series
+# are locked up front in id order, like every writer of several tables, so
+# the job cannot deadlock against bulk bookings. Occurrences that can no
+# longer be booked are kept as cancelled bookings with a reason.
+async def materialize_due_series(
+    db: AsyncSession,
+    now: Optional[datetime] = None
+) -> int:
+    horizon_end = (now or _utcnow()) + timedelta(
+        days=series_settings.HORIZON_DAYS
+    )
+    result = await db.execute(
+        select(BookingSeries)
+        .where(
+            BookingSeries.is_active,
+            BookingSeries.materialized_until < horizon_end
+        )
+        .with_for_update(skip_locked=True)
+    )
+    due = result.scalars().all()
+    await _lock_tables(db, [series.table_id for series in due])
+    created = []
+    for series in due:
+        created += await _materialize_series(db, series, horizon_end)
+    await db.commit()
+    for booking in created:
+        occupancy_cache.booking_created(booking)
+    return len(created)
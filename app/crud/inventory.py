@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+from zoneinfo import ZoneInfo
+from sqlalchemy import (
+    delete,
+    exists,
+    func,
+    insert,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import inventory_settings
+from app.crud.outbox import BOOKING_CREATED, add_booking_events
+from app.models.booking import Booking, BookingStatus
+from app.models.table import Table
+from app.models.table_slot import TableSlot
+
+# This module contains the slot inventory used by tables in inventory mode.
+
+EPOCH = datetime(1970, 1, 1, tzinfo=ZoneInfo("UTC"))
+
+
+def _slot_length() -> timedelta:
+    return timedelta(minutes=inventory_settings.SLOT_MINUTES)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(ZoneInfo("UTC"))
+
+
+def slot_starts(start_time: datetime, end_time: datetime) -> List[datetime]:
+    """Grid slots overlapping [start_time, end_time)"""
+    step = _slot_length()
+    slot = EPOCH + ((start_time - EPOCH) // step) * step
+    slots = []
+    while slot < end_time:
+        slots.append(slot)
+        slot += step
+    return slots
+
+
+def inventory_covers(start_time: datetime, end_time: datetime) -> bool:
+    """Whether the interval lies inside the materialised slot horizon"""
+    now = _utcnow()
+    return start_time >= now and end_time <= now + timedelta(
+        days=inventory_settings.HORIZON_DAYS
+    )
+
+
+# Background job: create the slots of every inventory table up to one day
+# past the horizon and drop slots that are over a day old.
+async def materialize_slots(
+    db: AsyncSession,
+    table_ids: Optional[Sequence[int]] = None
+) -> int:
+    step = _slot_length()
+    now = _utcnow()
+    grid = func.generate_series(
+        EPOCH + ((now - EPOCH) // step) * step,
+        now + timedelta(days=inventory_settings.HORIZON_DAYS + 1),
+        step
+    ).table_valued("slot_start").render_derived()
+    tables = (
+        select(Table.id, grid.c.slot_start)
+        .join(grid, true())
+        .where(Table.inventory_mode)
+    )
+    if table_ids is not None:
+        tables = tables.where(Table.id.in_(table_ids))
+
+    result = await db.execute(
+        pg_insert(TableSlot)
+        .from_select(["table_id", "slot_start"], tables)
+        .on_conflict_do_nothing()
+    )
+    await db.execute(
+        delete(TableSlot).where(
+            TableSlot.slot_start < now - timedelta(days=1)
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+# Book a table by claiming its slots
+# Writers on the lock path hold the table's advisory lock exclusively; this
+# path only tries to take it in shared mode, so inventory bookings of the
+# same table run in parallel and give up at once while a lock-path writer is
+# active. The slots are claimed with FOR UPDATE SKIP LOCKED: when any of them
+# is locked by a concurrent claim the booking fails fast instead of queueing.
+# Bookings need not start on the grid, so two of them can meet inside one
+# slot; conflicts are decided on the real intervals, not on slot ownership,
+# and checked again once the slots are locked. Returns None on conflict.
+async def create_inventory_booking(
+    db: AsyncSession,
+    user_id: int,
+    table_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    guest_count: int,
+    special_requests: str = None
+) -> Optional[Booking]:
+    acquired = await db.scalar(
+        text("SELECT pg_try_advisory_xact_lock_shared(:lock_id)"),
+        {"lock_id": table_id}
+    )
+    if not acquired:
+        return None
+
+    slots = slot_starts(start_time, end_time)
+    # Also covers bookings written by the lock path, which claim no slots
+    booked = exists().where(
+        Booking.table_id == table_id,
+        Booking.status == "confirmed",
+        Booking.start_time < end_time,
+        Booking.end_time > start_time
+    )
+    claimed = (await db.execute(
+        select(TableSlot.slot_start)
+        .where(
+            TableSlot.table_id == table_id,
+            TableSlot.slot_start.in_(slots),
+            ~booked
+        )
+        .with_for_update(of=TableSlot, skip_locked=True)
+    )).scalars().all()
+    if len(claimed) != len(slots):
+        return None
+    # The check above saw the statement's snapshot: a claim on a shared
+    # slot that committed while the scan ran has its slot row re-read,
+    # but not its booking. Repeated now, under the slot locks, it sees
+    # every booking that could overlap.
+    if await db.scalar(select(booked)):
+        return None
+
+    booking = await db.scalar(
+        insert(Booking)
+        .values(
+            user_id=user_id,
+            table_id=table_id,
+            start_time=start_time,
+            end_time=end_time,
+            guest_count=guest_count,
+            special_requests=special_requests,
+            status=BookingStatus.CONFIRMED
+        )
+        .returning(Booking)
+    )
+    await db.execute(
+        update(TableSlot)
+        .where(
+            TableSlot.table_id == table_id,
+            TableSlot.slot_start.in_(slots)
+        )
+        .values(booking_id=booking.id)
+    )
+    await add_booking_events(db, BOOKING_CREATED, [booking])
+    await db.commit()
+    return booking
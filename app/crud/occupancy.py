@@ -0,0 +1,212 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import breaker_settings, occupancy_settings
+from app.models.booking import Booking
+from app.models.table import Table, TableStatus
+from app.schemas.table import TableResponse
+from app.utils.occupancy import OccupancyGrid
+
+
+class OccupancyCache:
+    """
+    Process-local occupancy grid over the next ``HORIZON_DAYS`` days.
+
+    Built from confirmed bookings on first use and kept current by every
+    booking write of this process. It is rebuilt every
+    ``REBUILD_SECONDS`` (picking up writes made by other workers), at the
+    start of each day, and after table changes.
+    """
+
+    def __init__(self):
+        self._grid: Optional[OccupancyGrid] = None
+        self._tables: Dict[int, TableResponse] = {}
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        # Mutations seen while a rebuild is reading the bookings
+        self._pending: Optional[
+            List[Tuple[int, int, datetime, datetime, int]]
+        ] = None
+
+    def invalidate(self) -> None:
+        self._grid = None
+
+    def _is_fresh(self) -> bool:
+        today = datetime.now(ZoneInfo("UTC")).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        return (
+            self._grid is not None
+            and self._grid.origin == today
+            and time.monotonic() - self._built_at
+            < occupancy_settings.REBUILD_SECONDS
+        )
+
+    async def get_grid(self, db: AsyncSession) -> OccupancyGrid:
+        if self._is_fresh():
+            return self._grid
+        async with self._lock:
+            if not self._is_fresh():
+                await self._rebuild(db)
+        return self._grid
+
+    async def _rebuild(self, db: AsyncSession) -> None:
+        origin = datetime.now(ZoneInfo("UTC")).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self._pending = []
+        try:
+            tables = (await db.execute(
+                select(Table)
+                .where(
+                    Table.is_active,
+                    Table.status == TableStatus.AVAILABLE
+                )
+                .order_by(Table.id)
+            )).scalars().all()
+            grid = OccupancyGrid(
+                origin,
+                occupancy_settings.HORIZON_DAYS,
+                occupancy_settings.SLOT_MINUTES,
+                [table.id for table in tables],
+                [table.capacity for table in tables],
+            )
+            bookings = (await db.execute(
+                select(
+                    Booking.id,
+                    Booking.table_id,
+                    Booking.start_time,
+                    Booking.end_time
+                ).where(
+                    Booking.status == "confirmed",
+                    Booking.start_time < grid.end,
+                    Booking.end_time > origin
+                )
+            )).all()
+            grid.add_intervals(
+                (table_id, start, end) for _, table_id, start, end in bookings
+            )
+
+            # Replay mutations the snapshot did not already include,
+            # following each booking's interval from the snapshot on
+            placed = {
+                booking_id: (table_id, start, end)
+                for booking_id, table_id, start, end in bookings
+            }
+            for booking_id, table_id, start, end, delta in self._pending:
+                interval = (table_id, start, end)
+                if delta > 0 and placed.get(booking_id) != interval:
+                    placed[booking_id] = interval
+                    grid.mark(table_id, start, end, 1)
+                elif delta < 0 and placed.get(booking_id) == interval:
+                    del placed[booking_id]
+                    grid.mark(table_id, start, end, -1)
+        finally:
+            self._pending = None
+
+        self._grid = grid
+        self._tables = {
+            table.id: TableResponse.from_orm(table) for table in tables
+        }
+        self._built_at = time.monotonic()
+
+    def snapshot(self) -> Optional[Tuple[OccupancyGrid, float]]:
+        """
+        The current grid and its age in seconds, without rebuilding it.
+        None when there is none or it is older than
+        ``MAX_STALENESS_SECONDS``.
+        """
+        if self._grid is None:
+            return None
+        age = time.monotonic() - self._built_at
+        if age > breaker_settings.MAX_STALENESS_SECONDS:
+            return None
+        return self._grid, age
+
+    def tables(self, table_ids: List[int]) -> List[TableResponse]:
+        return [self._tables[table_id] for table_id in table_ids]
+
+    def _apply(
+        self,
+        booking_id: int,
+        table_id: int,
+        start: datetime,
+        end: datetime,
+        delta: int
+    ) -> None:
+        if self._pending is not None:
+            self._pending.append((booking_id, table_id, start, end, delta))
+        if self._grid is not None:
+            self._grid.mark(table_id, start, end, delta)
+
+    def booking_created(self, booking: Booking) -> None:
+        self._apply(
+            booking.id, booking.table_id,
+            booking.start_time, booking.end_time, 1
+        )
+
+    def booking_cancelled(self, booking: Booking) -> None:
+        self._apply(
+            booking.id, booking.table_id,
+            booking.start_time, booking.end_time, -1
+        )
+
+    def booking_moved(
+        self,
+        booking_id: int,
+        old: Tuple[int, datetime, datetime],
+        new: Tuple[int, datetime, datetime]
+    ) -> None:
+        """``old`` and ``new`` are (table id, start, end) of the booking"""
+        self._apply(booking_id, *old, -1)
+        self._apply(booking_id, *new, 1)
+
+    def booking_extended(self, booking: Booking, old_end: datetime) -> None:
+        self.booking_moved(
+            booking.id,
+            (booking.table_id, booking.start_time, old_end),
+            (booking.table_id, booking.start_time, booking.end_time)
+        )
+
+
+occupancy_cache = OccupancyCache()
+
+
+async def get_free_tables(
+    db: AsyncSession,
+    start_time: datetime,
+    end_time: datetime,
+    min_capacity: Optional[int] = None
+) -> Optional[List[int]]:
+    """Free table ids from the grid, or None outside its horizon"""
+    grid = await occupancy_cache.get_grid(db)
+    if not grid.covers(start_time, end_time):
+        return None
+    return grid.free_tables(start_time, end_time, min_capacity)
+
+
+def get_stale_free_tables(
+    start_time: datetime,
+    end_time: datetime,
+    min_capacity: Optional[int] = None
+) -> Optional[Tuple[List[TableResponse], float]]:
+    """
+    Free tables and the snapshot age in seconds, from the last grid built
+    and without touching the database. None when no recent enough grid
+    covers the interval. Recurring series past their materialised
+    horizon are not accounted for.
+    """
+    snapshot = occupancy_cache.snapshot()
+    if snapshot is None:
+        return None
+    grid, age = snapshot
+    if not grid.covers(start_time, end_time):
+        return None
+    table_ids = grid.free_tables(start_time, end_time, min_capacity)
+    return occupancy_cache.tables(table_ids), age
+
@@ -0,0 +1,150 @@
+import random
+from datetime import timedelta
+from typing import Dict, List, Sequence
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import outbox_settings
+from app.models.booking import Booking, BookingStatus
+from app.models.outbox import OutboxEvent
+
+# This module stages booking events in the transactional outbox.
+
+BOOKING_CREATED = "booking.created"
+BOOKING_CANCELLED = "booking.cancelled"
+BOOKING_EXTENDED = "booking.extended"
+BOOKING_MODIFIED = "booking.modified"
+
+
+def booking_payload(booking: Booking, **changes) -> Dict:
+    """Event payload of a booking, with ``changes`` applied on top"""
+    payload = {
+        "booking_id": booking.id,
+        "user_id": booking.user_id,
+        "table_id": booking.table_id,
+        "start_time": booking.start_time.isoformat(),
+        "end_time": booking.end_time.isoformat(),
+        "guest_count": booking.guest_count,
+        "status": BookingStatus(booking.status).value,
+    }
+    payload.update(changes)
+    return payload
+
+
+# Stage events in the caller's transaction; they are committed (or rolled
+# back) together with the booking change they describe
+async def add_outbox_events(
+    db: AsyncSession,
+    event_type: str,
+    payloads: Sequence[Dict]
+) -> None:
+    if not payloads:
+        return
+    await db.execute(insert(OutboxEvent), [
+        {
+            "event_type": event_type,
+            "aggregate_id": payload["booking_id"],
+            "payload": payload,
+        }
+        for payload in payloads
+    ])
+
+
+async def add_booking_events(
+    db: AsyncSession,
+    event_type: str,
+    bookings: Sequence[Booking]
+) -> None:
+    await add_outbox_events(
+        db, event_type, [booking_payload(booking) for booking in bookings]
+    )
+
+
+# Claim the next batch of due events in id order
+# Ids come from a sequence when the event is inserted, so a transaction that
+# commits late can have its events delivered after higher ids. Changes to one
+# booking are serialised by its row and table locks, so its own events keep
+# their order. Rows locked by another dispatcher are skipped; the locks are
+# held until the caller records the delivery outcome and commits.
+async def claim_outbox_batch(
+    db: AsyncSession,
+    limit: int
+) -> List[OutboxEvent]:
+    result = await db.execute(
+        select(OutboxEvent)
+        .where(
+            OutboxEvent.delivered_at.is_(None),
+            OutboxEvent.available_at <= func.now(),
+            OutboxEvent.attempts < outbox_settings.MAX_ATTEMPTS
+        )
+        .order_by(OutboxEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return result.scalars().all()
+
+
+async def mark_outbox_delivered(db: AsyncSession, ids: Sequence[int]):
+    await db.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_(ids))
+        .values(delivered_at=func.now(), last_error=None)
+    )
+
+
+async def mark_outbox_failed(
+    db: AsyncSession,
+    ids: Sequence[int],
+    error: str
+):
+    """
+    Schedule a retry with exponential backoff. The jitter is drawn once
+    per batch so the events of a batch stay together and in order.
+    """
+    delay = func.least(
+        outbox_settings.BACKOFF_BASE_SECONDS
+        * func.power(2, OutboxEvent.attempts),
+        outbox_settings.BACKOFF_MAX_SECONDS
+    ) * random.uniform(0.8, 1.2)
+    await db.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_(ids))
+        .values(
+            attempts=OutboxEvent.attempts + 1,
+            available_at=func.now() + delay * timedelta(seconds=1),
+            last_error=error[:1000]
+        )
+    )
+
+
+async def purge_delivered_events(db: AsyncSession) -> int:
+    result = await db.execute(
+        delete(OutboxEvent).where(
+            OutboxEvent.delivered_at < func.now() - timedelta(
+                days=outbox_settings.RETENTION_DAYS
+            )
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def get_outbox_metrics(db: AsyncSession) -> Dict:
+    """Backlog size and age of the oldest undelivered event"""
+    undelivered = OutboxEvent.delivered_at.is_(None)
+    dead = OutboxEvent.attempts >= outbox_settings.MAX_ATTEMPTS
+    oldest = func.min(OutboxEvent.created_at).filter(~dead)
+    pending, failed, oldest_at, lag = (await db.execute(
+        select(
+            func.count().filter(~dead),
+            func.count().filter(dead),
+            oldest,
+            func.extract("epoch", func.now() - oldest),
+        ).where(undelivered)
+    )).one()
+    return {
+        "pending": pending,
+        "dead": failed,
+        "oldest_pending_at": oldest_at,
+        "lag_seconds": float(lag or 0),
+    }
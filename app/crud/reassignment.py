@@ -0,0 +1,192 @@
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+from zoneinfo import ZoneInfo
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.booking import _day_intervals, _lock_tables
+from app.crud.outbox import (
+    BOOKING_MODIFIED,
+    add_outbox_events,
+    booking_payload,
+)
+from app.crud.occupancy import occupancy_cache
+from app.models.booking import Booking, BookingStatus
+from app.models.table import Table, TableStatus
+
+# This module moves bookings off tables that are taken out of service.
+
+Interval = Tuple[datetime, datetime]
+
+
+def _is_free(taken: Sequence[Interval], start: datetime, end: datetime):
+    return not any(s < end and e > start for s, e in taken)
+
+
+def _overlap_groups(bookings: Sequence[Booking]) -> List[List[Booking]]:
+    """Split bookings sorted by start into groups of overlapping bookings"""
+    groups: List[List[Booking]] = []
+    group_end = None
+    for booking in bookings:
+        if groups and booking.start_time < group_end:
+            groups[-1].append(booking)
+            group_end = max(group_end, booking.end_time)
+        else:
+            groups.append([booking])
+            group_end = booking.end_time
+    return groups
+
+
+def match_bookings(
+    bookings: Sequence[Booking],
+    tables: Sequence[Table],
+    taken: Dict[int, List[Interval]]
+) -> Dict[int, int]:
+    """
+    Assign bookings to tables, returning booking id -> table id.
+
+    Groups of overlapping bookings do not compete with each other, so
+    each group is solved on its own as a bipartite matching (augmenting
+    paths) between bookings and the tables that are free and large
+    enough for them. Tables are tried smallest first, so the matching
+    prefers a tight fit. Bookings of a group that do not overlap can
+    share a table, so anything left unmatched gets a second, direct
+    placement attempt. ``taken`` is updated with the new assignments.
+    """
+    tables = sorted(tables, key=lambda table: (table.capacity, table.id))
+    assignment: Dict[int, int] = {}
+
+    for group in _overlap_groups(bookings):
+        options = {
+            booking.id: [
+                table.id for table in tables
+                if table.capacity >= (booking.guest_count or 1)
+                and _is_free(
+                    taken.get(table.id, []),
+                    booking.start_time,
+                    booking.end_time
+                )
+            ]
+            for booking in group
+        }
+        matched: Dict[int, int] = {}  # table id -> booking id
+
+        def augment(booking_id: int, seen: set) -> bool:
+            for table_id in options[booking_id]:
+                if table_id in seen:
+                    continue
+                seen.add(table_id)
+                if table_id not in matched or augment(matched[table_id], seen):
+                    matched[table_id] = booking_id
+                    return True
+            return False
+
+        for booking in sorted(group, key=lambda b: len(options[b.id])):
+            augment(booking.id, set())
+
+        by_id = {booking.id: booking for booking in group}
+        for table_id, booking_id in matched.items():
+            assignment[booking_id] = table_id
+            booking = by_id[booking_id]
+            taken.setdefault(table_id, []).append(
+                (booking.start_time, booking.end_time)
+            )
+
+        for booking in group:
+            if booking.id in assignment:
+                continue
+            for table_id in options[booking.id]:
+                if _is_free(
+                    taken.get(table_id, []),
+                    booking.start_time,
+                    booking.end_time
+                ):
+                    assignment[booking.id] = table_id
+                    taken.setdefault(table_id, []).append(
+                        (booking.start_time, booking.end_time)
+                    )
+                    break
+
+    return assignment
+
+
+def _move_bookings(assignment: Dict[int, int]):
+    """One UPDATE moving each booking of ``assignment`` to its table"""
+    return (
+        update(Booking)
+        .where(Booking.id.in_(assignment))
+        .values(table_id=case(assignment, value=Booking.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Move future confirmed bookings off the given tables
+# The source and candidate tables are locked together, the assignment is
+# solved in memory from one read of the candidates' bookings, and all moves
+# are written with a single UPDATE in one transaction. Returns the moves as
+# (booking_id, from_table_id, to_table_id) and the ids of bookings that
+# could not be placed (they stay on their table for staff to handle).
+async def reassign_table_bookings(
+    db: AsyncSession,
+    table_ids: Sequence[int]
+) -> Tuple[List[Tuple[int, int, int]], List[int]]:
+    result = await db.execute(
+        select(Booking)
+        .where(
+            Booking.table_id.in_(table_ids),
+            Booking.status == BookingStatus.CONFIRMED,
+            Booking.start_time >= datetime.now(ZoneInfo("UTC"))
+        )
+        .order_by(Booking.start_time, Booking.id)
+    )
+    bookings = result.scalars().all()
+    if not bookings:
+        return [], []
+
+    result = await db.execute(
+        select(Table).where(
+            Table.is_active,
+            Table.status == TableStatus.AVAILABLE,
+            Table.id.notin_(table_ids),
+            Table.capacity >= min(
+                booking.guest_count or 1 for booking in bookings
+            )
+        )
+    )
+    tables = result.scalars().all()
+    await _lock_tables(
+        db, list(table_ids) + [table.id for table in tables]
+    )
+    taken = await _day_intervals(
+        db,
+        [table.id for table in tables],
+        bookings[0].start_time,
+        max(booking.end_time for booking in bookings)
+    ) if tables else {}
+
+    assignment = match_bookings(bookings, tables, taken)
+    moves = [
+        (booking.id, booking.table_id, assignment[booking.id])
+        for booking in bookings if booking.id in assignment
+    ]
+    if assignment:
+        await add_outbox_events(db, BOOKING_MODIFIED, [
+            booking_payload(booking, table_id=assignment[booking.id])
+            for booking in bookings if booking.id in assignment
+        ])
+        await db.execute(_move_bookings(assignment))
+    await db.commit()
+    for booking in bookings:
+        if booking.id in assignment:
+            # Not synchronised: the booking still has its old table
+            interval = (booking.start_time, booking.end_time)
+            occupancy_cache.booking_moved(
+                booking.id,
+                (booking.table_id, *interval),
+                (assignment[booking.id], *interval)
+            )
+
+    unplaced = [
+        booking.id for booking in bookings if booking.id not in assignment
+    ]
+    return moves, unplaced
@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import between, exists, func, lambda_stmt, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.models.booking import Booking
+from app.models.table import Table, TableStatus
+from app.models.user import User
+from app.schemas.booking import BookingFilter
+
+# Registry of the statements run on (nearly) every request.
+# They are lambda statements: SQLAlchemy keys its compiled cache on the
+# lambda's code, so repeated calls skip building the statement and its
+# cache key and only pull the closure values out as bound parameters.
+# The SQL text is the same on every call, which keeps asyncpg's
+# prepared-statement cache warm. Closure variables must be plain values;
+# unpack objects into locals before referring to them in a lambda.
+
+
+def user_by_email(email: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.email == email))
+
+
+def available_tables(
+    start_time: datetime,
+    end_time: datetime,
+    guest_count: Optional[int] = None
+) -> StatementLambdaElement:
+    stmt = lambda_stmt(
+        lambda: select(Table).where(
+            Table.is_active,
+            Table.status == TableStatus.AVAILABLE,
+            ~exists().where(
+                Booking.table_id == Table.id,
+                Booking.status == "confirmed",
+                Booking.start_time < end_time,
+                Booking.end_time > start_time
+            )
+        )
+    )
+    if guest_count:
+        stmt += lambda s: s.where(Table.capacity >= guest_count)
+    return stmt
+
+
+def _booking_filters(
+    stmt: StatementLambdaElement,
+    filters: Optional[BookingFilter]
+) -> StatementLambdaElement:
+    if filters is None:
+        return stmt
+    user_id, status = filters.user_id, filters.status
+    if user_id is not None:
+        stmt += lambda s: s.where(Booking.user_id == user_id)
+    if status is not None:
+        stmt += lambda s: s.where(Booking.status == status)
+    if filters.booking_date is not None:
+        day_start = datetime.combine(filters.booking_date, datetime.min.time())
+        day_end = datetime.combine(filters.booking_date, datetime.max.time())
+        stmt += lambda s: s.where(
+            between(Booking.start_time, day_start, day_end)
+        )
+    return stmt
+
+
+def bookings(
+    skip: int,
+    limit: int,
+    filters: Optional[BookingFilter] = None
+) -> StatementLambdaElement:
+    stmt = _booking_filters(lambda_stmt(lambda: select(Booking)), filters)
+    stmt += lambda s: s.offset(skip).limit(limit)
+    return stmt
+
+
+def booking_count(
+    filters: Optional[BookingFilter] = None
+) -> StatementLambdaElement:
+    # count(*) rather than count(id): the rows can then be counted from
+    # an index on the filtered columns alone (an index-only scan)
+    return _booking_filters(
+        lambda_stmt(lambda: select(func.count()).select_from(Booking)),
+        filters
+    )
@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 
+from app.crud.inventory import materialize_slots
+from app.crud.occupancy import occupancy_cache
 from app.models.table import Table, TableStatus
 
 
@@ -12,6 +14,9 @@ async def create_table(db: AsyncSession, table_data):
     db.add(db_table)
     await db.commit()
     await db.refresh(db_table)
+    occupancy_cache.invalidate()
+    if db_table.inventory_mode:
+        await materialize_slots(db, [db_table.id])
     return db_table
 
 
@@ -57,6 +62,9 @@ async def update_table(db: AsyncSession, table_id: int, table_data):
             setattr(db_table, key, value)
         await db.commit()
         await db.refresh(db_table)
+        occupancy_cache.invalidate()
+        if update_data.get("inventory_mode"):
+            await materialize_slots(db, [db_table.id])
     return db_table
 
 
@@ -65,6 +73,7 @@ async def delete_table(db: AsyncSession, table_id: int):
     if db_table:
         await db.delete(db_table)
         await db.commit()
+        occupancy_cache.invalidate()
     return db_table
 
 
@@ -76,11 +85,12 @@ async def set_table_status(
     db_table = await get_table(db, table_id)
     if not db_table:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=404,
             detail="Table not found"
         )
 
     db_table.status = status
     await db.commit()
     await db.refresh(db_table)
+    occupancy_cache.invalidate()
     return db_table
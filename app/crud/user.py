@@ -1,22 +1,24 @@
 # crud/user.py
-from typing import List, Optional
-from sqlalchemy import delete, func, update
+import base64
+import json
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, func, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from sqlalchemy.future import select
-from app.api.deps.pagination import PaginationParams
+from app.crud import statements
 from app.models.user import User, UserRole
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserDirectoryFilter, UserUpdate
 from app.utils.security import get_password_hash
 
 # This module contains CRUD operations for the User model.
 
+# Shortest substring the trigram index can serve
+MIN_CONTAINS_LENGTH = 3
+
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get a user by email address."""
-    result = await db.execute(select(User)
-                              .where(User.email == email)
-                              .options(selectinload(User.bookings)))
+    result = await db.execute(statements.user_by_email(email))
     return result.scalars().first()
 
 
@@ -66,28 +68,6 @@ async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
     return result.scalars().first()
 
 
-async def get_users(
-    db: AsyncSession,
-    pagination: PaginationParams,
-    filters: Optional[dict] = None
-) -> List[User]:
-    """Optimized pagination with window functions for count"""
-    query = select(User)
-
-    if filters:
-        for field, value in filters.items():
-            if hasattr(User, field):
-                query = query.where(getattr(User, field) == value)
-
-    # Add pagination
-    query = query.offset(
-        (pagination.page - 1) * pagination.size
-    ).limit(pagination.size)
-
-    result = await db.execute(query)
-    return result.scalars().all()
-
-
 async def delete_user(db: AsyncSession, user_id: int) -> bool:
     """Delete a user."""
     result = await db.execute(
@@ -97,17 +77,95 @@ async def delete_user(db: AsyncSession, user_id: int) -> bool:
     return result.rowcount > 0
 
 
-async def get_users_count(
+def _email_key():
+    # Matches idx_user_email_lower; in the C collation a prefix is a range
+    return func.lower(User.email).collate("C")
+
+
+def _directory_conditions(filters: UserDirectoryFilter) -> list:
+    conditions = []
+    if filters.role is not None:
+        conditions.append(User.role == filters.role)
+    if filters.is_active is not None:
+        conditions.append(User.is_active == filters.is_active)
+    if filters.email:
+        term = filters.email.lower()
+        if filters.match == "contains":
+            if len(term) < MIN_CONTAINS_LENGTH:
+                raise ValueError(
+                    f"Substring search needs at least "
+                    f"{MIN_CONTAINS_LENGTH} characters"
+                )
+            conditions.append(
+                func.lower(User.email).contains(term, autoescape=True)
+            )
+        else:
+            conditions.append(_email_key() >= term)
+            if ord(term[-1]) < 0x10FFFF:
+                conditions.append(
+                    _email_key() < term[:-1] + chr(ord(term[-1]) + 1)
+                )
+    return conditions
+
+
+def _encode_cursor(key: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str, by_email: bool) -> list:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        types = [str, int] if by_email else [int]
+        if not isinstance(key, list) or [type(k) for k in key] != types:
+            raise ValueError(cursor)
+        return key
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def estimate_user_count(db: AsyncSession, conditions: list) -> int:
+    """Planner estimate of the users matching, instead of a COUNT that
+    reads all of them"""
+    conn = await db.connection()
+    query = select(User.id).where(*conditions).compile(
+        dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {query}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def get_user_directory(
     db: AsyncSession,
-    filters: Optional[dict] = None
-) -> int:
-    """Get total count of users for pagination"""
-    query = select(func.count(User.id))
-
-    if filters:
-        for field, value in filters.items():
-            if hasattr(User, field):
-                query = query.where(getattr(User, field) == value)
-
-    result = await db.execute(query)
-    return result.scalar()
+    filters: UserDirectoryFilter,
+    size: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[User], Optional[str], int]:
+    """
+    One page of users matching the filters, the cursor of the next page
+    (None on the last) and an estimate of the total. Pages are in email
+    order for a prefix search and id order otherwise, read by keyset.
+    Raises ValueError for a bad cursor or search term.
+    """
+    conditions = _directory_conditions(filters)
+    by_email = bool(filters.email) and filters.match == "prefix"
+    sort_key = _email_key() if by_email else User.id
+    query = select(User, sort_key).where(*conditions)
+    if cursor:
+        key = _decode_cursor(cursor, by_email)
+        if by_email:
+            query = query.where(tuple_(sort_key, User.id) > tuple(key))
+        else:
+            query = query.where(User.id > key[0])
+    query = query.order_by(*((sort_key, User.id) if by_email else (User.id,)))
+
+    rows = (await db.execute(query.limit(size + 1))).all()
+    estimated_total = await estimate_user_count(db, conditions)
+    users = [row[0] for row in rows[:size]]
+    if len(rows) <= size:
+        return users, None, estimated_total
+    last_user, last_key = rows[size - 1]
+    key = [last_key, last_user.id] if by_email else [last_user.id]
+    return users, _encode_cursor(key), estimated_total
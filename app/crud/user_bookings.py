@@ -0,0 +1,163 @@
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, select, text, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.booking import Booking, BookingStatus
+from app.models.booking_stats import (
+    STATS_LOCK,
+    BookingStatsWatermark,
+    UserBookingStats,
+)
+
+# This module serves a user's own bookings, paged by keyset on
+# (start_time, id). Every branch filters on (user_id, status) and a
+# start_time range, so it is an idx_booking_composite range scan that
+# stops after one page however long the history is.
+
+UPCOMING = "upcoming"
+PAST = "past"
+
+# A past page merges one keyset scan per status. A confirmed booking
+# whose start has passed is past too: nothing marks bookings completed.
+_PAST_STATUSES = (
+    BookingStatus.CONFIRMED,
+    BookingStatus.COMPLETED,
+    BookingStatus.CANCELLED,
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(ZoneInfo("UTC"))
+
+
+def encode_cursor(booking: Booking) -> str:
+    key = f"{booking.start_time.isoformat()}|{booking.id}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(start_time, id) of the last booking of the previous page; raises
+    ValueError for a cursor this module did not issue"""
+    try:
+        start, booking_id = base64.urlsafe_b64decode(
+            cursor.encode()
+        ).decode().split("|")
+        start_time = datetime.fromisoformat(start)
+        if start_time.tzinfo is None:
+            raise ValueError(cursor)
+        return start_time, int(booking_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _upcoming_page(user_id, now, after, size):
+    query = select(Booking).where(
+        Booking.user_id == user_id,
+        Booking.status == BookingStatus.CONFIRMED,
+        Booking.start_time >= now,
+    )
+    if after is not None:
+        # Postgres derives the start_time bound of the index scan from
+        # the row comparison; id breaks ties between equal start times
+        query = query.where(tuple_(Booking.start_time, Booking.id) > after)
+    return query.order_by(Booking.start_time, Booking.id).limit(size)
+
+
+def _past_page(user_id, now, before, size):
+    branches = []
+    for booking_status in _PAST_STATUSES:
+        branch = select(Booking.id, Booking.start_time).where(
+            Booking.user_id == user_id,
+            Booking.status == booking_status,
+        )
+        if booking_status == BookingStatus.CONFIRMED:
+            branch = branch.where(Booking.start_time < now)
+        if before is not None:
+            branch = branch.where(
+                tuple_(Booking.start_time, Booking.id) < before
+            )
+        branches.append(
+            branch.order_by(Booking.start_time.desc(), Booking.id.desc())
+            .limit(size)
+        )
+    merged = union_all(*branches).subquery()
+    page = aliased(Booking)
+    return (
+        select(page)
+        .join(merged, merged.c.id == page.id)
+        .order_by(merged.c.start_time.desc(), merged.c.id.desc())
+        .limit(size)
+    )
+
+
+async def get_user_bookings(
+    db: AsyncSession,
+    user_id: int,
+    scope: str,
+    size: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Booking], Optional[str]]:
+    """
+    One page of the user's upcoming (soonest first) or past (latest
+    first) bookings and the cursor of the next page, None on the last
+    """
+    key = decode_cursor(cursor) if cursor else None
+    build = _upcoming_page if scope == UPCOMING else _past_page
+    result = await db.execute(build(user_id, _utcnow(), key, size + 1))
+    bookings = result.scalars().all()
+    if len(bookings) <= size:
+        return bookings, None
+    bookings = bookings[:size]
+    return bookings, encode_cursor(bookings[-1])
+
+
+async def get_booking_summary(
+    db: AsyncSession,
+    user_id: int
+) -> Optional[UserBookingStats]:
+    """The user's counters, None if they never booked"""
+    return await db.get(UserBookingStats, user_id)
+
+
+async def roll_booking_stats(db: AsyncSession) -> int:
+    """
+    Move the watermark to now, counting confirmed bookings that started
+    in between as completed instead of upcoming. Returns how many moved.
+    """
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(:key1, :key2)"),
+        {"key1": STATS_LOCK[0], "key2": STATS_LOCK[1]}
+    )
+    mark = await db.get(BookingStatsWatermark, 1)
+    if mark is None:
+        return 0
+    now = await db.scalar(select(func.now()))
+    moved = (
+        select(Booking.user_id, func.count().label("n"))
+        .where(
+            Booking.status == BookingStatus.CONFIRMED,
+            Booking.start_time >= mark.watermark,
+            Booking.start_time < now,
+            Booking.user_id.isnot(None),
+        )
+        .group_by(Booking.user_id)
+        .subquery()
+    )
+    result = await db.execute(
+        UserBookingStats.__table__.update()
+        .where(UserBookingStats.user_id == moved.c.user_id)
+        .values(
+            upcoming=UserBookingStats.upcoming - moved.c.n,
+            completed=UserBookingStats.completed + moved.c.n,
+        )
+        .returning(moved.c.n)
+    )
+    count = sum(result.scalars().all())
+    mark.watermark = now
+    await db.commit()
+    return count
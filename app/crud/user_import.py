@@ -0,0 +1,225 @@
+import asyncio
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import (Column, MetaData, String, Table, any_, bindparam,
+                        literal, select, true)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
+from app.core.config import user_import_settings
+from app.database import async_session
+from app.models.user import User, UserRole
+from app.schemas.user import UserCreate
+from app.tasks.audit import audit_log
+from app.utils.password_pool import password_pool
+
+# This module imports users in bulk from an uploaded CSV or NDJSON file.
+# Rows are validated like a registration, de-duplicated within the file
+# and against existing users in one query, their passwords hashed across
+# the password pool, and the users written with one COPY. Progress and
+# rejected rows are reported as events while it runs.
+
+CSV = "csv"
+NDJSON = "ndjson"
+FIELDS = ("email", "password")
+
+_EXTENSIONS = {".csv": CSV, ".ndjson": NDJSON, ".jsonl": NDJSON}
+_CONTENT_TYPES = {
+    "text/csv": CSV,
+    "application/x-ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+}
+
+# Rows are COPY'd into a temporary table first, so that users registered
+# during the import are skipped instead of failing it
+_staging = Table(
+    "user_import",
+    MetaData(),
+    Column("email", String(255)),
+    Column("hashed_password", String(255)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    for extension, fmt in _EXTENSIONS.items():
+        if (filename or "").lower().endswith(extension):
+            return fmt
+    fmt = _CONTENT_TYPES.get((content_type or "").split(";")[0].strip())
+    if fmt is None:
+        raise ValueError("Upload a .csv, .ndjson or .jsonl file")
+    return fmt
+
+
+def parse_rows(data: bytes, fmt: str) -> List[Tuple[int, object]]:
+    """
+    (row number, raw row) of each record in the file: the line number
+    in NDJSON, the record number after the header in CSV. Raises
+    ValueError if the file cannot be read at all; bad rows are reported
+    when validated.
+    """
+    try:
+        content = data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ValueError("The file is not UTF-8 text") from e
+
+    if fmt == NDJSON:
+        lines = enumerate(content.splitlines(), start=1)
+        return [(number, line) for number, line in lines if line.strip()]
+
+    reader = csv.DictReader(io.StringIO(content))
+    missing = set(FIELDS) - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+    try:
+        return list(enumerate(reader, start=1))
+    except csv.Error as e:
+        raise ValueError(f"Malformed CSV: {str(e)}") from e
+
+
+def _validate(raw, fmt: str) -> UserCreate:
+    # ValidationError and JSONDecodeError are both ValueErrors
+    if fmt == NDJSON:
+        raw = json.loads(raw)
+        if not isinstance(raw, dict):
+            raise ValueError("Expected a JSON object")
+    return UserCreate(**{field: raw.get(field) for field in FIELDS})
+
+
+def _describe(error: ValueError) -> str:
+    errors = getattr(error, "errors", None)
+    if errors is None:
+        return str(error)
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}"
+        for e in errors()
+    )
+
+
+def _rejected(row: int, email: Optional[str], detail: str) -> Dict:
+    return {"event": "error", "row": row, "email": email, "detail": detail}
+
+
+def _progress(stage: str, done: int, total: int) -> Dict:
+    return {"event": "progress", "stage": stage, "done": done, "total": total}
+
+
+async def _hash_batch(emails: List[str], passwords: List[str]):
+    return emails, await password_pool.hash(passwords)
+
+
+async def import_users(
+    rows: List[Tuple[int, object]],
+    fmt: str,
+    actor_id: Optional[int] = None
+) -> AsyncIterator[Dict]:
+    """
+    Import parsed rows, yielding ``progress`` events per stage
+    (validated, hashed), an ``error`` event for each row not imported
+    and finally a ``done`` event with the counts
+    """
+    accepted: Dict[str, Tuple[int, str]] = {}
+    invalid = duplicates = 0
+
+    batch_size = user_import_settings.VALIDATE_BATCH_SIZE
+    for start in range(0, len(rows), batch_size):
+        for number, raw in rows[start:start + batch_size]:
+            try:
+                user = _validate(raw, fmt)
+            except ValueError as e:
+                invalid += 1
+                yield _rejected(number, None, _describe(e))
+                continue
+            if user.email in accepted:
+                duplicates += 1
+                yield _rejected(
+                    number, user.email,
+                    f"Duplicate of row {accepted[user.email][0]}"
+                )
+                continue
+            accepted[user.email] = (number, user.password)
+        yield _progress(
+            "validated", min(start + batch_size, len(rows)), len(rows)
+        )
+        # Let other requests in between batches
+        await asyncio.sleep(0)
+
+    if accepted:
+        async with async_session() as db:
+            existing = await db.scalars(
+                select(User.email).where(User.email == any_(bindparam(
+                    "emails", list(accepted), type_=ARRAY(String)
+                )))
+            )
+            for email in existing.all():
+                number, _ = accepted.pop(email)
+                duplicates += 1
+                yield _rejected(number, email, "Email already registered")
+
+    emails = list(accepted)
+    hashed: List[Tuple[str, str]] = []
+    batch_size = user_import_settings.HASH_BATCH_SIZE
+    tasks = [
+        asyncio.ensure_future(_hash_batch(
+            emails[start:start + batch_size],
+            [accepted[email][1] for email in emails[start:start + batch_size]]
+        ))
+        for start in range(0, len(emails), batch_size)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            batch, hashes = await next_done
+            hashed.extend(zip(batch, hashes))
+            yield _progress("hashed", len(hashed), len(emails))
+    finally:
+        # The client went away: drop the batches not yet hashed
+        for task in tasks:
+            task.cancel()
+
+    created = []
+    if hashed:
+        async with async_session() as db:
+            conn = await db.connection()
+            await conn.run_sync(_staging.create)
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                _staging.name,
+                records=hashed,
+                columns=[column.name for column in _staging.columns]
+            )
+            result = await conn.execute(
+                insert(User)
+                .from_select(
+                    ["email", "hashed_password", "is_active", "role"],
+                    select(
+                        _staging.c.email,
+                        _staging.c.hashed_password,
+                        true(),
+                        literal(UserRole.GUEST, User.role.type),
+                    )
+                )
+                .on_conflict_do_nothing(index_elements=["email"])
+                .returning(User.id, User.email)
+            )
+            created = result.all()
+            await db.commit()
+
+    inserted = {email for _, email in created}
+    for email, _ in hashed:
+        if email not in inserted:
+            duplicates += 1
+            yield _rejected(
+                accepted[email][0], email, "Email already registered"
+            )
+    for user_id, _ in created:
+        await audit_log.record("user.import", "user", user_id, actor_id)
+
+    yield {
+        "event": "done",
+        "created": len(created),
+        "duplicates": duplicates,
+        "invalid": invalid,
+    }
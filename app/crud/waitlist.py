@@ -0,0 +1,248 @@
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+from sqlalchemy import or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import waitlist_settings
+from app.crud.booking import (
+    _booking_window,
+    _check_intervals,
+    _series_busy_intervals,
+)
+from app.crud.outbox import (
+    BOOKING_CANCELLED,
+    BOOKING_CREATED,
+    add_booking_events,
+)
+from app.crud.occupancy import occupancy_cache
+from app.models.booking import Booking, BookingStatus
+from app.models.table import Table, TableStatus
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.schemas.waitlist import WaitlistCreate
+
+# This module contains CRUD operations for the booking waitlist.
+
+WAITLIST_CHANNEL = "waitlist_events"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(ZoneInfo("UTC"))
+
+
+async def _notify(db: AsyncSession, entry: WaitlistEntry):
+    """Queue a NOTIFY, delivered to listeners when the transaction commits"""
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {
+            "channel": WAITLIST_CHANNEL,
+            "payload": json.dumps({
+                "entry_id": entry.id,
+                "user_id": entry.user_id,
+                "status": entry.status.value,
+                "booking_id": entry.booking_id,
+                "hold_expires_at": (
+                    entry.hold_expires_at.isoformat()
+                    if entry.hold_expires_at else None
+                ),
+            })
+        }
+    )
+
+
+async def create_waitlist_entry(
+    db: AsyncSession,
+    user_id: int,
+    entry_data: WaitlistCreate
+) -> WaitlistEntry:
+    entry = WaitlistEntry(
+        user_id=user_id,
+        status=WaitlistStatus.WAITING,
+        **entry_data.dict()
+    )
+    db.add(entry)
+    await db.commit()
+    await db.refresh(entry)
+    return entry
+
+
+async def get_waitlist_entry(
+    db: AsyncSession,
+    entry_id: int
+) -> Optional[WaitlistEntry]:
+    return await db.get(WaitlistEntry, entry_id)
+
+
+async def get_user_waitlist(
+    db: AsyncSession,
+    user_id: int
+) -> List[WaitlistEntry]:
+    result = await db.execute(
+        select(WaitlistEntry)
+        .where(WaitlistEntry.user_id == user_id)
+        .order_by(WaitlistEntry.created_at.desc())
+    )
+    return result.scalars().all()
+
+
+async def confirm_waitlist_hold(
+    db: AsyncSession,
+    entry: WaitlistEntry
+) -> WaitlistEntry:
+    if entry.status != WaitlistStatus.HELD:
+        raise ValueError("Only held waitlist entries can be confirmed")
+    entry.status = WaitlistStatus.BOOKED
+    entry.hold_expires_at = None
+    await db.commit()
+    await db.refresh(entry)
+    return entry
+
+
+async def cancel_waitlist_entry(
+    db: AsyncSession,
+    entry: WaitlistEntry
+) -> WaitlistEntry:
+    """Leave the waitlist, releasing a held slot to the next in line"""
+    if entry.status not in (WaitlistStatus.WAITING, WaitlistStatus.HELD):
+        raise ValueError("This waitlist entry is no longer active")
+
+    freed = None
+    if entry.status == WaitlistStatus.HELD:
+        booking = await db.get(Booking, entry.booking_id)
+        if booking and booking.status == BookingStatus.CONFIRMED:
+            booking.status = BookingStatus.CANCELLED
+            await add_booking_events(db, BOOKING_CANCELLED, [booking])
+            freed = booking
+    entry.status = WaitlistStatus.CANCELLED
+    entry.hold_expires_at = None
+    await db.commit()
+    await db.refresh(entry)
+
+    if freed:
+        occupancy_cache.booking_cancelled(freed)
+        await promote_waitlist(db, freed.table_id, freed.start_time)
+    return entry
+
+
+# Promote the first waiting entry that matches a freed slot
+# The lookup is a range scan on idx_waitlist_status_window (status, start
+# window) filtered by capacity and location, oldest entry first. Entries
+# locked by a concurrent promotion are skipped. The matched guest is booked
+# directly, or the booking is held for WAITLIST_HOLD_MINUTES when the entry
+# asked to confirm first. Listeners are notified on commit.
+async def promote_waitlist(
+    db: AsyncSession,
+    table_id: int,
+    start_time: datetime
+) -> Optional[WaitlistEntry]:
+    start_time, end_time = _booking_window(start_time)
+    if start_time <= _utcnow():
+        return None
+    table = await db.get(Table, table_id)
+    if (
+        not table
+        or not table.is_active
+        or table.status != TableStatus.AVAILABLE
+    ):
+        return None
+
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(:lock_id)"),
+        {"lock_id": table_id}
+    )
+    result = await db.execute(
+        select(WaitlistEntry)
+        .where(
+            WaitlistEntry.status == WaitlistStatus.WAITING,
+            WaitlistEntry.window_start <= start_time,
+            WaitlistEntry.window_end >= start_time,
+            WaitlistEntry.guest_count <= table.capacity,
+            or_(
+                WaitlistEntry.location.is_(None),
+                WaitlistEntry.location == table.location
+            )
+        )
+        .order_by(WaitlistEntry.created_at, WaitlistEntry.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    entry = result.scalars().first()
+    if entry:
+        [(table_ok, booked)] = await _check_intervals(
+            db, [(table_id, start_time, end_time)]
+        )
+        if not table_ok or booked or await _series_busy_intervals(
+            db, start_time, end_time, [table_id]
+        ):
+            entry = None
+
+    if not entry:
+        await db.commit()
+        return None
+
+    booking = Booking(
+        user_id=entry.user_id,
+        table_id=table_id,
+        start_time=start_time,
+        end_time=end_time,
+        guest_count=entry.guest_count,
+        special_requests=entry.special_requests,
+        status="confirmed"
+    )
+    db.add(booking)
+    await db.flush()
+    await add_booking_events(db, BOOKING_CREATED, [booking])
+
+    entry.booking_id = booking.id
+    if entry.auto_book:
+        entry.status = WaitlistStatus.BOOKED
+    else:
+        entry.status = WaitlistStatus.HELD
+        entry.hold_expires_at = _utcnow() + timedelta(
+            minutes=waitlist_settings.HOLD_MINUTES
+        )
+    await _notify(db, entry)
+    await db.commit()
+    await db.refresh(entry)
+    occupancy_cache.booking_created(booking)
+    return entry
+
+
+# Background job: release holds that were not confirmed in time (promoting
+# the next waiting guest) and expire entries whose window has passed.
+async def expire_waitlist(db: AsyncSession) -> int:
+    now = _utcnow()
+    result = await db.execute(
+        select(WaitlistEntry)
+        .where(
+            WaitlistEntry.status == WaitlistStatus.HELD,
+            WaitlistEntry.hold_expires_at < now
+        )
+        .with_for_update(skip_locked=True)
+    )
+    expired = result.scalars().all()
+    freed = []
+    for entry in expired:
+        booking = await db.get(Booking, entry.booking_id)
+        if booking and booking.status == BookingStatus.CONFIRMED:
+            booking.status = BookingStatus.CANCELLED
+            await add_booking_events(db, BOOKING_CANCELLED, [booking])
+            freed.append(booking)
+        entry.status = WaitlistStatus.EXPIRED
+        await _notify(db, entry)
+
+    await db.execute(
+        update(WaitlistEntry)
+        .where(
+            WaitlistEntry.status == WaitlistStatus.WAITING,
+            WaitlistEntry.window_end < now
+        )
+        .values(status=WaitlistStatus.EXPIRED)
+    )
+    await db.commit()
+
+    for booking in freed:
+        occupancy_cache.booking_cancelled(booking)
+        await promote_waitlist(db, booking.table_id, booking.start_time)
+    return len(expired)
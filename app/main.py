@@ -1,10 +1,36 @@
 # main.py
+import asyncio
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.endpoint import auth, booking, table
+from app.api.endpoint import (
+    analytics,
+    audit,
+    auth,
+    booking,
+    deadline,
+    outbox,
+    profile,
+    slow_query,
+    table,
+    waitlist,
+)
 from app.database import engine, Base
+from app.utils import circuit_breaker, deadline as request_deadlines
 from app.initial_data import create_admin_user
+from app.tasks.analytics import run_rollup_refresher
+from app.tasks.audit import audit_log
+from app.tasks.booking_stats import run_booking_stats_rollover
+from app.tasks.inventory import run_slot_materializer
+from app.tasks.occupancy import run_occupancy_refresher
+from app.tasks.outbox import outbox_dispatcher
+from app.tasks.series import run_series_materializer
+from app.tasks.slow_queries import slow_query_log
+from app.tasks.waitlist import run_waitlist_sweeper, waitlist_notifier
+from app.utils.deadline import DeadlineMiddleware
+from app.utils.password_pool import password_pool
+from app.utils.profiling import ProfilerMiddleware
 from app.utils.token import get_current_user
 
 app = FastAPI()
@@ -30,6 +56,13 @@ app = FastAPI(
     }
 )
 
+app.add_middleware(ProfilerMiddleware)
+# Outermost, so that the profiler samples inside the handler task and its
+# admin lookup runs under the request's deadline
+app.add_middleware(DeadlineMiddleware)
+request_deadlines.install(engine)
+circuit_breaker.install(engine)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(
@@ -41,7 +74,45 @@ app.include_router(
     booking.router,
     prefix="/bookings",
     tags=["bookings"],
-    dependencies=[Depends(get_current_user)]
+    dependencies=[
+        Depends(circuit_breaker.require_database),
+        Depends(get_current_user),
+    ]
+)
+app.include_router(
+    waitlist.router,
+    prefix="/waitlist",
+    tags=["waitlist"]
+)
+app.include_router(
+    analytics.router,
+    prefix="/analytics",
+    tags=["analytics"]
+)
+app.include_router(
+    outbox.router,
+    prefix="/outbox",
+    tags=["outbox"]
+)
+app.include_router(
+    audit.router,
+    prefix="/audit",
+    tags=["audit"]
+)
+app.include_router(
+    profile.router,
+    prefix="/profiles",
+    tags=["profiles"]
+)
+app.include_router(
+    deadline.router,
+    prefix="/deadlines",
+    tags=["deadlines"]
+)
+app.include_router(
+    slow_query.router,
+    prefix="/slow-queries",
+    tags=["slow-queries"]
 )
 
 
@@ -50,6 +121,28 @@ async def startup():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     await create_admin_user()
+    waitlist_notifier.start()
+    audit_log.start()
+    slow_query_log.start()
+    app.state.background_tasks = [
+        asyncio.create_task(run_series_materializer()),
+        asyncio.create_task(run_waitlist_sweeper()),
+        asyncio.create_task(run_slot_materializer()),
+        asyncio.create_task(run_rollup_refresher()),
+        asyncio.create_task(outbox_dispatcher.run()),
+        asyncio.create_task(run_occupancy_refresher()),
+        asyncio.create_task(run_booking_stats_rollover()),
+    ]
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in app.state.background_tasks:
+        task.cancel()
+    await waitlist_notifier.stop()
+    await audit_log.stop()
+    slow_query_log.stop()
+    password_pool.stop()
 
 
 @app.get("/")
@@ -0,0 +1,24 @@
+from sqlalchemy import TIMESTAMP, BigInteger, Column, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from app.database import Base
+
+
+class AuditEvent(Base):
+    """Who changed which booking, table or user, and how"""
+    __tablename__ = "audit_log"
+
+    id = Column(BigInteger, primary_key=True)
+    # Taken when the change happened, not when the batch was written
+    occurred_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    actor_id = Column(Integer, nullable=True)
+    action = Column(String, nullable=False)
+    entity_type = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    changes = Column(JSONB, nullable=True)
+
+    __table_args__ = (
+        Index('idx_audit_entity_time',
+              'entity_type', 'entity_id', 'occurred_at'),
+        Index('idx_audit_actor_time', 'actor_id', 'occurred_at'),
+        Index('idx_audit_time', 'occurred_at'),
+    )
@@ -1,7 +1,7 @@
 from sqlalchemy import (TIMESTAMP, Column, Enum,
                         Integer, String,
                         DateTime, ForeignKey,
-                        Index)
+                        Index, event, text)
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -20,6 +20,8 @@ class Booking(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
     table_id = Column(Integer, ForeignKey("tables.id"), index=True)
+    series_id = Column(Integer, ForeignKey("booking_series.id"),
+                       nullable=True, index=True)
     start_time = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
     end_time = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
     guest_count = Column(Integer)
@@ -32,9 +34,22 @@ class Booking(Base):
 
     user = relationship("User", back_populates="bookings")
     table = relationship("Table", back_populates="bookings")
+    series = relationship("BookingSeries", back_populates="bookings")
 
     __table_args__ = (
         Index('idx_booking_composite', 'user_id', 'status', 'start_time'),
         Index('idx_booking_date_range', 'start_time', 'end_time'),
         Index('idx_booking_status_created', 'status', 'created_at'),
+        # Rows changed since a watermark (rollup refresh, export)
+        Index('idx_booking_updated_at', 'updated_at'),
     )
+
+
+# create_all only creates the indexes of new tables; this one came later,
+# so it is also created here if missing and existing databases get it too
+@event.listens_for(Base.metadata, "after_create")
+def _create_updated_at_index(metadata, connection, **kw):
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_booking_updated_at "
+        "ON bookings (updated_at)"
+    ))
@@ -0,0 +1,47 @@
+from sqlalchemy import (TIMESTAMP, Boolean, Column, Date, DateTime, Enum,
+                        ForeignKey, Index, Integer, String)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+from enum import Enum as PyEnum
+
+
+class SeriesFrequency(str, PyEnum):
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+
+class BookingSeries(Base):
+    """
+    A recurring booking stored as a single row.
+
+    Occurrences before ``materialized_until`` exist as rows in ``bookings``;
+    later ones are expanded on demand from the recurrence rule.
+    """
+    __tablename__ = "booking_series"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
+    start_time = Column(TIMESTAMP(timezone=True), nullable=False)
+    guest_count = Column(Integer)
+    special_requests = Column(String, nullable=True)
+    frequency = Column(Enum(SeriesFrequency), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    count = Column(Integer, nullable=True)
+    until = Column(TIMESTAMP(timezone=True), nullable=True)
+    exceptions = Column(ARRAY(Date), nullable=False, default=list)
+    is_active = Column(Boolean, default=True)
+    materialized_until = Column(TIMESTAMP(timezone=True), nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime,
+                        server_default=func.now(), onupdate=func.now())
+
+    bookings = relationship("Booking", back_populates="series")
+
+    __table_args__ = (
+        Index('idx_series_table_active', 'table_id', 'is_active'),
+        Index('idx_series_active_materialized',
+              'is_active', 'materialized_until'),
+    )
@@ -0,0 +1,119 @@
+from sqlalchemy import TIMESTAMP, Column, ForeignKey, Integer, event, text
+from app.database import Base
+
+# Two-key advisory lock (its key space does not overlap the single-key
+# per-table locks) that booking writes share and the rollover takes
+# exclusively, so that a booking is never counted against a stale
+# watermark
+STATS_LOCK = (7405, 1)
+
+
+class UserBookingStats(Base):
+    """
+    Booking counters of one user, kept current by a trigger on bookings.
+
+    A confirmed booking is upcoming while it starts at or after the
+    watermark and completed afterwards; the watermark is moved forward
+    by a background job, which moves the bookings it passes over.
+    """
+    __tablename__ = "user_booking_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"),
+                     primary_key=True)
+    upcoming = Column(Integer, nullable=False, server_default="0")
+    completed = Column(Integer, nullable=False, server_default="0")
+    cancelled = Column(Integer, nullable=False, server_default="0")
+
+
+class BookingStatsWatermark(Base):
+    """Single row: bookings starting before this count as past"""
+    __tablename__ = "booking_stats_watermark"
+
+    id = Column(Integer, primary_key=True)
+    watermark = Column(TIMESTAMP(timezone=True), nullable=False)
+
+
+_CLASSIFY = """
+    (({row}.status = 'CONFIRMED' AND {row}.start_time >= mark) IS TRUE)::int,
+    (({row}.status = 'COMPLETED'
+      OR ({row}.status = 'CONFIRMED' AND {row}.start_time < mark)) IS TRUE
+    )::int,
+    ({row}.status = 'CANCELLED' IS TRUE)::int
+"""
+
+STATS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION user_booking_stats_apply() RETURNS trigger AS $$
+DECLARE
+    mark timestamptz;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND OLD.start_time = NEW.start_time
+       AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_advisory_xact_lock_shared({STATS_LOCK[0]}, {STATS_LOCK[1]});
+    SELECT watermark INTO mark FROM booking_stats_watermark WHERE id = 1;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL THEN
+        UPDATE user_booking_stats AS s
+        SET upcoming = s.upcoming - d.upcoming,
+            completed = s.completed - d.completed,
+            cancelled = s.cancelled - d.cancelled
+        FROM (SELECT {_CLASSIFY.format(row="OLD")})
+            AS d (upcoming, completed, cancelled)
+        WHERE s.user_id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL THEN
+        INSERT INTO user_booking_stats AS s
+            (user_id, upcoming, completed, cancelled)
+        SELECT NEW.user_id, {_CLASSIFY.format(row="NEW")}
+        ON CONFLICT (user_id) DO UPDATE
+        SET upcoming = s.upcoming + EXCLUDED.upcoming,
+            completed = s.completed + EXCLUDED.completed,
+            cancelled = s.cancelled + EXCLUDED.cancelled;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+STATS_TRIGGER = """
+CREATE TRIGGER bookings_user_stats
+AFTER INSERT OR DELETE OR UPDATE OF status, start_time, user_id
+ON bookings
+FOR EACH ROW EXECUTE FUNCTION user_booking_stats_apply()
+"""
+
+STATS_BACKFILL = """
+INSERT INTO user_booking_stats (user_id, upcoming, completed, cancelled)
+SELECT user_id,
+       count(*) FILTER (WHERE status = 'CONFIRMED' AND start_time >= now()),
+       count(*) FILTER (WHERE status = 'COMPLETED'
+                        OR (status = 'CONFIRMED' AND start_time < now())),
+       count(*) FILTER (WHERE status = 'CANCELLED')
+FROM bookings
+WHERE user_id IS NOT NULL
+GROUP BY user_id
+"""
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_stats_trigger(metadata, connection, tables=(), **kw):
+    # Runs after every create_all; the backfill only when the counters
+    # table has just been created
+    connection.execute(text(
+        "INSERT INTO booking_stats_watermark (id, watermark) "
+        "VALUES (1, now()) ON CONFLICT (id) DO NOTHING"
+    ))
+    connection.execute(text(STATS_FUNCTION))
+    # Dropped and created: CREATE OR REPLACE TRIGGER needs Postgres 14
+    connection.execute(text(
+        "DROP TRIGGER IF EXISTS bookings_user_stats ON bookings"
+    ))
+    connection.execute(text(STATS_TRIGGER))
+    if UserBookingStats.__table__ in tables:
+        connection.execute(text(
+            "UPDATE booking_stats_watermark SET watermark = now()"
+        ))
+        connection.execute(text(STATS_BACKFILL))
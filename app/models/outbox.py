@@ -0,0 +1,33 @@
+from sqlalchemy import (TIMESTAMP, BigInteger, Column, Index, Integer,
+                        String)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class OutboxEvent(Base):
+    """
+    A booking event waiting to be delivered to the webhook endpoints.
+
+    Written in the same transaction as the booking change, so an event
+    exists exactly when the change was committed.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+    event_type = Column(String, nullable=False)
+    aggregate_id = Column(Integer, nullable=False, index=True)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True),
+                        server_default=func.now(), nullable=False)
+    # Next delivery attempt; pushed back after each failure
+    available_at = Column(TIMESTAMP(timezone=True),
+                          server_default=func.now(), nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    delivered_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index('idx_outbox_pending', 'id',
+              postgresql_where=delivered_at.is_(None)),
+    )
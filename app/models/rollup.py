@@ -0,0 +1,41 @@
+from sqlalchemy import (TIMESTAMP, Column, Date, DateTime, ForeignKey,
+                        Index, Integer, SmallInteger, String)
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class BookingRollup(Base):
+    """Booking activity of one table in one local hour"""
+    __tablename__ = "booking_rollups"
+
+    table_id = Column(Integer, ForeignKey("tables.id", ondelete="CASCADE"),
+                      primary_key=True)
+    day = Column(Date, primary_key=True)
+    hour = Column(SmallInteger, primary_key=True)
+    # Minutes of the hour covered by confirmed or completed bookings
+    booked_minutes = Column(Integer, nullable=False, default=0)
+    # Counted in the hour the booking starts
+    bookings = Column(Integer, nullable=False, default=0)
+    covers = Column(Integer, nullable=False, default=0)
+    cancellations = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_rollup_day_table', 'day', 'table_id'),
+    )
+
+
+class RollupWatermark(Base):
+    """How far the rollups have caught up with ``bookings.updated_at``"""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    watermark = Column(DateTime, nullable=False)
+    refreshed_at = Column(TIMESTAMP(timezone=True),
+                          server_default=func.now(), onupdate=func.now())
+
+
+class RollupDirtyDay(Base):
+    """A day to recompute that no booking row points at any more"""
+    __tablename__ = "rollup_dirty_days"
+
+    day = Column(Date, primary_key=True)
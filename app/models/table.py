@@ -19,6 +19,10 @@ class Table(Base):
     location = Column(String)  # "window", "patio", etc.
     status = Column(Enum(TableStatus), default=TableStatus.AVAILABLE)
     is_active = Column(Boolean, default=True)
+    # Tables sharing a group can be pushed together for large parties
+    combination_group = Column(String, nullable=True, index=True)
+    # Book through pre-materialised slots instead of the per-table lock
+    inventory_mode = Column(Boolean, default=False, nullable=False)
     bookings = relationship("Booking", back_populates="table")
 
     __table_args__ = (
@@ -0,0 +1,19 @@
+from sqlalchemy import TIMESTAMP, Column, ForeignKey, Integer
+from app.database import Base
+
+
+class TableSlot(Base):
+    """
+    One bookable slot of a table in inventory mode.
+
+    ``booking_id`` points at the last booking that claimed the slot. Two
+    bookings that meet inside a slot both claim it, so whether a slot is
+    free is decided by the bookings' intervals, not by this column.
+    """
+    __tablename__ = "table_slots"
+
+    table_id = Column(Integer, ForeignKey("tables.id", ondelete="CASCADE"),
+                      primary_key=True)
+    slot_start = Column(TIMESTAMP(timezone=True), primary_key=True)
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="SET NULL"),
+                        nullable=True)
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Index, Integer, String, Boolean, DateTime, Enum
+import logging
+from sqlalchemy import (Column, Index, Integer, String, Boolean, DateTime,
+                        Enum, event, text)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 from enum import Enum as PyEnum
 
+logger = logging.getLogger(__name__)
+
 
 class UserRole(str, PyEnum):
     ADMIN = "admin"
@@ -33,3 +37,32 @@ class User(Base):
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, role={self.role})>"
+
+
+# Search indexes of the admin user directory. They are created by every
+# create_all if missing, so existing databases get them too. The C
+# collation makes the btree usable for prefix ranges (what
+# text_pattern_ops gives, but also for ORDER BY); the trigram index
+# serves substring search and needs the pg_trgm extension.
+EMAIL_SEARCH_INDEX = (
+    'CREATE INDEX IF NOT EXISTS idx_user_email_lower '
+    'ON users ((lower(email) COLLATE "C"), id)'
+)
+EMAIL_TRIGRAM_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_user_email_trgm "
+    "ON users USING gin (lower(email) gin_trgm_ops)"
+)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_indexes(metadata, connection, **kw):
+    connection.execute(text(EMAIL_SEARCH_INDEX))
+    try:
+        with connection.begin_nested():
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(text(EMAIL_TRIGRAM_INDEX))
+    except Exception as e:
+        logger.warning(
+            f"pg_trgm unavailable, user substring search is unindexed: "
+            f"{str(e)}"
+        )
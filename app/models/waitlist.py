@@ -0,0 +1,43 @@
+from sqlalchemy import (TIMESTAMP, Boolean, Column, DateTime, Enum,
+                        ForeignKey, Index, Integer, String)
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+from enum import Enum as PyEnum
+
+
+class WaitlistStatus(str, PyEnum):
+    WAITING = "waiting"
+    HELD = "held"  # A booking was made and awaits confirmation
+    BOOKED = "booked"
+    EXPIRED = "expired"
+    CANCELLED = "cancelled"
+
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    # Range of acceptable booking start times
+    window_start = Column(TIMESTAMP(timezone=True), nullable=False)
+    window_end = Column(TIMESTAMP(timezone=True), nullable=False)
+    guest_count = Column(Integer, nullable=False)
+    location = Column(String, nullable=True)
+    special_requests = Column(String, nullable=True)
+    auto_book = Column(Boolean, default=True)
+    status = Column(Enum(WaitlistStatus),
+                    default=WaitlistStatus.WAITING, nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)
+    hold_expires_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime,
+                        server_default=func.now(), onupdate=func.now())
+
+    booking = relationship("Booking")
+
+    __table_args__ = (
+        Index('idx_waitlist_status_window',
+              'status', 'window_start', 'window_end'),
+        Index('idx_waitlist_status_hold', 'status', 'hold_expires_at'),
+    )
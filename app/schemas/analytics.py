@@ -0,0 +1,37 @@
+from datetime import date
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class UtilisationGroup(str, Enum):
+    TABLE = "table"
+    LOCATION = "location"
+    DAY = "day"
+    HOUR = "hour"
+
+
+class UtilisationRow(BaseModel):
+    key: str = Field(..., description="Table id, location, day or hour")
+    booked_minutes: int
+    bookings: int
+    covers: int
+    cancellations: int
+    occupancy_rate: Optional[float] = Field(
+        None,
+        description="Booked share of the table minutes within opening hours"
+    )
+    covers_per_hour: Optional[float] = None
+    cancellation_rate: Optional[float] = None
+
+
+class UtilisationResponse(BaseModel):
+    start_date: date
+    end_date: date
+    group_by: UtilisationGroup
+    rows: List[UtilisationRow]
+
+
+class RollupRebuildResponse(BaseModel):
+    message: str
+    days: int
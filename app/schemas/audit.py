@@ -0,0 +1,16 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+
+
+class AuditEventResponse(BaseModel):
+    id: int
+    occurred_at: datetime
+    actor_id: Optional[int] = None
+    action: str
+    entity_type: str
+    entity_id: int
+    changes: Optional[Dict[str, Any]] = None
+
+    class Config:
+        from_attributes = True
@@ -6,6 +6,8 @@ from typing import List, Optional
 from enum import Enum
 
 from app.models.booking import BookingStatus
+from app.models.booking_series import SeriesFrequency
+from app.schemas.table import TableResponse
 
 
 class SeatPreference(str, Enum):
@@ -47,6 +49,33 @@ class BookingCreate(BaseModel):
         return v
 
 
+class BookingAssign(BaseModel):
+    start_time: datetime
+    guest_count: int = Field(..., gt=0)
+    special_requests: Optional[str] = None
+
+    @validator('start_time')
+    def ensure_timezone(cls, v):
+        """Ensure datetime is timezone-aware"""
+        if v.tzinfo is None:
+            return v.replace(tzinfo=ZoneInfo("UTC"))
+        return v
+
+
+class BookingCombinationCreate(BaseModel):
+    table_ids: List[int] = Field(..., min_length=2)
+    start_time: datetime
+    guest_count: int = Field(..., gt=0)
+    special_requests: Optional[str] = None
+
+    @validator('start_time')
+    def ensure_timezone(cls, v):
+        """Ensure datetime is timezone-aware"""
+        if v.tzinfo is None:
+            return v.replace(tzinfo=ZoneInfo("UTC"))
+        return v
+
+
 class BookingUpdate(BaseModel):
     table_id: Optional[int] = Field(
         None,
@@ -87,6 +116,44 @@ class BookingListResponse(BaseModel):
     data: List[BookingResponse]
 
 
+class BookingPageResponse(BaseModel):
+    data: List[BookingResponse]
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, null on the last"
+    )
+
+
+class BookingSummaryResponse(BaseModel):
+    upcoming: int = 0
+    completed: int = 0
+    cancelled: int = 0
+
+    class Config:
+        from_attributes = True
+
+
+class BulkBookingCreate(BaseModel):
+    bookings: List[BookingCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Bookings to create in a single transaction"
+    )
+
+
+class BulkBookingItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    success: bool
+    booking: Optional[BookingResponse] = None
+    detail: Optional[str] = None
+
+
+class BulkBookingResponse(BaseModel):
+    results: List[BulkBookingItemResult]
+    booked: int
+    conflicts: int
+
+
 class AvailabilityQuery(BaseModel):
     start_time: datetime = Field(..., example="2025-04-14T18:00:00")
     guest_count: Optional[int] = Field(None, gt=0, example=4)
@@ -102,6 +169,51 @@ class AvailabilityQuery(BaseModel):
             return self.start_time + timedelta(hours=3)
 
 
+class SlotSuggestion(BaseModel):
+    table_id: int
+    capacity: int
+    start_time: datetime
+    end_time: datetime
+
+
+class AlternativeSlotsResponse(BaseModel):
+    same_table: List[SlotSuggestion] = []
+    any_table: List[SlotSuggestion] = []
+
+
+class BatchAvailabilityRequest(BaseModel):
+    queries: List[AvailabilityQuery] = Field(..., min_length=1, max_length=100)
+
+
+class BatchAvailabilityResult(BaseModel):
+    start_time: datetime
+    guest_count: Optional[int] = None
+    tables: List[TableResponse]
+
+
+class OccupancyDayResponse(BaseModel):
+    day: date
+    slot_minutes: int
+    table_ids: List[int]
+    free_counts: List[int] = Field(
+        ...,
+        description="Number of free tables in each slot of the day"
+    )
+    bitmap: str = Field(
+        ...,
+        description=(
+            "Base64 of the tables x slots free bitmap, one row per table, "
+            "packed eight slots per byte (most significant bit first)"
+        )
+    )
+
+
+class FreeTablesResponse(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    table_ids: List[int]
+
+
 class BookingFilter(BaseModel):
     user_id: Optional[int] = None
     status: Optional[BookingStatus] = None
@@ -111,3 +223,61 @@ class BookingFilter(BaseModel):
     class Config:
         extra = "forbid"
         use_enum_values = True
+
+
+class BookingSeriesCreate(BaseModel):
+    table_id: int
+    start_time: datetime = Field(..., description="First occurrence")
+    guest_count: int = Field(..., gt=0)
+    special_requests: Optional[str] = Field(None, max_length=500)
+    frequency: SeriesFrequency
+    interval: int = Field(
+        1,
+        ge=1,
+        le=12,
+        description="Repeat every N weeks or months"
+    )
+    count: Optional[int] = Field(
+        None,
+        gt=0,
+        description="Number of occurrences"
+    )
+    until: Optional[datetime] = Field(
+        None,
+        description="Last possible occurrence start"
+    )
+    exceptions: List[date] = Field(
+        default_factory=list,
+        description="Dates (UTC) on which the series does not take place"
+    )
+
+    @validator('start_time', 'until')
+    def ensure_timezone(cls, v):
+        """Ensure datetime is timezone-aware"""
+        if v is not None and v.tzinfo is None:
+            return v.replace(tzinfo=ZoneInfo("UTC"))
+        return v
+
+
+class BookingSeriesException(BaseModel):
+    exception_date: date = Field(..., description="Date to skip (UTC)")
+
+
+class BookingSeriesResponse(BaseModel):
+    id: int
+    user_id: int
+    table_id: int
+    start_time: datetime
+    guest_count: int
+    special_requests: Optional[str] = None
+    frequency: SeriesFrequency
+    interval: int
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    exceptions: List[date]
+    is_active: bool
+    materialized_until: datetime
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
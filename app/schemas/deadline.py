@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Dict
+
+
+class DeadlineMetricsResponse(BaseModel):
+    requests_total: int = Field(..., description="Requests given a deadline")
+    deadline_exceeded_total: int
+    statement_timeouts_total: int
+    lock_timeouts_total: int
+    disconnects_total: int = Field(
+        ...,
+        description="Requests cancelled because the client went away"
+    )
+    unavailable_by_route: Dict[str, int] = Field(
+        ...,
+        description="503 responses per route prefix"
+    )
+    deadlines_ms: Dict[str, int]
@@ -0,0 +1,18 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class OutboxMetricsResponse(BaseModel):
+    pending: int = Field(..., description="Events waiting for delivery")
+    dead: int = Field(..., description="Events that ran out of attempts")
+    oldest_pending_at: Optional[datetime] = None
+    lag_seconds: float = Field(
+        ...,
+        description="Age of the oldest pending event"
+    )
+    webhooks: int
+    delivered_total: int
+    failed_attempts_total: int
+    last_delivery_at: Optional[datetime] = None
+    last_error: Optional[str] = None
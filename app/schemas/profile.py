@@ -0,0 +1,14 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class ProfileSummary(BaseModel):
+    id: int
+    method: str
+    path: str
+    status_code: Optional[int] = None
+    started_at: datetime
+    duration_ms: float
+    samples: int = Field(..., description="Stack samples taken")
+    trigger: str = Field(..., description="header or sampled")
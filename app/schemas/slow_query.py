@@ -0,0 +1,19 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class SlowQueryResponse(BaseModel):
+    sql: str = Field(..., description="Normalised statement")
+    calls: int = Field(..., description="Executions above the threshold")
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    last_ms: float
+    last_seen_at: datetime
+    parameter_shapes: List[List[str]]
+    plan: Optional[Any] = Field(
+        None,
+        description="EXPLAIN (FORMAT JSON) of one slow execution"
+    )
+    plan_captured_at: Optional[datetime] = None
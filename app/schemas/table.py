@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 from app.models.table import TableStatus
 
@@ -19,6 +19,14 @@ class TableBase(BaseModel):
     )
     status: TableStatus = TableStatus.AVAILABLE
     is_active: bool = True
+    combination_group: Optional[str] = Field(
+        None,
+        description="Tables in the same group can be combined"
+    )
+    inventory_mode: bool = Field(
+        False,
+        description="Claim pre-materialised slots when booking this table"
+    )
 
 
 class TableCreate(TableBase):
@@ -30,6 +38,8 @@ class TableUpdate(BaseModel):
     location: Optional[str] = Field(None, min_length=2)
     status: Optional[TableStatus] = None
     is_active: Optional[bool] = None
+    combination_group: Optional[str] = None
+    inventory_mode: Optional[bool] = None
 
 
 class TableResponse(TableBase):
@@ -39,3 +49,22 @@ class TableResponse(TableBase):
         from_attributes = True
         use_enum_values = True
 
+
+class TableCombinationResponse(BaseModel):
+    tables: List[TableResponse]
+    total_capacity: int
+
+
+class BookingMove(BaseModel):
+    booking_id: int
+    from_table_id: int
+    to_table_id: int
+
+
+class TableReassignmentResponse(BaseModel):
+    message: str
+    moved: List[BookingMove] = []
+    unplaced: List[int] = Field(
+        default_factory=list,
+        description="Bookings that could not be moved to another table"
+    )
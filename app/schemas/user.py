@@ -1,7 +1,7 @@
 # schemas/user.py
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional
+from typing import List, Optional
 
 from app.models.user import UserRole
 
@@ -77,6 +77,30 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserDirectoryFilter(BaseModel):
+    email: Optional[str] = Field(
+        None, min_length=1, max_length=255,
+        description="Case-insensitive email prefix or substring"
+    )
+    match: str = Field("prefix", pattern="^(prefix|contains)$")
+    role: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+
+
+class UserDirectoryItem(UserResponse):
+    role: UserRole
+
+
+class UserDirectoryResponse(BaseModel):
+    data: List[UserDirectoryItem]
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, null on the last"
+    )
+    estimated_total: int = Field(
+        ..., description="Planner estimate of the matching users"
+    )
+
+
 class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
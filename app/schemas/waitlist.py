@@ -0,0 +1,58 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from pydantic import BaseModel, Field, validator
+from typing import Optional
+
+from app.models.waitlist import WaitlistStatus
+
+
+class WaitlistCreate(BaseModel):
+    window_start: datetime = Field(
+        ...,
+        description="Earliest acceptable booking start"
+    )
+    window_end: datetime = Field(
+        ...,
+        description="Latest acceptable booking start"
+    )
+    guest_count: int = Field(..., gt=0)
+    location: Optional[str] = Field(None, min_length=2)
+    special_requests: Optional[str] = Field(None, max_length=500)
+    auto_book: bool = Field(
+        True,
+        description=(
+            "Book directly when a slot frees up; otherwise the slot is "
+            "held until confirmed"
+        )
+    )
+
+    @validator('window_start', 'window_end')
+    def ensure_timezone(cls, v):
+        """Ensure datetime is timezone-aware"""
+        if v.tzinfo is None:
+            return v.replace(tzinfo=ZoneInfo("UTC"))
+        return v
+
+    @validator('window_end')
+    def validate_window_end(cls, v, values):
+        if 'window_start' in values and v < values['window_start']:
+            raise ValueError("Window end must not be before window start")
+        return v
+
+
+class WaitlistResponse(BaseModel):
+    id: int
+    user_id: int
+    window_start: datetime
+    window_end: datetime
+    guest_count: int
+    location: Optional[str] = None
+    special_requests: Optional[str] = None
+    auto_book: bool
+    status: WaitlistStatus
+    booking_id: Optional[int] = None
+    hold_expires_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
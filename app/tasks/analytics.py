@@ -0,0 +1,21 @@
+import asyncio
+import logging
+
+from app.core.config import analytics_settings
+from app.crud.analytics import refresh_rollups
+from app.database import async_session
+
+logger = logging.getLogger(__name__)
+
+
+async def run_rollup_refresher():
+    """Periodically fold changed bookings into the hourly rollups"""
+    while True:
+        try:
+            async with async_session() as db:
+                days = await refresh_rollups(db)
+            if days:
+                logger.info("Refreshed booking rollups for %s days", days)
+        except Exception as e:
+            logger.error(f"Error refreshing booking rollups: {str(e)}")
+        await asyncio.sleep(analytics_settings.REFRESH_INTERVAL_SECONDS)
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from app.core.config import audit_settings
+from app.database import engine
+from app.models.audit import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = [
+    "occurred_at", "actor_id", "action", "entity_type", "entity_id",
+    "changes",
+]
+
+
+class AuditLog:
+    """
+    Buffer audit events in memory and write them in batches with COPY.
+
+    ``record`` does no I/O until the buffer reaches ``BUFFER_SIZE``; then
+    the caller waits for a flush instead of the buffer growing. Batches
+    are written every ``FLUSH_INTERVAL_SECONDS`` or as soon as
+    ``FLUSH_SIZE`` events are waiting, and once more on shutdown when
+    ``FLUSH_ON_SHUTDOWN`` is set. Events still buffered when the process
+    dies are lost.
+    """
+
+    def __init__(self):
+        self._buffer: deque = deque()
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.written_total = 0
+        self.dropped_total = 0
+
+    async def record(
+        self,
+        action: str,
+        entity_type: str,
+        entity_id: int,
+        actor_id: Optional[int] = None,
+        changes: Optional[Dict[str, Any]] = None
+    ) -> None:
+        self._buffer.append((
+            datetime.now(ZoneInfo("UTC")),
+            actor_id,
+            action,
+            entity_type,
+            entity_id,
+            json.dumps(changes, default=str) if changes is not None else None,
+        ))
+        if len(self._buffer) >= audit_settings.FLUSH_SIZE:
+            self._wake.set()
+        if len(self._buffer) >= audit_settings.BUFFER_SIZE:
+            await self.flush()
+            # The database is not keeping up; keep memory bounded
+            while len(self._buffer) > audit_settings.BUFFER_SIZE:
+                self._buffer.popleft()
+                self.dropped_total += 1
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            batch = list(self._buffer)
+            if not batch:
+                return 0
+            try:
+                async with engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    await raw.driver_connection.copy_records_to_table(
+                        AuditEvent.__tablename__,
+                        records=batch,
+                        columns=COLUMNS
+                    )
+            except Exception as e:
+                logger.error(
+                    f"Error writing {len(batch)} audit events: {str(e)}"
+                )
+                return 0
+            # Events recorded during the write stay queued
+            for _ in batch:
+                self._buffer.popleft()
+            self.written_total += len(batch)
+            return len(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), audit_settings.FLUSH_INTERVAL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if audit_settings.FLUSH_ON_SHUTDOWN:
+            await self.flush()
+
+
+audit_log = AuditLog()
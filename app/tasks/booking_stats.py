@@ -0,0 +1,19 @@
+import asyncio
+import logging
+
+from app.core.config import booking_stats_settings
+from app.crud.user_bookings import roll_booking_stats
+from app.database import async_session
+
+logger = logging.getLogger(__name__)
+
+
+async def run_booking_stats_rollover():
+    """Periodically count bookings that have started as completed"""
+    while True:
+        try:
+            async with async_session() as db:
+                await roll_booking_stats(db)
+        except Exception as e:
+            logger.error(f"Error rolling booking counters: {str(e)}")
+        await asyncio.sleep(booking_stats_settings.ROLLOVER_SECONDS)
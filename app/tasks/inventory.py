@@ -0,0 +1,21 @@
+import asyncio
+import logging
+
+from app.core.config import inventory_settings
+from app.crud.inventory import materialize_slots
+from app.database import async_session
+
+logger = logging.getLogger(__name__)
+
+
+async def run_slot_materializer():
+    """Periodically extend the slot inventory over the rolling horizon"""
+    while True:
+        try:
+            async with async_session() as db:
+                created = await materialize_slots(db)
+            if created:
+                logger.info("Materialised %s table slots", created)
+        except Exception as e:
+            logger.error(f"Error materialising table slots: {str(e)}")
+        await asyncio.sleep(inventory_settings.MATERIALIZE_INTERVAL_SECONDS)
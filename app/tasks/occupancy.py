@@ -0,0 +1,24 @@
+import asyncio
+import logging
+
+from app.core.config import occupancy_settings
+from app.crud.occupancy import occupancy_cache
+from app.database import async_session
+from app.utils.circuit_breaker import CLOSED, db_breaker
+
+logger = logging.getLogger(__name__)
+
+
+async def run_occupancy_refresher():
+    """
+    Keep the occupancy grid built, so that availability can be answered
+    from it while the database circuit breaker is open
+    """
+    while True:
+        try:
+            if db_breaker.state == CLOSED:
+                async with async_session() as db:
+                    await occupancy_cache.get_grid(db)
+        except Exception as e:
+            logger.error(f"Error refreshing the occupancy grid: {str(e)}")
+        await asyncio.sleep(occupancy_settings.REBUILD_SECONDS / 2)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import httpx
+
+from app.core.config import outbox_settings
+from app.crud.outbox import (
+    claim_outbox_batch,
+    mark_outbox_delivered,
+    mark_outbox_failed,
+    purge_delivered_events,
+)
+from app.database import async_session
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    """
+    Deliver outbox events to every configured webhook in batches.
+
+    Each batch is POSTed as ``{"events": [...]}``. Delivery is at least
+    once: a batch that fails on any endpoint is retried on all of them, so
+    receivers should ignore event ids they have already seen.
+    """
+
+    def __init__(self):
+        self.delivered_total = 0
+        self.failed_attempts_total = 0
+        self.last_delivery_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    async def dispatch_once(self, client: httpx.AsyncClient) -> int:
+        """Deliver one batch; returns the number of events handled"""
+        async with async_session() as db:
+            events = await claim_outbox_batch(db, outbox_settings.BATCH_SIZE)
+            if not events:
+                await db.commit()
+                return 0
+
+            body = {"events": [
+                {
+                    "id": event.id,
+                    "type": event.event_type,
+                    "created_at": event.created_at.isoformat(),
+                    "payload": event.payload,
+                }
+                for event in events
+            ]}
+            ids = [event.id for event in events]
+            error = None
+            for url in outbox_settings.WEBHOOK_URLS:
+                try:
+                    response = await client.post(url, json=body)
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    error = f"{url}: {e!r}"
+                    break
+
+            if error is None:
+                await mark_outbox_delivered(db, ids)
+                self.delivered_total += len(ids)
+                self.last_delivery_at = datetime.now(ZoneInfo("UTC"))
+            else:
+                await mark_outbox_failed(db, ids, error)
+                self.failed_attempts_total += len(ids)
+                self.last_error = error
+                logger.warning(
+                    "Delivering %s outbox events failed: %s", len(ids), error
+                )
+            await db.commit()
+            return len(ids)
+
+    async def run(self):
+        """Drain the outbox continuously, sleeping while it is empty"""
+        if not outbox_settings.WEBHOOK_URLS:
+            logger.info("No outbox webhooks configured; dispatcher idle")
+            return
+        async with httpx.AsyncClient(
+            timeout=outbox_settings.TIMEOUT_SECONDS
+        ) as client:
+            while True:
+                try:
+                    handled = await self.dispatch_once(client)
+                    if handled:
+                        continue
+                    async with async_session() as db:
+                        await purge_delivered_events(db)
+                except Exception as e:
+                    logger.error(f"Error dispatching outbox events: {str(e)}")
+                await asyncio.sleep(outbox_settings.POLL_INTERVAL_SECONDS)
+
+
+outbox_dispatcher = OutboxDispatcher()
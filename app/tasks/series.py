@@ -0,0 +1,21 @@
+import asyncio
+import logging
+
+from app.core.config import series_settings
+from app.crud.booking_series import materialize_due_series
+from app.database import async_session
+
+logger = logging.getLogger(__name__)
+
+
+async def run_series_materializer():
+    """Periodically materialise recurring series inside the horizon"""
+    while True:
+        try:
+            async with async_session() as db:
+                created = await materialize_due_series(db)
+            if created:
+                logger.info("Materialised %s series bookings", created)
+        except Exception as e:
+            logger.error(f"Error materialising booking series: {str(e)}")
+        await asyncio.sleep(series_settings.MATERIALIZE_INTERVAL_SECONDS)
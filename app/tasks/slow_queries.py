@@ -0,0 +1,190 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import slow_query_settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\$\d+|\b\d+(?:\.\d+)?\b")
+_CAST = r"(?:::[A-Z][A-Z ]*[A-Z](?:\[\])?)?"
+_LIST = re.compile(rf"\?{_CAST}(?:\s*,\s*\?{_CAST})+")
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+MAX_SHAPES = 5
+
+
+def normalize_sql(statement: str) -> str:
+    """Statement with literals and parameters replaced by ``?`` and
+    parameter lists of any length folded into one ``?, ...``"""
+    sql = _LITERAL.sub("?", " ".join(statement.split()))
+    return _LIST.sub("?, ...", sql)
+
+
+def _shape(value) -> str:
+    if isinstance(value, datetime):
+        return "datetime" if value.tzinfo else "datetime(naive)"
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters) -> List[str]:
+    if isinstance(parameters, dict):
+        return [f"{key}:{_shape(value)}" for key, value in parameters.items()]
+    return [_shape(value) for value in parameters or ()]
+
+
+class SlowQueryLog:
+    """
+    Record statements slower than ``THRESHOLD_MS`` on the engine.
+
+    Statements are grouped by their normalised SQL. For each group the
+    log keeps timings, the distinct parameter shapes seen (naive and
+    aware datetimes are told apart) and an ``EXPLAIN (FORMAT JSON)`` of
+    one slow execution. Plans are captured by a background task on its
+    own connection, never on the request's, and recaptured after
+    ``EXPLAIN_TTL_SECONDS``. Fast statements only cost two timer reads.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, Dict] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def install(self, async_engine: AsyncEngine) -> None:
+        sync_engine = async_engine.sync_engine
+        if not event.contains(
+            sync_engine, "before_cursor_execute", self._before
+        ):
+            event.listen(sync_engine, "before_cursor_execute", self._before)
+            event.listen(sync_engine, "after_cursor_execute", self._after)
+
+    # The start time lives on the statement's execution context, which
+    # is dropped with it, so a statement that raises leaves nothing behind
+    def _before(self, conn, cursor, statement, parameters, context,
+                executemany):
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context,
+               executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= slow_query_settings.THRESHOLD_MS:
+            if executemany and parameters:
+                parameters = parameters[0]
+            self._record(statement, parameters, elapsed_ms)
+
+    def _record(self, statement: str, parameters, elapsed_ms: float) -> None:
+        sql = normalize_sql(statement)
+        if sql.startswith("EXPLAIN"):
+            return
+        now = datetime.now(ZoneInfo("UTC"))
+        stats = self._stats.get(sql)
+        if stats is None:
+            if len(self._stats) >= slow_query_settings.MAX_STATEMENTS:
+                del self._stats[min(
+                    self._stats, key=lambda key: self._stats[key]["total_ms"]
+                )]
+            stats = self._stats[sql] = {
+                "sql": sql,
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "last_ms": 0.0,
+                "last_seen_at": now,
+                "parameter_shapes": [],
+                "plan": None,
+                "plan_captured_at": None,
+                "plan_pending": False,
+            }
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["last_ms"] = elapsed_ms
+        stats["last_seen_at"] = now
+        shape = parameter_shapes(parameters)
+        if (
+            shape not in stats["parameter_shapes"]
+            and len(stats["parameter_shapes"]) < MAX_SHAPES
+        ):
+            stats["parameter_shapes"].append(shape)
+
+        captured = stats["plan_captured_at"]
+        stale = captured is None or (now - captured).total_seconds() \
+            > slow_query_settings.EXPLAIN_TTL_SECONDS
+        if (
+            stale
+            and not stats["plan_pending"]
+            and self._queue is not None
+            and sql.lstrip("(").upper().startswith(_EXPLAINABLE)
+        ):
+            try:
+                self._queue.put_nowait((sql, statement, parameters))
+                stats["plan_pending"] = True
+            except asyncio.QueueFull:
+                pass
+
+    async def _explain(self, statement: str, parameters):
+        async with engine.connect() as conn:
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, parameters or ()
+            )
+            plan = result.scalar()
+        return json.loads(plan) if isinstance(plan, str) else plan
+
+    async def _run(self):
+        while True:
+            sql, statement, parameters = await self._queue.get()
+            stats = self._stats.get(sql)
+            try:
+                plan = await self._explain(statement, parameters)
+                if stats is not None:
+                    stats["plan"] = plan
+                    stats["plan_captured_at"] = datetime.now(ZoneInfo("UTC"))
+            except Exception as e:
+                logger.error(f"Error explaining slow query: {str(e)}")
+            finally:
+                if stats is not None:
+                    stats["plan_pending"] = False
+
+    def top(self, limit: Optional[int] = None) -> List[Dict]:
+        """Slowest statements by total time"""
+        ranked = sorted(
+            self._stats.values(), key=lambda s: s["total_ms"], reverse=True
+        )
+        return [
+            {**stats, "mean_ms": stats["total_ms"] / stats["calls"]}
+            for stats in ranked[:limit or slow_query_settings.TOP_N]
+        ]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    def start(self):
+        self.install(engine)
+        if slow_query_settings.EXPLAIN:
+            self._queue = asyncio.Queue(
+                maxsize=slow_query_settings.EXPLAIN_QUEUE_SIZE
+            )
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._queue = None
+
+
+slow_query_log = SlowQueryLog()
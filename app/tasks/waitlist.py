@@ -0,0 +1,117 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set
+
+import asyncpg
+
+from app.core.config import waitlist_settings
+from app.crud.waitlist import WAITLIST_CHANNEL, expire_waitlist
+from app.database import DATABASE_URL, async_session
+
+logger = logging.getLogger(__name__)
+
+LISTENER_NAME = "waitlist-notifier"
+
+
+class WaitlistNotifier:
+    """
+    Fan out waitlist NOTIFY events to the users connected to this process.
+
+    A single LISTEN connection is shared by all subscribers, so waiting
+    clients do not hold pool connections. It is kept by a background task:
+    when the connection cannot be opened or is lost (the database
+    restarted, the connection was dropped) the failure is logged and the
+    task reconnects with exponential backoff. Notifications sent while it
+    is disconnected are not received.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self._queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # The task closes the connection as it is cancelled
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        delay = waitlist_settings.RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                await self._listen()
+                # The connection was up, so start backing off afresh
+                delay = waitlist_settings.RECONNECT_MIN_SECONDS
+                logger.warning("Waitlist LISTEN connection lost, reconnecting")
+            except Exception as e:
+                logger.error(
+                    f"Waitlist LISTEN connection failed, retrying in "
+                    f"{delay:.0f}s: {str(e)}"
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, waitlist_settings.RECONNECT_MAX_SECONDS)
+
+    async def _listen(self):
+        """Listen until the connection is lost"""
+        connection = await asyncpg.connect(
+            DATABASE_URL.replace("+asyncpg", ""),
+            server_settings={"application_name": LISTENER_NAME}
+        )
+        closed = asyncio.Event()
+        connection.add_termination_listener(lambda _: closed.set())
+        try:
+            await connection.add_listener(WAITLIST_CHANNEL, self._dispatch)
+            while not closed.is_set():
+                try:
+                    await asyncio.wait_for(
+                        closed.wait(), waitlist_settings.PING_INTERVAL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # A connection dropped without a word is only noticed
+                    # when used
+                    await connection.execute("SELECT 1", timeout=10)
+        finally:
+            if not connection.is_closed():
+                connection.terminate()
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id, set())
+        queues.discard(queue)
+        if not queues:
+            self._subscribers.pop(user_id, None)
+
+    def _dispatch(self, connection, pid, channel, payload):
+        event = json.loads(payload)
+        for queue in self._subscribers.get(event["user_id"], ()):
+            if not queue.full():
+                queue.put_nowait(event)
+
+
+waitlist_notifier = WaitlistNotifier()
+
+
+async def run_waitlist_sweeper():
+    """Periodically release expired holds and stale waitlist entries"""
+    while True:
+        try:
+            async with async_session() as db:
+                expired = await expire_waitlist(db)
+            if expired:
+                logger.info("Released %s expired waitlist holds", expired)
+        except Exception as e:
+            logger.error(f"Error sweeping the waitlist: {str(e)}")
+        await asyncio.sleep(waitlist_settings.SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import breaker_settings
+from app.utils.deadline import LOCK_TIMEOUT, STATEMENT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# SQLSTATE classes that mean the database, not the query, is in trouble:
+# connection exception, insufficient resources, operator intervention
+# and system error
+OUTAGE_CLASSES = ("08", "53", "57", "58")
+# Except the timeouts set from request deadlines, which cancel one slow
+# request on a healthy database
+NOT_OUTAGES = (STATEMENT_TIMEOUT, LOCK_TIMEOUT)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after ``FAILURE_THRESHOLD`` consecutive database
+    failures. While open, requests that need the database are refused
+    without trying it. After ``OPEN_SECONDS`` it is half-open: one
+    request at a time is let through as a probe, and the next statement
+    to succeed closes the breaker again while a failure reopens it.
+    """
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+        self.trips_total = 0
+
+    def allow_request(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if (
+            self.state == OPEN
+            and now - self.opened_at >= breaker_settings.OPEN_SECONDS
+        ):
+            self.state = HALF_OPEN
+            self.probe_started = None
+        if self.state == HALF_OPEN and (
+            self.probe_started is None
+            or now - self.probe_started >= breaker_settings.OPEN_SECONDS
+        ):
+            self.probe_started = now
+            return True
+        return False
+
+    def retry_after(self) -> int:
+        waited = time.monotonic() - self.opened_at
+        return max(int(breaker_settings.OPEN_SECONDS - waited), 1)
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            logger.warning("Database circuit breaker closed")
+            self.state = CLOSED
+            self.probe_started = None
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        if self.state == OPEN:
+            return
+        self.failures += 1
+        if (
+            self.state == HALF_OPEN
+            or self.failures >= breaker_settings.FAILURE_THRESHOLD
+        ):
+            logger.warning(
+                f"Database circuit breaker opened after "
+                f"{self.failures} failures"
+            )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.trips_total += 1
+
+
+db_breaker = CircuitBreaker()
+
+
+def _is_outage(context) -> bool:
+    if context.is_disconnect:
+        return True
+    error = context.original_exception
+    code = getattr(error, "sqlstate", None)
+    if code:
+        return code[:2] in OUTAGE_CLASSES and code not in NOT_OUTAGES
+    return isinstance(error, (OSError, asyncio.TimeoutError))
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    if db_breaker.state != CLOSED or db_breaker.failures:
+        db_breaker.record_success()
+
+
+def _on_error(context):
+    if _is_outage(context):
+        db_breaker.record_failure()
+
+
+def _connect(dialect, connection_record, cargs, cparams):
+    # Failed connection attempts raise the driver's own errors (refused,
+    # unreachable, timed out), which handle_error never sees
+    try:
+        return dialect.connect(*cargs, **cparams)
+    except Exception:
+        db_breaker.record_failure()
+        raise
+
+
+def install(async_engine: AsyncEngine) -> None:
+    """Feed the outcome of every connection attempt and statement on the
+    engine to the breaker"""
+    sync_engine = async_engine.sync_engine
+    if not event.contains(sync_engine, "handle_error", _on_error):
+        event.listen(sync_engine, "do_connect", _connect)
+        event.listen(sync_engine, "after_cursor_execute", _after_execute)
+        event.listen(sync_engine, "handle_error", _on_error)
+
+
+_stale_ok = set()
+
+
+def serves_stale(endpoint: Callable) -> Callable:
+    """Mark an endpoint that answers from a snapshot while the breaker is
+    open. Apply below the route decorator."""
+    _stale_ok.add(endpoint)
+    return endpoint
+
+
+def database_available() -> bool:
+    """Whether this request may use the database, decided once per
+    request (FastAPI caches the dependency)"""
+    return db_breaker.allow_request()
+
+
+def require_database(
+    request: Request,
+    available: bool = Depends(database_available)
+) -> None:
+    """Refuse with 503 at once while the breaker is open, unless the
+    endpoint serves stale data"""
+    if available or request.scope.get("endpoint") in _stale_ok:
+        return
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Database unavailable, try again shortly",
+        headers={"Retry-After": str(db_breaker.retry_after())}
+    )
@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# (table_id, capacity) pairs of one combination group
+GroupMembers = Sequence[Tuple[int, int]]
+
+
+def best_combination(
+    members: GroupMembers,
+    max_tables: int,
+    guest_count: int
+) -> Optional[Tuple[int, Tuple[int, ...]]]:
+    """
+    (total_capacity, table_ids) of the cheapest combination of two to
+    ``max_tables`` members seating ``guest_count``, none of which the
+    party could do without: fewest spare seats, then fewest tables, then
+    lowest ids. None when there is no such combination, also when the
+    party fits at one table.
+
+    Tables of equal capacity are interchangeable, so the search picks how
+    many tables of each capacity to take, largest capacity first, and
+    fills the counts with the lowest ids. A combination stops growing
+    once it seats the party, and branches that cannot reach the party or
+    beat the best found are cut, so the work follows the number of
+    distinct capacities rather than the size of the group.
+    """
+    by_capacity: Dict[int, List[int]] = {}
+    for table_id, capacity in sorted(members):
+        by_capacity.setdefault(capacity, []).append(table_id)
+    capacities = sorted(by_capacity, reverse=True)
+    best: Optional[Tuple[int, int, Tuple[int, ...]]] = None
+
+    def search(index: int, size: int, total: int, counts: list) -> None:
+        nonlocal best
+        if best is not None and total > best[0]:
+            return
+        if size >= 2 and total >= guest_count:
+            # More tables would only add seats. The smallest table is
+            # the last taken; a combination that seats the party without
+            # it has a table to spare.
+            smallest = min(capacity for capacity, count in counts)
+            if total - smallest >= guest_count:
+                return
+            table_ids = tuple(sorted(
+                table_id
+                for capacity, count in counts
+                for table_id in by_capacity[capacity][:count]
+            ))
+            if best is None or (total, size, table_ids) < best:
+                best = (total, size, table_ids)
+            return
+        if index == len(capacities) or size == max_tables:
+            return
+        capacity = capacities[index]
+        if total + capacity * (max_tables - size) < guest_count:
+            return
+        most = min(len(by_capacity[capacity]), max_tables - size)
+        for count in range(most, -1, -1):
+            search(
+                index + 1,
+                size + count,
+                total + capacity * count,
+                counts + [(capacity, count)] if count else counts
+            )
+
+    search(0, 0, 0, [])
+    if best is None:
+        return None
+    return best[0], best[2]
+
+
+def split_guests(capacities: Sequence[int], guest_count: int) -> List[int]:
+    """
+    Guests seated at each of the combined tables, in the given order:
+    one at every table, the rest filling the tables in order.
+
+    Raises ValueError when the tables are too small for the party or
+    when it fits without one of them, which would leave a table booked
+    for nobody.
+    """
+    total = sum(capacities)
+    if total < guest_count:
+        raise ValueError("The combined tables are too small for the party")
+    if any(total - capacity >= guest_count for capacity in capacities):
+        raise ValueError("The party fits without one of these tables")
+    seated = [1] * len(capacities)
+    remaining = guest_count - len(capacities)
+    for index, capacity in enumerate(capacities):
+        extra = min(capacity - 1, remaining)
+        seated[index] += extra
+        remaining -= extra
+    return seated
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core.config import deadline_settings
+
+STATEMENT_TIMEOUT = "57014"  # query_canceled
+LOCK_TIMEOUT = "55P03"  # lock_not_available
+
+
+class RequestDeadline:
+    """Deadline of the request being served, seen by its sessions"""
+
+    def __init__(self, route: str, budget_ms: int):
+        self.route = route
+        self.expires_at: Optional[float] = time.monotonic() + budget_ms / 1000
+        self.timeout: Optional[str] = None
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+
+current_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+class DeadlineMetrics:
+    def __init__(self):
+        self.requests_total = 0
+        self.deadline_exceeded_total = 0
+        self.statement_timeouts_total = 0
+        self.lock_timeouts_total = 0
+        self.disconnects_total = 0
+        self.unavailable_by_route: Counter = Counter()
+
+
+deadline_metrics = DeadlineMetrics()
+
+
+def _budget(path: str) -> Tuple[str, int]:
+    """(route prefix, deadline in ms) of a request path"""
+    matches = [
+        prefix for prefix in deadline_settings.ROUTES
+        if path.startswith(prefix)
+    ]
+    if not matches:
+        return "*", deadline_settings.DEFAULT_MS
+    prefix = max(matches, key=len)
+    return prefix, deadline_settings.ROUTES[prefix]
+
+
+def _apply_timeouts(session, transaction, connection):
+    # SET LOCAL semantics: the settings end with the transaction, so pooled
+    # connections never keep a request's timeouts
+    deadline = current_deadline.get()
+    if deadline is None or deadline.expires_at is None:
+        return
+    remaining_ms = max(int(deadline.remaining() * 1000), 1)
+    connection.execute(select(
+        func.set_config("statement_timeout", str(remaining_ms), True),
+        func.set_config(
+            "lock_timeout",
+            str(min(remaining_ms, deadline_settings.LOCK_TIMEOUT_MS)),
+            True
+        ),
+    ))
+
+
+def _record_timeout(context):
+    deadline = current_deadline.get()
+    code = getattr(context.original_exception, "sqlstate", None)
+    if deadline is None or code not in (STATEMENT_TIMEOUT, LOCK_TIMEOUT):
+        return
+    deadline.timeout = "statement" if code == STATEMENT_TIMEOUT else "lock"
+    if code == STATEMENT_TIMEOUT:
+        deadline_metrics.statement_timeouts_total += 1
+    else:
+        deadline_metrics.lock_timeouts_total += 1
+
+
+def install(async_engine: AsyncEngine) -> None:
+    """Propagate request deadlines to the sessions on this engine"""
+    if not event.contains(Session, "after_begin", _apply_timeouts):
+        event.listen(Session, "after_begin", _apply_timeouts)
+    if not event.contains(
+        async_engine.sync_engine, "handle_error", _record_timeout
+    ):
+        event.listen(async_engine.sync_engine, "handle_error", _record_timeout)
+
+
+class DeadlineMiddleware:
+    """
+    Give each request the deadline of its route (``DEADLINE_ROUTES``).
+
+    Transactions begun while serving the request get ``statement_timeout``
+    set to the time left and ``lock_timeout`` capped at
+    ``LOCK_TIMEOUT_MS``. When the deadline passes or the client
+    disconnects, the handler is cancelled, which cancels its in-flight
+    query and returns its connection. Database timeouts and exceeded
+    deadlines are answered with 503 and a ``Retry-After`` header. Once
+    the response is sent the deadline is lifted, so background tasks run
+    to completion; a streamed response (server-sent events, progress)
+    lifts it with its first chunk and runs as long as the client listens.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route, budget_ms = _budget(scope["path"])
+        if not budget_ms:
+            return await self.app(scope, receive, send)
+
+        deadline_metrics.requests_total += 1
+        deadline = RequestDeadline(route, budget_ms)
+        response = {"started": False, "replaced": False}
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=1)
+        disconnected = asyncio.Event()
+
+        async def pump():
+            # Single reader of the client, so a disconnect is seen even
+            # while the handler is not reading
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                await inbox.put(message)
+                if message["type"] == "http.disconnect":
+                    return
+
+        async def send_with_deadline(message):
+            if message["type"] == "http.response.start":
+                if deadline.timeout and message["status"] >= 500:
+                    response["replaced"] = True
+                    await self._unavailable(send, deadline)
+                    return
+                response["started"] = True
+            elif message["type"] == "http.response.body":
+                if response["replaced"]:
+                    return
+                # The whole body, or the first chunk of a streamed one
+                deadline.expires_at = None
+            await send(message)
+
+        token = current_deadline.set(deadline)
+        try:
+            handler = asyncio.create_task(
+                self.app(scope, inbox.get, send_with_deadline)
+            )
+        finally:
+            current_deadline.reset(token)
+        reader = asyncio.create_task(pump())
+        watcher = asyncio.create_task(disconnected.wait())
+        try:
+            while True:
+                if deadline.expires_at is None:
+                    # Response sent or streaming: let background tasks and
+                    # the stream finish; a streamed response ends itself
+                    # when the client disconnects
+                    return await handler
+                done, _ = await asyncio.wait(
+                    {handler, watcher},
+                    timeout=deadline.remaining(),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if handler in done:
+                    return handler.result()
+                if deadline.expires_at is None:
+                    continue
+                if watcher in done:
+                    deadline_metrics.disconnects_total += 1
+                    await self._cancel(handler)
+                    return
+
+                deadline_metrics.deadline_exceeded_total += 1
+                await self._cancel(handler)
+                if not response["started"] and not response["replaced"]:
+                    await self._unavailable(send, deadline)
+                return
+        finally:
+            reader.cancel()
+            watcher.cancel()
+            if not handler.done():
+                handler.cancel()
+
+    @staticmethod
+    async def _cancel(handler: asyncio.Task) -> None:
+        handler.cancel()
+        try:
+            await handler
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    @staticmethod
+    async def _unavailable(send, deadline: RequestDeadline) -> None:
+        deadline_metrics.unavailable_by_route[deadline.route] += 1
+        body = json.dumps({"detail": "Request deadline exceeded"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (
+                    b"retry-after",
+                    str(deadline_settings.RETRY_AFTER_SECONDS).encode()
+                ),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,170 @@
+import io
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+
+class OccupancyGrid:
+    """
+    Occupancy of tables over fixed-length slots, as a tables x slots array.
+
+    Each cell counts the bookings touching the slot, so releasing one
+    booking never frees a slot that a neighbouring booking still shares.
+    Slot ``k`` covers ``origin + k * slot_minutes``.
+    """
+
+    def __init__(
+        self,
+        origin: datetime,
+        days: int,
+        slot_minutes: int,
+        table_ids: Sequence[int],
+        capacities: Sequence[int],
+        counts: Optional[np.ndarray] = None,
+    ):
+        self.origin = origin
+        self.days = days
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = 24 * 60 // slot_minutes
+        self.table_ids = np.asarray(table_ids, dtype=np.int64)
+        self.capacities = np.asarray(capacities, dtype=np.int32)
+        self._rows = {
+            table_id: row for row, table_id in enumerate(self.table_ids.tolist())
+        }
+        shape = (len(self.table_ids), days * self.slots_per_day)
+        self.counts = (
+            np.zeros(shape, dtype=np.uint8) if counts is None else counts
+        )
+
+    @property
+    def end(self) -> datetime:
+        return self.origin + timedelta(days=self.days)
+
+    def _slot_index(self, moment: datetime, round_up: bool) -> int:
+        step = timedelta(minutes=self.slot_minutes)
+        index, rest = divmod(moment - self.origin, step)
+        if round_up and rest:
+            index += 1
+        return int(min(max(index, 0), self.counts.shape[1]))
+
+    def slot_range(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        """Slots overlapping [start, end), clipped to the grid"""
+        return (
+            self._slot_index(start, round_up=False),
+            self._slot_index(end, round_up=True),
+        )
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        return self.origin <= start and end <= self.end
+
+    def add_intervals(
+        self,
+        intervals: Iterable[Tuple[int, datetime, datetime]],
+        delta: int = 1
+    ) -> None:
+        """Add (table_id, start, end) intervals in one vectorised pass"""
+        rows, starts, ends = [], [], []
+        for table_id, start, end in intervals:
+            row = self._rows.get(table_id)
+            if row is None:
+                continue
+            a, b = self.slot_range(start, end)
+            if a < b:
+                rows.append(row)
+                starts.append(a)
+                ends.append(b)
+        if not rows:
+            return
+
+        # Difference array: +1 at each start, -1 at each end, then prefix sum
+        diff = np.zeros(
+            (self.counts.shape[0], self.counts.shape[1] + 1), dtype=np.int16
+        )
+        np.add.at(diff, (rows, starts), 1)
+        np.add.at(diff, (rows, ends), -1)
+        change = np.cumsum(diff[:, :-1], axis=1) * delta
+        self.counts = np.clip(
+            self.counts.astype(np.int16) + change, 0, 255
+        ).astype(np.uint8)
+
+    def mark(
+        self,
+        table_id: int,
+        start: datetime,
+        end: datetime,
+        delta: int = 1
+    ) -> None:
+        """Add (delta=1) or remove (delta=-1) one booking"""
+        row = self._rows.get(table_id)
+        if row is None:
+            return
+        a, b = self.slot_range(start, end)
+        if a >= b:
+            return
+        cells = self.counts[row, a:b].astype(np.int16) + delta
+        self.counts[row, a:b] = np.clip(cells, 0, 255)
+
+    def _capacity_mask(self, min_capacity: Optional[int]) -> np.ndarray:
+        if min_capacity is None:
+            return np.ones(len(self.table_ids), dtype=bool)
+        return self.capacities >= min_capacity
+
+    def free_tables(
+        self,
+        start: datetime,
+        end: datetime,
+        min_capacity: Optional[int] = None
+    ) -> List[int]:
+        """Tables free for the whole of [start, end)"""
+        a, b = self.slot_range(start, end)
+        free = ~self.counts[:, a:b].any(axis=1)
+        return self.table_ids[free & self._capacity_mask(min_capacity)].tolist()
+
+    def free_bitmap(
+        self,
+        day: int,
+        min_capacity: Optional[int] = None
+    ) -> np.ndarray:
+        """Tables x slots boolean array of free cells on one grid day"""
+        a = day * self.slots_per_day
+        free = self.counts[:, a:a + self.slots_per_day] == 0
+        return free & self._capacity_mask(min_capacity)[:, None]
+
+    def to_bytes(self) -> bytes:
+        """Serialise the occupied bitmap, packed eight slots per byte"""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            occupied=np.packbits(self.counts > 0, axis=1),
+            table_ids=self.table_ids,
+            capacities=self.capacities,
+            meta=np.array([
+                int(self.origin.timestamp()), self.days, self.slot_minutes
+            ], dtype=np.int64),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "OccupancyGrid":
+        """
+        Restore a serialised grid.
+
+        Only occupancy survives serialisation, so overlapping bookings on
+        one slot come back as a single count.
+        """
+        with np.load(io.BytesIO(data), allow_pickle=False) as stored:
+            origin_ts, days, slot_minutes = stored["meta"].tolist()
+            grid = cls(
+                datetime.fromtimestamp(origin_ts, ZoneInfo("UTC")),
+                days,
+                slot_minutes,
+                stored["table_ids"],
+                stored["capacities"],
+            )
+            occupied = np.unpackbits(
+                stored["occupied"], axis=1, count=grid.counts.shape[1]
+            )
+        grid.counts = occupied.astype(np.uint8)
+        return grid
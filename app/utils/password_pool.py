@@ -0,0 +1,46 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from app.core.config import user_import_settings
+from app.utils.security import hash_passwords
+
+
+class PasswordPool:
+    """
+    Worker processes for hashing passwords in bulk. bcrypt is CPU-bound
+    and holds the GIL, so threads would not spread it over the cores.
+    Started on first use; spawned rather than forked, as the server
+    process has an event loop and threads running.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def workers(self) -> int:
+        return user_import_settings.HASH_WORKERS or os.cpu_count() or 1
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def hash(self, passwords: List[str]) -> List[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool(), hash_passwords, passwords
+        )
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,253 @@
+import asyncio
+import itertools
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.config import profiling_settings
+from app.database import async_session
+from app.models.user import User, UserRole
+from app.utils.circuit_breaker import CLOSED, db_breaker
+from app.utils.deadline import current_deadline
+from app.utils.token import decode_token, recently_seen_user
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+_STDLIB = sysconfig.get_paths()["stdlib"]
+
+
+@lru_cache(maxsize=4096)
+def _label(code) -> str:
+    path = code.co_filename
+    if "site-packages" + os.sep in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    elif path.startswith(_ROOT):
+        path = os.path.relpath(path, _ROOT)
+    elif path.startswith(_STDLIB):
+        path = os.path.relpath(path, _STDLIB)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+def _await_chain(coro) -> List:
+    """Frames of a suspended coroutine and everything it awaits"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(
+            coro, "gi_frame", None
+        )
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(
+            coro, "gi_yieldfrom", None
+        )
+    return frames
+
+
+class _Sampler(threading.Thread):
+    """
+    Sample the event loop thread while one request is in flight.
+
+    When the loop is running the request, the sample is its call stack
+    below the middleware. When the request is suspended (waiting on the
+    database, a lock or a thread pool), the sample is the chain of
+    coroutines it is awaiting, marked with ``[await]``, so that the
+    profile accounts for wall-clock time and not just CPU.
+    """
+
+    def __init__(self, thread_id: int, task, root_frame, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.task = task
+        self.root_frame = root_frame
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._done = threading.Event()
+
+    def stop(self) -> Counter:
+        self._done.set()
+        self.join()
+        return self.stacks
+
+    def run(self) -> None:
+        root = _label(self.root_frame.f_code)
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            running = []
+            while frame is not None and frame is not self.root_frame:
+                running.append(_label(frame.f_code))
+                frame = frame.f_back
+            if frame is not None:
+                running.reverse()
+                self.stacks[(root, *running)] += 1
+                continue
+
+            # The loop is elsewhere: record where the request is waiting
+            chain = _await_chain(self.task.get_coro())
+            if self.root_frame in chain:
+                chain = chain[chain.index(self.root_frame) + 1:]
+            waiting = [_label(frame.f_code) for frame in chain]
+            self.stacks[(root, *waiting, "[await]")] += 1
+
+
+class ProfileStore:
+    """Bounded ring of the most recent request profiles"""
+
+    def __init__(self):
+        self._profiles: deque = deque(maxlen=profiling_settings.RING_SIZE)
+        self._ids = itertools.count(1)
+        self.active = 0
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: Dict) -> None:
+        self._profiles.append(profile)
+
+    def list(self) -> List[Dict]:
+        return list(reversed(self._profiles))
+
+    def get(self, profile_id: int) -> Optional[Dict]:
+        for profile in self._profiles:
+            if profile["id"] == profile_id:
+                return profile
+        return None
+
+
+profile_store = ProfileStore()
+
+
+def collapse(profiles: Iterable[Dict]) -> str:
+    """Merge profiles into collapsed-stack text, one ``stack count`` line
+    per distinct stack, as read by flamegraph.pl and speedscope"""
+    merged: Counter = Counter()
+    for profile in profiles:
+        merged.update(profile["stacks"])
+    return "".join(
+        f"{';'.join(stack)} {count}\n"
+        for stack, count in sorted(merged.items())
+    )
+
+
+async def _is_admin_request(headers: Dict[str, str]) -> bool:
+    """
+    Whether the token is an admin's. Only admins this process has already
+    authenticated are looked up, so the header costs no query for anyone
+    else, and the lookup is bounded by the request's deadline.
+    """
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        email = decode_token(token)
+    except HTTPException:
+        return False
+    user = recently_seen_user(email)
+    if user is None or user.role != UserRole.ADMIN:
+        return False
+    deadline = current_deadline.get()
+    if deadline is None or db_breaker.state != CLOSED:
+        # Nothing to bound the lookup by, or no database to ask: go by the
+        # role last seen
+        return True
+    try:
+        async with async_session() as db:
+            role = await asyncio.wait_for(
+                db.scalar(select(User.role).where(
+                    User.email == email, User.is_active
+                )),
+                deadline.remaining()
+            )
+    except Exception:
+        return False
+    return role == UserRole.ADMIN
+
+
+class ProfilerMiddleware:
+    """
+    Profile requests that carry the profiling header (admins only, once
+    they have signed in to this process) or are picked at ``SAMPLE_RATE``.
+    Profiled responses carry ``X-Profile-Id``.
+
+    Other requests only pay for a header lookup. Work done in the thread
+    pool (sync dependencies) shows up as an await on the pool.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = profiling_settings.HEADER.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        requested = any(
+            name == self.header for name, _ in scope["headers"]
+        )
+        sampled = (
+            profiling_settings.SAMPLE_RATE > 0
+            and random.random() < profiling_settings.SAMPLE_RATE
+        )
+        if not (requested or sampled):
+            return await self.app(scope, receive, send)
+        if profile_store.active >= profiling_settings.MAX_CONCURRENT:
+            return await self.app(scope, receive, send)
+        if requested and not sampled:
+            headers = {
+                name.decode("latin-1"): value.decode("latin-1")
+                for name, value in scope["headers"]
+            }
+            if not await _is_admin_request(headers):
+                return await self.app(scope, receive, send)
+
+        await self._profile(scope, receive, send, requested)
+
+    async def _profile(self, scope, receive, send, requested: bool):
+        profile_id = profile_store.next_id()
+        response_status = [None]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                response_status[0] = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", str(profile_id).encode()),
+                ]
+            await send(message)
+
+        sampler = _Sampler(
+            threading.get_ident(),
+            asyncio.current_task(),
+            sys._getframe(),
+            profiling_settings.INTERVAL_MS / 1000
+        )
+        profile_store.active += 1
+        started_at = datetime.now(ZoneInfo("UTC"))
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            stacks = sampler.stop()
+            profile_store.active -= 1
+            profile_store.add({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": response_status[0],
+                "started_at": started_at,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "samples": sum(stacks.values()),
+                "trigger": "header" if requested else "sampled",
+                "stacks": dict(stacks),
+            })
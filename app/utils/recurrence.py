@@ -0,0 +1,76 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Optional
+from zoneinfo import ZoneInfo
+
+from app.models.booking_series import SeriesFrequency
+
+
+def ensure_aware(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC, like booking creation does"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=ZoneInfo("UTC"))
+    return value
+
+
+def _add_months(start: datetime, months: int) -> Optional[datetime]:
+    """Shift by whole months, or None when the day does not exist"""
+    month_index = start.month - 1 + months
+    try:
+        return start.replace(
+            year=start.year + month_index // 12,
+            month=month_index % 12 + 1
+        )
+    except ValueError:
+        return None
+
+
+def iter_occurrences(
+    start_time: datetime,
+    frequency: SeriesFrequency,
+    interval: int = 1,
+    count: Optional[int] = None,
+    until: Optional[datetime] = None,
+    exceptions: Iterable[date] = (),
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+) -> Iterator[datetime]:
+    """
+    Yield occurrence start times with window_start <= start < window_end.
+
+    Follows RRULE semantics: ``count`` limits generated instances before
+    exceptions are removed, and monthly rules skip months that do not have
+    the start day (e.g. the 31st). Occurrences are computed in UTC, as the
+    series is stored, so ``exceptions`` are UTC dates whatever offset the
+    start was given in.
+    """
+    start_time = ensure_aware(start_time).astimezone(ZoneInfo("UTC"))
+    until = ensure_aware(until) if until else None
+    window_start = ensure_aware(window_start) if window_start else None
+    window_end = ensure_aware(window_end) if window_end else None
+    skipped = set(exceptions)
+
+    first = 0
+    if frequency == SeriesFrequency.WEEKLY and window_start:
+        step = timedelta(weeks=interval)
+        first = max(0, (window_start - start_time) // step)
+
+    produced = first
+    k = first
+    while count is None or produced < count:
+        if frequency == SeriesFrequency.WEEKLY:
+            occurrence = start_time + timedelta(weeks=interval * k)
+        else:
+            occurrence = _add_months(start_time, interval * k)
+        k += 1
+        if occurrence is None:
+            continue
+        produced += 1
+        if until and occurrence > until:
+            return
+        if window_end and occurrence >= window_end:
+            return
+        if window_start and occurrence < window_start:
+            continue
+        if occurrence.date() in skipped:
+            continue
+        yield occurrence
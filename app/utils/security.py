@@ -1,7 +1,7 @@
 import os
 import re
 from datetime import datetime, timedelta
-from typing import Tuple
+from typing import List, Tuple
 from jose import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
@@ -69,6 +69,11 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords (run in the password pool's processes)."""
+    return [pwd_context.hash(password) for password in passwords]
+
+
 def create_tokens(email: str) -> Tuple[str, str]:
     """Create both access and refresh tokens."""
     access_token = _create_token(
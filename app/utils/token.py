@@ -1,18 +1,44 @@
 # utils/token.py
+from collections import OrderedDict
 from datetime import timedelta
+from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
-from app.core.config import settings
+from app.core.config import breaker_settings, settings
 from app.crud.user import get_user_by_email
 from app.models.user import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
+from app.utils.circuit_breaker import CLOSED, database_available, db_breaker
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# Users recently authenticated, for while the database is unavailable
+_known_users: "OrderedDict[str, User]" = OrderedDict()
+
+
+def _remember_user(user: User) -> None:
+    _known_users[user.email] = User(
+        id=user.id,
+        email=user.email,
+        hashed_password=user.hashed_password,
+        is_active=user.is_active,
+        role=user.role,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
+    _known_users.move_to_end(user.email)
+    while len(_known_users) > breaker_settings.USER_CACHE_SIZE:
+        _known_users.popitem(last=False)
+
+
+def recently_seen_user(email: str) -> Optional[User]:
+    """The user of this email as last authenticated by this process"""
+    return _known_users.get(email)
+
 
 def create_user_access_token(email: str) -> str:
     return jwt.encode(
@@ -71,9 +97,17 @@ async def get_current_user_email(token: str = Depends(oauth2_scheme)) -> str:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    database_up: bool = Depends(database_available)
 ) -> User:
-    """Get current authenticated user."""
+    """
+    Get current authenticated user.
+
+    While the database circuit breaker is open, the token is still
+    verified but the user is taken from those recently seen by this
+    process.
+    """
+    email = None
     try:
         email = decode_token(token)
         if not email:
@@ -83,6 +117,16 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        if not database_up:
+            user = _known_users.get(email)
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Database unavailable, try again shortly",
+                    headers={"Retry-After": str(db_breaker.retry_after())}
+                )
+            return user
+
         user = await get_user_by_email(db, email=email)
         if user is None:
             raise HTTPException(
@@ -96,10 +140,14 @@ async def get_current_user(
                 detail="Inactive user"
             )
 
+        _remember_user(user)
         return user
     except HTTPException:
         raise
     except Exception:
+        # The lookup itself tripped the breaker, e.g. as a failed probe
+        if db_breaker.state != CLOSED and email in _known_users:
+            return _known_users[email]
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -0,0 +1,96 @@
+"""
+Tests of the database run against the Postgres database of DATABASE_URL
+(read from the environment or .env, like the app) and are skipped when it
+is not set or cannot be reached. What a test creates is removed
+afterwards. The other tests run without a database.
+"""
+import os
+import time
+
+import pytest
+from dotenv import load_dotenv
+
+# Lets the app's modules be imported without a database; nothing listens
+# on this one
+UNSET_DATABASE_URL = "postgresql+asyncpg://tests@127.0.0.1:1/tests"
+
+load_dotenv()
+os.environ.setdefault("DATABASE_URL", UNSET_DATABASE_URL)
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="module")
+async def database(anyio_backend):
+    """The app's engine with the schema created, shared by a module's
+    tests so that a module can seed data once for all of them"""
+    if os.environ["DATABASE_URL"] == UNSET_DATABASE_URL:
+        pytest.skip("DATABASE_URL is not set")
+    from app.database import Base, engine
+    import app.main  # noqa: F401  Registers every model and listener
+
+    engine.echo = False
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    except (OSError, ConnectionError) as e:
+        pytest.skip(f"Database unavailable: {e}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def booking_data(database):
+    """
+    A guest and a factory of tables; their bookings, series and events
+    are removed afterwards
+    """
+    from sqlalchemy import delete, select
+
+    from app.database import async_session
+    from app.models.booking import Booking
+    from app.models.booking_series import BookingSeries
+    from app.models.outbox import OutboxEvent
+    from app.models.table import Table, TableStatus
+    from app.models.user import User
+
+    table_ids = []
+
+    class Data:
+        async def table(self, capacity=4, **fields):
+            fields.setdefault("status", TableStatus.AVAILABLE)
+            fields.setdefault("is_active", True)
+            async with async_session() as db:
+                table = Table(capacity=capacity, location="tests", **fields)
+                db.add(table)
+                await db.commit()
+                table_ids.append(table.id)
+                return table
+
+    data = Data()
+    async with async_session() as db:
+        user = User(
+            email=f"test-{time.time_ns()}@example.com", hashed_password="-"
+        )
+        db.add(user)
+        await db.commit()
+        data.user_id = user.id
+    yield data
+
+    async with async_session() as db:
+        bookings = select(Booking.id).where(Booking.table_id.in_(table_ids))
+        await db.execute(
+            delete(OutboxEvent).where(OutboxEvent.aggregate_id.in_(bookings))
+        )
+        await db.execute(
+            delete(Booking).where(Booking.table_id.in_(table_ids))
+        )
+        await db.execute(
+            delete(BookingSeries).where(BookingSeries.table_id.in_(table_ids))
+        )
+        await db.execute(delete(Table).where(Table.id.in_(table_ids)))
+        await db.execute(delete(User).where(User.id == data.user_id))
+        await db.commit()
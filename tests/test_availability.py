@@ -0,0 +1,97 @@
+import random
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _seed(booking_data):
+    """Tables of several sizes, single bookings on them (one of them
+    cancelled) and a weekly series running past its materialised
+    horizon; returns the tables and the busy start times"""
+    from app.core.config import series_settings
+    from app.crud.booking import create_booking
+    from app.crud.booking_series import create_series
+    from app.database import async_session
+    from app.models.booking import BookingStatus
+    from app.models.booking_series import SeriesFrequency
+    from app.models.table import TableStatus
+    from app.schemas.booking import BookingSeriesCreate
+
+    tables = [
+        await booking_data.table(capacity)
+        for capacity in (2, 2, 4, 6, 8)
+    ]
+    tables.append(
+        await booking_data.table(4, status=TableStatus.MAINTENANCE)
+    )
+    tables.append(await booking_data.table(4, is_active=False))
+    day = (datetime.now(ZoneInfo("UTC")) + timedelta(days=1)).replace(
+        hour=18, minute=0, second=0, microsecond=0
+    )
+    starts = []
+    async with async_session() as db:
+        for n, table in enumerate(tables[:5]):
+            start = day + timedelta(days=n, minutes=30 * n)
+            booking = await create_booking(
+                db, booking_data.user_id, table.id, start, 2
+            )
+            starts.append(start)
+        booking.status = BookingStatus.CANCELLED
+        await db.commit()
+
+        weeks = series_settings.HORIZON_DAYS // 7 + 4
+        await create_series(db, booking_data.user_id, BookingSeriesCreate(
+            table_id=tables[2].id,
+            start_time=day + timedelta(hours=1),
+            guest_count=2,
+            frequency=SeriesFrequency.WEEKLY,
+            count=weeks,
+        ))
+        starts += [
+            day + timedelta(hours=1, weeks=week) for week in range(weeks)
+        ]
+    return tables, starts
+
+
+async def test_batch_matches_single_queries(booking_data):
+    from app.crud.booking import (
+        get_available_tables,
+        get_available_tables_batch,
+    )
+    from app.database import async_session
+
+    tables, starts = await _seed(booking_data)
+    table_ids = {table.id for table in tables}
+    rng = random.Random(34)
+    queries = []
+    for _ in range(80):
+        # Around a busy start, so that queries overlap, touch and miss
+        start = rng.choice(starts) + timedelta(minutes=30 * rng.randint(-6, 6))
+        end = start + timedelta(minutes=30 * rng.randint(1, 6))
+        queries.append((start, end, rng.choice((None, 0, 2, 3, 4, 6, 9))))
+    # The series' last occurrence, past what is materialised
+    queries.append((starts[-1], starts[-1] + timedelta(hours=1), None))
+
+    async with async_session() as db:
+        batch = await get_available_tables_batch(db, queries)
+        single = [
+            await get_available_tables(db, start, end, guest_count)
+            for start, end, guest_count in queries
+        ]
+
+    def ours(answer):
+        return sorted(table.id for table in answer if table.id in table_ids)
+
+    assert [ours(answer) for answer in batch] == [
+        ours(answer) for answer in single
+    ]
+    # Bookings took tables out of answers that were not about size
+    assert any(
+        len(ours(answer)) < 5
+        for (_, _, guest_count), answer in zip(queries, single)
+        if not guest_count
+    )
+    assert tables[2].id not in ours(batch[-1])
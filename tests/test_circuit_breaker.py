@@ -0,0 +1,134 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import breaker_settings
+from app.utils import circuit_breaker
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Monotonic time of the breaker, moved by hand"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(
+        circuit_breaker, "time", SimpleNamespace(monotonic=lambda: now.value)
+    )
+    monkeypatch.setattr(breaker_settings, "FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(breaker_settings, "OPEN_SECONDS", 10.0)
+    return now
+
+
+@pytest.fixture
+def breaker(clock, monkeypatch):
+    breaker = CircuitBreaker()
+    monkeypatch.setattr(circuit_breaker, "db_breaker", breaker)
+    return breaker
+
+
+def _trip(breaker):
+    for _ in range(breaker_settings.FAILURE_THRESHOLD):
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.trips_total == 1
+    assert not breaker.allow_request()
+
+
+def test_failures_while_open_do_not_extend_it(breaker, clock):
+    _trip(breaker)
+    clock.value += 6
+    breaker.record_failure()
+    assert breaker.retry_after() == 4
+    clock.value += 4
+    assert breaker.allow_request()
+
+
+def test_half_open_lets_one_probe_through(breaker, clock):
+    _trip(breaker)
+    clock.value += breaker_settings.OPEN_SECONDS
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+
+    # A probe that never reports back is replaced after OPEN_SECONDS
+    clock.value += breaker_settings.OPEN_SECONDS
+    assert breaker.allow_request()
+
+
+def test_probe_success_closes(breaker, clock):
+    _trip(breaker)
+    clock.value += breaker_settings.OPEN_SECONDS
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow_request() and breaker.allow_request()
+
+
+def test_probe_failure_reopens(breaker, clock):
+    _trip(breaker)
+    clock.value += breaker_settings.OPEN_SECONDS
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.trips_total == 2
+    assert not breaker.allow_request()
+    assert breaker.retry_after() == breaker_settings.OPEN_SECONDS
+
+
+class _DriverError(Exception):
+    def __init__(self, sqlstate):
+        self.sqlstate = sqlstate
+
+
+def _context(error=None, is_disconnect=False):
+    return SimpleNamespace(
+        original_exception=error, is_disconnect=is_disconnect
+    )
+
+
+@pytest.mark.parametrize("error, outage", [
+    (_DriverError("08006"), True),  # connection_failure
+    (_DriverError("53300"), True),  # too_many_connections
+    (_DriverError("57P01"), True),  # admin_shutdown
+    (_DriverError("58000"), True),  # system_error
+    (_DriverError("57014"), False),  # statement timeout of a deadline
+    (_DriverError("55P03"), False),  # lock timeout of a deadline
+    (_DriverError("23505"), False),  # unique_violation
+    (ConnectionRefusedError(), True),
+    (asyncio.TimeoutError(), True),
+    (ValueError(), False),
+])
+def test_outages(error, outage):
+    assert circuit_breaker._is_outage(_context(error)) is outage
+
+
+def test_disconnects_are_outages():
+    assert circuit_breaker._is_outage(
+        _context(ValueError(), is_disconnect=True)
+    )
+
+
+def test_deadline_timeouts_do_not_trip(breaker):
+    for _ in range(breaker_settings.FAILURE_THRESHOLD * 2):
+        circuit_breaker._on_error(_context(_DriverError("57014")))
+        circuit_breaker._on_error(_context(_DriverError("55P03")))
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+    for _ in range(breaker_settings.FAILURE_THRESHOLD):
+        circuit_breaker._on_error(_context(_DriverError("57P01")))
+    assert breaker.state == OPEN
@@ -0,0 +1,75 @@
+import itertools
+import random
+
+import pytest
+
+from app.utils.combinations import best_combination, split_guests
+
+
+def _brute_force(members, max_tables, guest_count):
+    """best_combination's answer from every combination of the members"""
+    found = []
+    for size in range(2, max_tables + 1):
+        for combination in itertools.combinations(members, size):
+            capacities = [capacity for _, capacity in combination]
+            total = sum(capacities)
+            if total < guest_count or any(
+                total - capacity >= guest_count for capacity in capacities
+            ):
+                continue
+            table_ids = tuple(sorted(table_id for table_id, _ in combination))
+            found.append((total, size, table_ids))
+    if not found:
+        return None
+    total, _, table_ids = min(found)
+    return total, table_ids
+
+
+def test_fewest_spare_seats_then_fewest_tables():
+    members = [(1, 2), (2, 4), (3, 4), (4, 6), (5, 8)]
+    assert best_combination(members, 4, 10) == (10, (1, 5))
+    assert best_combination(members, 4, 12) == (12, (2, 5))
+    assert best_combination(members, 2, 20) is None
+
+
+def test_equal_capacities_take_the_lowest_ids():
+    members = [(9, 4), (3, 4), (7, 4), (5, 4)]
+    assert best_combination(members, 4, 8) == (8, (3, 5))
+
+
+def test_no_table_to_spare():
+    # The party fits at the 10, so any pair with it has a table to spare
+    assert best_combination([(1, 10), (2, 2)], 4, 3) is None
+    assert best_combination([(1, 10), (2, 2), (3, 2)], 4, 3) == (4, (2, 3))
+
+
+def test_matches_brute_force():
+    rng = random.Random(29)
+    for _ in range(500):
+        members = [
+            (table_id, rng.choice((1, 2, 2, 4, 4, 6, 8, 10)))
+            for table_id in rng.sample(range(1, 100), rng.randint(2, 9))
+        ]
+        max_tables = rng.randint(2, 4)
+        guest_count = rng.randint(2, 30)
+        assert best_combination(members, max_tables, guest_count) == \
+            _brute_force(members, max_tables, guest_count)
+
+
+def test_split_seats_everyone_at_least_one_per_table():
+    assert split_guests([4, 4], 5) == [4, 1]
+    assert split_guests([2, 6], 7) == [2, 5]
+    assert split_guests([4, 4, 2], 9) == [4, 4, 1]
+    assert split_guests([6, 6], 12) == [6, 6]
+
+
+def test_split_refuses_a_table_the_party_does_not_need():
+    with pytest.raises(ValueError, match="fits without"):
+        split_guests([4, 4], 4)
+    with pytest.raises(ValueError, match="fits without"):
+        split_guests([8, 2], 3)
+
+
+def test_split_refuses_tables_too_small():
+    with pytest.raises(ValueError, match="too small"):
+        split_guests([2, 2], 5)
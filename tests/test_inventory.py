@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_claims_never_overlap(booking_data):
+    """
+    Bookings off the slot grid share slots with their neighbours. Claims
+    racing for those slots may lose, but the bookings that win never
+    overlap.
+    """
+    from sqlalchemy import select
+
+    from app.crud.inventory import (
+        create_inventory_booking,
+        materialize_slots,
+    )
+    from app.database import async_session
+    from app.models.booking import Booking
+
+    table = await booking_data.table(inventory_mode=True)
+    async with async_session() as db:
+        await materialize_slots(db, [table.id])
+    base = (datetime.now(ZoneInfo("UTC")) + timedelta(days=1)).replace(
+        hour=8, minute=0, second=0, microsecond=0
+    )
+
+    async def claim(start):
+        async with async_session() as db:
+            return await create_inventory_booking(
+                db, booking_data.user_id, table.id,
+                start, start + timedelta(minutes=20), 2
+            )
+
+    for round_ in range(40):
+        # Twenty minute bookings five minutes apart, each overlapping
+        # the next three
+        first = base + timedelta(hours=round_)
+        await asyncio.gather(*(
+            claim(first + timedelta(minutes=5 * step)) for step in range(8)
+        ))
+
+    async with async_session() as db:
+        intervals = (await db.execute(
+            select(Booking.start_time, Booking.end_time)
+            .where(Booking.table_id == table.id)
+            .order_by(Booking.start_time)
+        )).all()
+    assert intervals
+    for (_, end), (start, _) in zip(intervals, intervals[1:]):
+        assert end <= start
+
+
+async def test_claim_rechecks_bookings_it_could_not_see(booking_data):
+    """
+    A booking committed after the claim statement's snapshot, such as a
+    concurrent claim of a shared slot that finished while the claim's
+    scan ran, is refused once the slots are locked
+    """
+    from sqlalchemy import select
+
+    from app.crud.inventory import (
+        create_inventory_booking,
+        materialize_slots,
+    )
+    from app.database import async_session
+    from app.models.booking import Booking, BookingStatus
+
+    table = await booking_data.table(inventory_mode=True)
+    async with async_session() as db:
+        await materialize_slots(db, [table.id])
+    start = (datetime.now(ZoneInfo("UTC")) + timedelta(days=1)).replace(
+        hour=8, minute=5, second=0, microsecond=0
+    )
+
+    async def rival_booking():
+        async with async_session() as db:
+            db.add(Booking(
+                user_id=booking_data.user_id,
+                table_id=table.id,
+                start_time=start - timedelta(minutes=10),
+                end_time=start + timedelta(minutes=5),
+                guest_count=2,
+                status=BookingStatus.CONFIRMED,
+            ))
+            await db.commit()
+
+    async with async_session() as db:
+        execute = db.execute
+
+        async def execute_then_rival(statement, *args, **kwargs):
+            result = await execute(statement, *args, **kwargs)
+            if getattr(statement, "_for_update_arg", None) is not None:
+                await rival_booking()
+            return result
+
+        db.execute = execute_then_rival
+        booking = await create_inventory_booking(
+            db, booking_data.user_id, table.id,
+            start, start + timedelta(minutes=20), 2
+        )
+        await db.rollback()
+
+    assert booking is None
+    async with async_session() as db:
+        bookings = (await db.scalars(
+            select(Booking).where(Booking.table_id == table.id)
+        )).all()
+    assert len(bookings) == 1
@@ -0,0 +1,191 @@
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from app.utils.occupancy import OccupancyGrid
+
+ORIGIN = datetime(2030, 6, 3, tzinfo=ZoneInfo("UTC"))
+
+
+def _at(hours):
+    return ORIGIN + timedelta(hours=hours)
+
+
+def _grid(table_ids=(1, 2, 3), capacities=(2, 4, 6)):
+    return OccupancyGrid(ORIGIN, 2, 15, table_ids, capacities)
+
+
+def test_bookings_cover_the_slots_they_touch():
+    grid = _grid()
+    grid.mark(1, _at(18 + 5 / 60), _at(18 + 20 / 60))
+
+    assert grid.slot_range(_at(18 + 5 / 60), _at(18 + 20 / 60)) == (72, 74)
+    assert grid.counts[0].nonzero()[0].tolist() == [72, 73]
+    assert grid.free_tables(_at(18), _at(18.25)) == [2, 3]
+    assert grid.free_tables(_at(18.25), _at(18.5)) == [2, 3]
+    # Slot 18:30 is free even though it was only partly needed
+    assert grid.free_tables(_at(18.5), _at(19)) == [1, 2, 3]
+    assert grid.free_tables(_at(17), _at(18)) == [1, 2, 3]
+
+
+def test_releasing_one_booking_keeps_shared_slots():
+    grid = _grid()
+    grid.mark(2, _at(18), _at(19))
+    grid.mark(2, _at(18.75), _at(20))
+    grid.mark(2, _at(18), _at(19), -1)
+
+    assert 2 in grid.free_tables(_at(18), _at(18.75))
+    assert 2 not in grid.free_tables(_at(18.75), _at(19))
+    assert 2 not in grid.free_tables(_at(19.75), _at(20))
+
+
+def test_capacity_and_unknown_tables():
+    grid = _grid()
+    grid.mark(99, _at(18), _at(19))
+    assert grid.free_tables(_at(18), _at(19), min_capacity=4) == [2, 3]
+    assert grid.free_tables(_at(18), _at(19), min_capacity=7) == []
+    assert not grid.counts.any()
+
+
+def test_intervals_are_clipped_to_the_horizon():
+    grid = _grid()
+    assert grid.covers(ORIGIN, grid.end)
+    assert not grid.covers(ORIGIN - timedelta(minutes=1), _at(1))
+    assert not grid.covers(_at(47), grid.end + timedelta(minutes=1))
+
+    grid.add_intervals([
+        (1, ORIGIN - timedelta(days=1), _at(0.5)),
+        (3, _at(47.5), grid.end + timedelta(days=1)),
+        (2, grid.end, grid.end + timedelta(days=1)),
+    ])
+    assert grid.counts[0].nonzero()[0].tolist() == [0, 1]
+    assert grid.counts[2].nonzero()[0].tolist() == [190, 191]
+    assert not grid.counts[1].any()
+
+
+def test_add_intervals_matches_marking_one_by_one():
+    rng = random.Random(36)
+    for _ in range(50):
+        intervals = []
+        for _ in range(rng.randint(0, 40)):
+            start = _at(rng.randint(-8, 200) / 4)
+            end = start + timedelta(minutes=rng.randint(1, 300))
+            intervals.append((rng.randint(1, 4), start, end))
+        batched, marked = _grid(), _grid()
+
+        batched.add_intervals(intervals)
+        for interval in intervals:
+            marked.mark(*interval)
+        assert np.array_equal(batched.counts, marked.counts)
+
+        removed = intervals[::2]
+        batched.add_intervals(removed, -1)
+        for interval in removed:
+            marked.mark(*interval, -1)
+        assert np.array_equal(batched.counts, marked.counts)
+
+
+def test_free_bitmap_of_one_day():
+    grid = _grid()
+    grid.mark(1, _at(24 + 18), _at(24 + 19))
+    bitmap = grid.free_bitmap(1, min_capacity=2)
+    assert bitmap.shape == (3, 96)
+    assert not bitmap[0, 72:76].any() and bitmap[0, 76:].all()
+    assert grid.free_bitmap(0)[0].all()
+    assert not grid.free_bitmap(1, min_capacity=5)[:2].any()
+
+
+def test_serialised_grid_keeps_occupancy():
+    grid = _grid()
+    grid.mark(1, _at(18), _at(19))
+    grid.mark(1, _at(18.5), _at(20))
+    grid.mark(3, _at(30), _at(31.25))
+
+    restored = OccupancyGrid.from_bytes(grid.to_bytes())
+    assert restored.origin == ORIGIN
+    assert (restored.days, restored.slot_minutes) == (2, 15)
+    assert restored.table_ids.tolist() == [1, 2, 3]
+    assert restored.capacities.tolist() == [2, 4, 6]
+    assert np.array_equal(restored.counts > 0, grid.counts > 0)
+    # Overlapping bookings come back as one
+    assert restored.counts.max() == 1
+
+
+class _Session:
+    """Answers a rebuild's two reads; ``during_read`` runs while the
+    bookings are being read, as writes of other requests would"""
+
+    def __init__(self, tables, bookings, during_read):
+        self.results = [
+            SimpleNamespace(scalars=lambda: SimpleNamespace(
+                all=lambda: tables
+            )),
+            SimpleNamespace(all=lambda: bookings),
+        ]
+        self.during_read = during_read
+
+    async def execute(self, statement):
+        result = self.results.pop(0)
+        if not self.results:
+            self.during_read()
+        return result
+
+
+@pytest.mark.anyio
+async def test_rebuild_replays_writes_made_while_reading(anyio_backend):
+    from app.crud.occupancy import OccupancyCache
+
+    today = datetime.now(ZoneInfo("UTC")).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    tables = [
+        SimpleNamespace(
+            id=table_id, capacity=4, location="tests", status="available",
+            is_active=True, combination_group=None, inventory_mode=False,
+        )
+        for table_id in (1, 2)
+    ]
+
+    def booking(booking_id, table_id, hour):
+        return SimpleNamespace(
+            id=booking_id, table_id=table_id,
+            start_time=today + timedelta(days=1, hours=hour),
+            end_time=today + timedelta(days=1, hours=hour + 1),
+        )
+
+    in_snapshot = booking(1, 1, 18)
+    cancelled = booking(2, 1, 20)
+    created = booking(3, 2, 18)
+    moved = booking(4, 2, 12)
+    cache = OccupancyCache()
+
+    def during_read():
+        # Seen by the snapshot already, or not at all
+        cache.booking_created(in_snapshot)
+        cache.booking_cancelled(cancelled)
+        cache.booking_created(created)
+        cache.booking_moved(
+            moved.id,
+            (moved.table_id, moved.start_time, moved.end_time),
+            (1, moved.start_time, moved.end_time)
+        )
+
+    snapshot = [
+        (b.id, b.table_id, b.start_time, b.end_time)
+        for b in (in_snapshot, cancelled, moved)
+    ]
+    grid = await cache.get_grid(_Session(tables, snapshot, during_read))
+
+    def busy(table_id, b):
+        return table_id not in grid.free_tables(b.start_time, b.end_time)
+
+    assert busy(1, in_snapshot)
+    assert grid.counts[0].max() == 1
+    assert not busy(1, cancelled)
+    assert busy(2, created)
+    assert busy(1, moved) and not busy(2, moved)
+    assert [table.id for table in cache.tables([2, 1])] == [2, 1]
@@ -0,0 +1,141 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from zoneinfo import ZoneInfo
+
+import httpx
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.batches.append(json.loads(body))
+        self.send_response(self.server.status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    """Local stub endpoint recording the batches POSTed to it"""
+    from app.core.config import outbox_settings
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Receiver)
+    server.batches = []
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        outbox_settings, "WEBHOOK_URLS",
+        [f"http://127.0.0.1:{server.server_port}/hooks"]
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def _dispatch_all():
+    from app.tasks.outbox import OutboxDispatcher
+
+    dispatcher = OutboxDispatcher()
+    async with httpx.AsyncClient() as client:
+        while await dispatcher.dispatch_once(client):
+            pass
+    return dispatcher
+
+
+def _delivered(webhook, booking_ids):
+    return [
+        (event["type"], event["payload"]["booking_id"])
+        for batch in webhook.batches
+        for event in batch["events"]
+        if event["payload"]["booking_id"] in booking_ids
+    ]
+
+
+async def _weekly_series(booking_data, weeks=3):
+    from app.crud.booking_series import create_series
+    from app.database import async_session
+    from app.models.booking_series import SeriesFrequency
+    from app.schemas.booking import BookingSeriesCreate
+
+    table = await booking_data.table()
+    start = (datetime.now(ZoneInfo("UTC")) + timedelta(days=1)).replace(
+        hour=18, minute=0, second=0, microsecond=0
+    )
+    series = BookingSeriesCreate(
+        table_id=table.id,
+        start_time=start,
+        guest_count=2,
+        frequency=SeriesFrequency.WEEKLY,
+        count=weeks,
+    )
+    async with async_session() as db:
+        return await create_series(db, booking_data.user_id, series)
+
+
+async def _series_bookings(series):
+    from sqlalchemy import select
+
+    from app.database import async_session
+    from app.models.booking import Booking
+
+    async with async_session() as db:
+        return (await db.scalars(
+            select(Booking)
+            .where(Booking.series_id == series.id)
+            .order_by(Booking.start_time)
+        )).all()
+
+
+async def test_series_exception_delivers_cancellation(booking_data, webhook):
+    from app.crud.booking_series import add_series_exception, get_series
+    from app.database import async_session
+
+    series = await _weekly_series(booking_data)
+    first, *rest = await _series_bookings(series)
+    async with async_session() as db:
+        await add_series_exception(
+            db, await get_series(db, series.id), first.start_time.date()
+        )
+    await _dispatch_all()
+
+    ids = {first.id, *(booking.id for booking in rest)}
+    delivered = _delivered(webhook, ids)
+    assert sorted(delivered) == sorted(
+        [("booking.created", booking_id) for booking_id in ids]
+        + [("booking.cancelled", first.id)]
+    )
+    # A booking's own events arrive in the order they happened
+    assert delivered.index(("booking.created", first.id)) < delivered.index(
+        ("booking.cancelled", first.id)
+    )
+
+
+async def test_failed_delivery_is_retried_later(booking_data, webhook):
+    from sqlalchemy import select
+
+    from app.database import async_session
+    from app.models.outbox import OutboxEvent
+
+    webhook.status = 500
+    series = await _weekly_series(booking_data, weeks=1)
+    [booking] = await _series_bookings(series)
+    dispatcher = await _dispatch_all()
+
+    assert dispatcher.delivered_total == 0
+    assert _delivered(webhook, {booking.id})
+    async with async_session() as db:
+        event = await db.scalar(
+            select(OutboxEvent).where(OutboxEvent.aggregate_id == booking.id)
+        )
+    assert event.delivered_at is None
+    assert event.attempts == 1
+    assert event.available_at > event.created_at
+    assert "500" in event.last_error
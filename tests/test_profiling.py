@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+from jose import jwt
+
+pytestmark = pytest.mark.anyio
+
+
+def _headers(email):
+    from app.core.config import settings
+
+    token = jwt.encode(
+        {"sub": email, "exp": datetime.now(ZoneInfo("UTC")) + timedelta(1)},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+    return {"authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def lookups(monkeypatch, anyio_backend):
+    """Role lookups of the profiler, answered after ``delay`` seconds"""
+    from app.models.user import User, UserRole
+    from app.utils import profiling, token
+
+    lookups = SimpleNamespace(count=0, delay=0)
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def scalar(self, statement):
+            lookups.count += 1
+            await asyncio.sleep(lookups.delay)
+            return UserRole.ADMIN
+
+    monkeypatch.setattr(profiling, "async_session", Session)
+    monkeypatch.setattr(token, "_known_users", {
+        f"{role.value}@example.com": User(
+            email=f"{role.value}@example.com", role=role, is_active=True
+        )
+        for role in UserRole
+    })
+    return lookups
+
+
+async def test_unknown_and_non_admin_tokens_are_not_looked_up(lookups):
+    from app.utils.deadline import RequestDeadline, current_deadline
+    from app.utils.profiling import _is_admin_request
+
+    current_deadline.set(RequestDeadline("*", 1000))
+    assert not await _is_admin_request(_headers("stranger@example.com"))
+    assert not await _is_admin_request(_headers("guest@example.com"))
+    assert not await _is_admin_request({"authorization": "Bearer nonsense"})
+    assert not await _is_admin_request({})
+    assert lookups.count == 0
+
+    assert await _is_admin_request(_headers("admin@example.com"))
+    assert lookups.count == 1
+
+
+async def test_admin_lookup_is_bounded_by_the_deadline(lookups):
+    from app.utils.deadline import RequestDeadline, current_deadline
+    from app.utils.profiling import _is_admin_request
+
+    lookups.delay = 5
+    current_deadline.set(RequestDeadline("*", 50))
+    started = asyncio.get_running_loop().time()
+    assert not await _is_admin_request(_headers("admin@example.com"))
+    assert asyncio.get_running_loop().time() - started < 1
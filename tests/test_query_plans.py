@@ -0,0 +1,44 @@
+"""
+The checks of ``app.benchmarks.query_plans``, one test per check, on a
+dataset seeded once for the module
+"""
+import pytest
+
+from app.benchmarks import query_plans
+
+pytestmark = pytest.mark.anyio
+
+# Enough rows for the planner to prefer the indexes it would in use
+BOOKINGS = 20000
+
+
+@pytest.fixture(scope="module")
+async def plan_data(database):
+    from sqlalchemy import text
+
+    data = await query_plans.seed_plan_dataset(BOOKINGS)
+    try:
+        async with database.connect() as conn:
+            # Bookings are written roughly in time order. Rows seeded into
+            # the space earlier runs freed would be scattered instead, and
+            # the plans would depend on the database's history.
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(
+                text("CLUSTER bookings USING idx_booking_date_range")
+            )
+            await conn.execute(text("VACUUM ANALYZE bookings"))
+            data["full_pass"] = await query_plans.full_pass_cost(conn)
+        yield data
+    finally:
+        await query_plans.remove_dataset(data)
+
+
+@pytest.mark.parametrize(
+    "check", query_plans.CHECKS, ids=lambda check: check.name
+)
+async def test_plan(plan_data, database, check):
+    async with database.connect() as conn:
+        plan, failures, text_plan = await query_plans.explain_check(
+            conn, check, plan_data, plan_data["full_pass"]
+        )
+    assert not failures, "\n".join(["; ".join(failures), *text_plan])
@@ -0,0 +1,185 @@
+import itertools
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.dialects import postgresql
+
+from app.crud.reassignment import _move_bookings, match_bookings
+
+DAY = datetime(2030, 6, 3, tzinfo=ZoneInfo("UTC"))
+
+
+def _at(hour):
+    return DAY + timedelta(hours=hour)
+
+
+def _booking(booking_id, start, end, guest_count=2):
+    return SimpleNamespace(
+        id=booking_id,
+        start_time=_at(start),
+        end_time=_at(end),
+        guest_count=guest_count,
+    )
+
+
+def _table(table_id, capacity=4):
+    return SimpleNamespace(id=table_id, capacity=capacity)
+
+
+def _overlap(a, b):
+    return a.start_time < b.end_time and b.start_time < a.end_time
+
+
+def _check(bookings, tables, taken, assignment):
+    """Every move fits its table, clashes with nothing already there and
+    with no other booking moved to the same table"""
+    capacities = {table.id: table.capacity for table in tables}
+    by_id = {booking.id: booking for booking in bookings}
+    for booking_id, table_id in assignment.items():
+        booking = by_id[booking_id]
+        assert capacities[table_id] >= booking.guest_count
+        assert all(
+            not (start < booking.end_time and booking.start_time < end)
+            for start, end in taken.get(table_id, [])
+        )
+    for a, b in itertools.combinations(assignment, 2):
+        if assignment[a] == assignment[b]:
+            assert not _overlap(by_id[a], by_id[b])
+
+
+def test_overlapping_bookings_take_the_tightest_free_tables():
+    bookings = [_booking(1, 18, 20, 2), _booking(2, 19, 21, 5)]
+    tables = [_table(10, 8), _table(11, 2), _table(12, 6), _table(13, 4)]
+    taken = {13: [(_at(17), _at(19))]}
+
+    assert match_bookings(bookings, tables, taken) == {1: 11, 2: 12}
+    assert taken[11] == [(_at(18), _at(20))]
+    assert taken[12] == [(_at(19), _at(21))]
+
+
+def test_groups_apart_reuse_the_same_tables():
+    # 20:00 ends the first group, so the second does not compete with it
+    bookings = [
+        _booking(1, 18, 20), _booking(2, 18, 20),
+        _booking(3, 20, 22), _booking(4, 20, 22),
+    ]
+    tables = [_table(10), _table(11)]
+
+    assignment = match_bookings(bookings, tables, {})
+    assert {assignment[1], assignment[2]} == {10, 11}
+    assert {assignment[3], assignment[4]} == {10, 11}
+
+
+def test_bookings_of_a_group_that_do_not_overlap_share_a_table():
+    # One group, as 2 overlaps both, though 1 and 3 do not overlap
+    bookings = [_booking(1, 18, 20), _booking(2, 19, 22), _booking(3, 20, 21)]
+    tables = [_table(10), _table(11)]
+    taken = {}
+
+    assignment = match_bookings(bookings, tables, taken)
+    assert sorted(assignment) == [1, 2, 3]
+    _check(bookings, tables, {}, assignment)
+
+
+def test_augmenting_paths_place_the_whole_group():
+    # Each booking can take two tables. Placed in turn on the first table
+    # free, 1 takes 10 and 2 takes 11, leaving nothing for 3
+    bookings = [
+        _booking(1, 18, 20, 2), _booking(2, 18.5, 21, 3), _booking(3, 19, 22)
+    ]
+    tables = [_table(10, 2), _table(11), _table(12)]
+    taken = {12: [(_at(18), _at(18.5)), (_at(21), _at(22))]}
+
+    assert match_bookings(bookings, tables, taken) == {1: 11, 2: 12, 3: 10}
+
+
+def test_bookings_that_fit_nowhere_are_left_out():
+    bookings = [_booking(1, 18, 20, 2), _booking(2, 18, 20, 9)]
+    tables = [_table(10, 8), _table(11, 4)]
+    taken = {11: [(_at(19), _at(23))]}
+
+    assert match_bookings(bookings, tables, taken) == {1: 10}
+
+
+def _most_placed(bookings, tables, taken):
+    """Largest number of bookings, all at the same time, placed on
+    distinct tables that are free and fit them"""
+    options = [
+        [
+            table.id for table in tables
+            if table.capacity >= booking.guest_count
+            and not taken.get(table.id)
+        ]
+        for booking in bookings
+    ]
+    best = 0
+    for choice in itertools.product(*[[None, *o] for o in options]):
+        placed = [table_id for table_id in choice if table_id is not None]
+        if len(placed) == len(set(placed)):
+            best = max(best, len(placed))
+    return best
+
+
+def test_matching_is_maximal_within_a_group():
+    rng = random.Random(33)
+    for _ in range(300):
+        bookings = [
+            _booking(booking_id, 18, 20, rng.choice((1, 2, 4, 6, 8)))
+            for booking_id in range(1, rng.randint(2, 5))
+        ]
+        tables = [
+            _table(table_id, rng.choice((2, 4, 6, 8)))
+            for table_id in range(10, 10 + rng.randint(1, 5))
+        ]
+        taken = {
+            table.id: [(_at(19), _at(21))]
+            for table in tables if rng.random() < 0.2
+        }
+        expected = _most_placed(bookings, tables, taken)
+
+        assignment = match_bookings(bookings, tables, dict(taken))
+        assert len(assignment) == expected
+        _check(bookings, tables, taken, assignment)
+
+
+def test_assignments_are_valid():
+    rng = random.Random(330)
+    for _ in range(300):
+        bookings = []
+        for booking_id in range(1, rng.randint(2, 12)):
+            start = rng.randint(16, 22)
+            bookings.append(_booking(
+                booking_id, start, start + rng.randint(1, 3),
+                rng.choice((1, 2, 4, 6))
+            ))
+        bookings.sort(key=lambda booking: (booking.start_time, booking.id))
+        tables = [
+            _table(table_id, rng.choice((2, 4, 6)))
+            for table_id in range(10, 10 + rng.randint(1, 4))
+        ]
+        taken = {}
+        for table in tables:
+            if rng.random() < 0.3:
+                start = rng.randint(16, 23)
+                taken[table.id] = [(_at(start), _at(start + 1))]
+
+        assignment = match_bookings(
+            bookings, tables, {k: list(v) for k, v in taken.items()}
+        )
+        _check(bookings, tables, taken, assignment)
+
+
+def test_moves_are_one_case_update():
+    statement = _move_bookings({1: 7, 2: 8, 5: 7}).compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True}
+    )
+    sql = str(statement)
+    assert sql.startswith("UPDATE bookings SET ")
+    assert (
+        "table_id=CASE bookings.id WHEN 1 THEN 7 WHEN 2 THEN 8 WHEN 5 THEN 7 "
+        "END" in sql
+    )
+    assert sql.endswith("WHERE bookings.id IN (1, 2, 5)")
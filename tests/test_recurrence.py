@@ -0,0 +1,97 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.models.booking_series import SeriesFrequency
+from app.utils.recurrence import iter_occurrences
+
+UTC = ZoneInfo("UTC")
+WEEKLY = SeriesFrequency.WEEKLY
+MONTHLY = SeriesFrequency.MONTHLY
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=UTC)
+
+
+def test_weekly_interval_and_count():
+    start = _utc(2030, 1, 7, 18)
+    assert list(iter_occurrences(start, WEEKLY, interval=2, count=3)) == [
+        start, start + timedelta(weeks=2), start + timedelta(weeks=4)
+    ]
+
+
+def test_until_is_inclusive():
+    start = _utc(2030, 1, 7, 18)
+    until = start + timedelta(weeks=2)
+    assert list(iter_occurrences(start, WEEKLY, until=until)) == [
+        start, start + timedelta(weeks=1), until
+    ]
+
+
+def test_exceptions_count_towards_count():
+    start = _utc(2030, 1, 7, 18)
+    occurrences = list(iter_occurrences(
+        start, WEEKLY, count=4, exceptions=[date(2030, 1, 14)]
+    ))
+    assert occurrences == [
+        start, start + timedelta(weeks=2), start + timedelta(weeks=3)
+    ]
+
+
+def test_monthly_skips_months_without_the_day():
+    occurrences = iter_occurrences(_utc(2030, 1, 31, 12), MONTHLY, count=4)
+    assert [o.date() for o in occurrences] == [
+        date(2030, 1, 31), date(2030, 3, 31),
+        date(2030, 5, 31), date(2030, 7, 31),
+    ]
+    leap = iter_occurrences(_utc(2028, 2, 29, 12), MONTHLY, 12, count=2)
+    assert [o.date() for o in leap] == [date(2028, 2, 29), date(2032, 2, 29)]
+
+
+def test_monthly_interval_crosses_years():
+    occurrences = iter_occurrences(_utc(2030, 11, 15, 9), MONTHLY, 2, count=3)
+    assert [o.date() for o in occurrences] == [
+        date(2030, 11, 15), date(2031, 1, 15), date(2031, 3, 15)
+    ]
+
+
+def test_series_are_computed_in_utc():
+    # 01:00 at +02:00 is 23:00 UTC the day before, the date exceptions use
+    start = datetime(2030, 1, 8, 1, tzinfo=timezone(timedelta(hours=2)))
+    occurrences = list(iter_occurrences(
+        start, WEEKLY, count=3, exceptions=[date(2030, 1, 14)]
+    ))
+    assert occurrences == [_utc(2030, 1, 7, 23), _utc(2030, 1, 21, 23)]
+    assert all(o.tzinfo == UTC for o in occurrences)
+
+    naive = list(iter_occurrences(datetime(2030, 1, 7, 18), WEEKLY, count=1))
+    assert naive == [_utc(2030, 1, 7, 18)]
+
+
+def test_window_matches_filtering_the_whole_series():
+    rng = random.Random(27)
+    for _ in range(500):
+        frequency = rng.choice((WEEKLY, MONTHLY))
+        start = _utc(2030, rng.randint(1, 12), rng.randint(1, 31 - 3), 18) \
+            + timedelta(days=rng.choice((0, 3)))
+        rule = {
+            "interval": rng.randint(1, 3),
+            "count": rng.choice((None, rng.randint(1, 30))),
+            "until": rng.choice((None, start + timedelta(days=400))),
+            "exceptions": [
+                (start + timedelta(weeks=rng.randint(0, 60))).date()
+                for _ in range(rng.randint(0, 4))
+            ],
+        }
+        window_start = start + timedelta(days=rng.randint(-30, 500))
+        window_end = window_start + timedelta(days=rng.randint(0, 200))
+
+        series = iter_occurrences(
+            start, frequency, **rule, window_end=_utc(2040, 1, 1)
+        )
+        expected = [o for o in series if window_start <= o < window_end]
+        assert list(iter_occurrences(
+            start, frequency, **rule,
+            window_start=window_start, window_end=window_end
+        )) == expected
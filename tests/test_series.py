@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _weekly_series(booking_data, table, weeks):
+    from app.crud.booking_series import create_series
+    from app.database import async_session
+    from app.models.booking_series import SeriesFrequency
+    from app.schemas.booking import BookingSeriesCreate
+
+    start = (datetime.now(ZoneInfo("UTC")) + timedelta(days=1)).replace(
+        hour=18, minute=0, second=0, microsecond=0
+    )
+    series = BookingSeriesCreate(
+        table_id=table.id,
+        start_time=start,
+        guest_count=2,
+        frequency=SeriesFrequency.WEEKLY,
+        count=weeks,
+    )
+    async with async_session() as db:
+        return await create_series(db, booking_data.user_id, series)
+
+
+async def _materialize_to(until):
+    from app.core.config import series_settings
+    from app.crud.booking_series import materialize_due_series
+    from app.database import async_session
+
+    async with async_session() as db:
+        await materialize_due_series(
+            db, until - timedelta(days=series_settings.HORIZON_DAYS)
+        )
+
+
+async def _series_state(series):
+    from sqlalchemy import select
+
+    from app.database import async_session
+    from app.models.booking import Booking
+    from app.models.booking_series import BookingSeries
+    from app.models.outbox import OutboxEvent
+
+    async with async_session() as db:
+        bookings = (await db.scalars(
+            select(Booking)
+            .where(Booking.series_id == series.id)
+            .order_by(Booking.start_time)
+        )).all()
+        events = (await db.scalars(
+            select(OutboxEvent)
+            .where(OutboxEvent.aggregate_id.in_([b.id for b in bookings]))
+            .order_by(OutboxEvent.id)
+        )).all()
+        series = await db.get(BookingSeries, series.id)
+    return series, bookings, events
+
+
+async def test_materializer_records_occurrences_it_cannot_book(
+    booking_data
+):
+    from app.database import async_session
+    from app.models.booking import Booking, BookingStatus
+    from app.models.table import Table, TableStatus
+
+    table = await booking_data.table()
+    series = await _weekly_series(booking_data, table, weeks=12)
+    later = [
+        series.start_time + timedelta(weeks=week) for week in (9, 10, 11)
+    ]
+    assert series.materialized_until < later[0]
+
+    async with async_session() as db:
+        # Booked directly, as nothing else may book over the series
+        db.add(Booking(
+            user_id=booking_data.user_id,
+            table_id=table.id,
+            start_time=later[0] + timedelta(hours=1),
+            end_time=later[0] + timedelta(hours=3),
+            guest_count=2,
+            status=BookingStatus.CONFIRMED,
+        ))
+        await db.commit()
+    await _materialize_to(later[0] + timedelta(days=1))
+    async with async_session() as db:
+        (await db.get(Table, table.id)).status = TableStatus.MAINTENANCE
+        await db.commit()
+    await _materialize_to(later[1] + timedelta(days=1))
+
+    series, bookings, events = await _series_state(series)
+    by_start = {booking.start_time: booking for booking in bookings}
+    assert [by_start[start].status for start in later[:2]] == [
+        BookingStatus.CANCELLED, BookingStatus.CANCELLED
+    ]
+    assert later[2] not in by_start
+    assert {start.date() for start in later[:2]} <= set(series.exceptions)
+    reasons = {
+        event.payload["booking_id"]: event.payload.get("reason")
+        for event in events if event.event_type == "booking.cancelled"
+    }
+    assert reasons == {
+        by_start[later[0]].id: "conflict",
+        by_start[later[1]].id: "table_unavailable",
+    }
+
+
+async def test_extension_cannot_run_into_a_later_occurrence(booking_data):
+    from fastapi import HTTPException
+
+    from app.api.endpoint.booking import extend_booking
+    from app.database import async_session
+    from app.models.booking import Booking, BookingStatus
+    from app.models.user import User
+
+    table = await booking_data.table()
+    series = await _weekly_series(booking_data, table, weeks=12)
+    occurrence = series.start_time + timedelta(weeks=11)
+    assert series.materialized_until < occurrence
+
+    async with async_session() as db:
+        booking = Booking(
+            user_id=booking_data.user_id,
+            table_id=table.id,
+            start_time=occurrence - timedelta(hours=3),
+            end_time=occurrence - timedelta(hours=1),
+            guest_count=2,
+            status=BookingStatus.CONFIRMED,
+        )
+        db.add(booking)
+        await db.commit()
+        user = await db.get(User, booking_data.user_id)
+        await extend_booking(booking.id, 60, db=db, current_user=user)
+        with pytest.raises(HTTPException) as error:
+            await extend_booking(booking.id, 30, db=db, current_user=user)
+        assert error.value.status_code == 400
+        await db.refresh(booking)
+    assert booking.end_time == occurrence
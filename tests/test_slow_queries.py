@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+from app.tasks.slow_queries import normalize_sql, parameter_shapes
+
+
+def test_literals_and_parameters_become_placeholders():
+    assert normalize_sql(
+        "SELECT  a\n  FROM t2\n WHERE name = 'O''Brien' AND x > 3.5 "
+        "AND t1.y = 12 AND z = $1"
+    ) == "SELECT a FROM t2 WHERE name = ? AND x > ? AND t1.y = ? AND z = ?"
+
+
+def test_lists_of_any_length_are_one_statement():
+    expected = "SELECT * FROM bookings WHERE id IN (?, ...)"
+    assert normalize_sql(
+        "SELECT * FROM bookings WHERE id IN ($1, $2)"
+    ) == expected
+    assert normalize_sql(
+        "SELECT * FROM bookings WHERE id IN "
+        "($1::INTEGER, $2::INTEGER, $3::INTEGER)"
+    ) == expected
+    assert normalize_sql(
+        "SELECT * FROM bookings WHERE id IN (1, 2, 3, 4)"
+    ) == expected
+
+
+def test_single_parameters_keep_their_cast():
+    assert normalize_sql(
+        "SELECT * FROM bookings WHERE id = ANY($1::INTEGER[])"
+    ) == "SELECT * FROM bookings WHERE id = ANY(?::INTEGER[])"
+    assert normalize_sql(
+        "SELECT * FROM bookings WHERE id = $1::INTEGER"
+    ) == "SELECT * FROM bookings WHERE id = ?::INTEGER"
+
+
+def test_parameter_shapes():
+    naive = datetime(2030, 6, 3, 18)
+    aware = naive.replace(tzinfo=timezone.utc)
+    assert parameter_shapes((1, "a", naive, aware, [1, 2], None)) == [
+        "int", "str", "datetime(naive)", "datetime", "list[2]", "NoneType"
+    ]
+    assert parameter_shapes({"ids": (1, 2, 3), "start": aware}) == [
+        "ids:tuple[3]", "start:datetime"
+    ]
+    assert parameter_shapes(None) == []
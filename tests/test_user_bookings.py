@@ -0,0 +1,125 @@
+import base64
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.main  # noqa: F401  Registers every model
+from app.crud.user_bookings import (
+    PAST,
+    UPCOMING,
+    _past_page,
+    _upcoming_page,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def _cursor(text):
+    return base64.urlsafe_b64encode(text.encode()).decode()
+
+
+def test_cursor_round_trip():
+    start = datetime(
+        2030, 6, 3, 18, 30, 0, 123456, timezone(timedelta(hours=-5))
+    )
+    cursor = encode_cursor(SimpleNamespace(start_time=start, id=42))
+    assert decode_cursor(cursor) == (start, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    _cursor("2030-06-03T18:00:00+00:00"),
+    _cursor("2030-06-03T18:00:00+00:00|42|1"),
+    _cursor("2030-06-03T18:00:00|42"),
+    _cursor("2030-06-03T18:00:00+00:00|forty-two"),
+    _cursor("yesterday|42"),
+    base64.urlsafe_b64encode(b"\xff\xfe|42").decode(),
+])
+def test_cursors_not_issued_here_are_refused(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def _sql(query):
+    return " ".join(str(query.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True}
+    )).split())
+
+
+def test_pages_seek_past_the_cursor_row():
+    now = datetime(2030, 6, 3, tzinfo=timezone.utc)
+    key = (now - timedelta(days=1), 9)
+
+    upcoming = _sql(_upcoming_page(5, now, key, 11))
+    assert "(bookings.start_time, bookings.id) > (" in upcoming
+    assert upcoming.endswith(
+        "ORDER BY bookings.start_time, bookings.id LIMIT 11"
+    )
+
+    past = _sql(_past_page(5, now, key, 11))
+    assert past.count("(bookings.start_time, bookings.id) < (") == 3
+    assert past.count(
+        "ORDER BY bookings.start_time DESC, bookings.id DESC LIMIT 11"
+    ) == 3
+    assert past.endswith(
+        "ORDER BY anon_1.start_time DESC, anon_1.id DESC LIMIT 11"
+    )
+
+
+@pytest.mark.anyio
+async def test_paging_visits_every_booking_once(booking_data):
+    from app.crud.user_bookings import get_user_bookings
+    from app.database import async_session
+    from app.models.booking import Booking, BookingStatus
+
+    table = await booking_data.table()
+    now = datetime.now(ZoneInfo("UTC")).replace(microsecond=0)
+    statuses = [
+        BookingStatus.CONFIRMED,
+        BookingStatus.CANCELLED,
+        BookingStatus.COMPLETED,
+    ]
+    async with async_session() as db:
+        bookings = [
+            # Each start time is shared by two bookings of each status,
+            # and pages of three split them
+            Booking(
+                user_id=booking_data.user_id,
+                table_id=table.id,
+                start_time=now + timedelta(days=day, hours=12),
+                end_time=now + timedelta(days=day, hours=14),
+                guest_count=2,
+                status=status,
+            )
+            for day in range(-4, 4)
+            for status in statuses
+            for _ in range(2)
+        ]
+        db.add_all(bookings)
+        await db.commit()
+
+        upcoming = sorted(
+            (b for b in bookings
+             if b.status == BookingStatus.CONFIRMED and b.start_time >= now),
+            key=lambda b: (b.start_time, b.id)
+        )
+        past = sorted(
+            (b for b in bookings if b not in upcoming),
+            key=lambda b: (b.start_time, b.id),
+            reverse=True
+        )
+        for scope, expected in ((UPCOMING, upcoming), (PAST, past)):
+            seen, cursor = [], None
+            while True:
+                page, cursor = await get_user_bookings(
+                    db, booking_data.user_id, scope, 3, cursor
+                )
+                assert len(page) <= 3
+                seen += [booking.id for booking in page]
+                if cursor is None:
+                    break
+            assert seen == [booking.id for booking in expected]
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = -31  # No real user: only the test's subscription receives it
+
+
+@pytest.fixture
+async def notifier(database, monkeypatch):
+    from app.core.config import waitlist_settings
+    from app.tasks.waitlist import WaitlistNotifier
+
+    monkeypatch.setattr(waitlist_settings, "RECONNECT_MIN_SECONDS", 0.05)
+    monkeypatch.setattr(waitlist_settings, "PING_INTERVAL_SECONDS", 0.2)
+    notifier = WaitlistNotifier()
+    notifier.start()
+    yield notifier
+    await notifier.stop()
+
+
+async def _received(database, queue, timeout=5.0) -> bool:
+    """Notify until the subscription gets one, as LISTEN may not be up"""
+    from sqlalchemy import func, select
+
+    from app.crud.waitlist import WAITLIST_CHANNEL
+
+    payload = json.dumps({"user_id": USER_ID})
+    for _ in range(int(timeout / 0.1)):
+        async with database.connect() as conn:
+            await conn.scalar(
+                select(func.pg_notify(WAITLIST_CHANNEL, payload))
+            )
+            await conn.commit()
+        try:
+            await asyncio.wait_for(queue.get(), 0.1)
+            return True
+        except asyncio.TimeoutError:
+            pass
+    return False
+
+
+async def test_notifier_reconnects_after_losing_its_connection(
+    database, notifier
+):
+    from sqlalchemy import text
+
+    from app.tasks.waitlist import LISTENER_NAME
+
+    queue = notifier.subscribe(USER_ID)
+    assert await _received(database, queue)
+
+    async with database.connect() as conn:
+        terminated = (await conn.execute(
+            text(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE application_name = :name"
+            ),
+            {"name": LISTENER_NAME}
+        )).scalars().all()
+    assert terminated == [True]
+    assert await _received(database, queue)
+
+
+async def test_notifier_start_survives_an_unreachable_database(
+    database, monkeypatch, caplog
+):
+    from app.core.config import waitlist_settings
+    from app.tasks import waitlist
+
+    monkeypatch.setattr(waitlist_settings, "RECONNECT_MIN_SECONDS", 0.05)
+    monkeypatch.setattr(
+        waitlist, "DATABASE_URL", "postgresql://tests@127.0.0.1:1/tests"
+    )
+    notifier = waitlist.WaitlistNotifier()
+    with caplog.at_level(logging.ERROR, logger=waitlist.__name__):
+        notifier.start()
+        await asyncio.sleep(0.2)
+        await notifier.stop()
+    failures = [
+        record for record in caplog.records
+        if "LISTEN connection failed" in record.getMessage()
+    ]
+    assert len(failures) >= 2